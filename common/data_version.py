@@ -0,0 +1,76 @@
+import logging
+import os
+import threading
+import time
+import mysql.connector
+from mysql.connector import errorcode
+from dotenv import load_dotenv
+from common.db import fetch_all, transaction
+
+# Load environment variables from a .env file
+load_dotenv()
+
+# Seconds a read data version is trusted before asking the database again;
+# results cached against it may be this much older than the latest ingestion
+DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', 5))
+
+_lock = threading.Lock()
+_cached = {'version': None, 'checked_at': None}
+# Cleared once the Data_Version table turns out to be missing; result caching is then skipped
+_table = {'available': True}
+
+def bump_data_version(cursor):
+    """
+    Mark the stored data as changed, in the caller's transaction.
+
+    Call once per ingested statement, right before its final commit, so
+    concurrent ingestion jobs hold the single version row only briefly.
+    A database without the Data_Version table (db/migrate_data_version.sql
+    not applied) is tolerated: ingestion goes on and search results are not
+    cached, since current_data_version() returns None there. The table is not
+    looked for again until the process restarts.
+
+    :param cursor: Cursor of the transaction that modifies the data.
+    """
+    if not _table['available']:
+        return
+    try:
+        cursor.execute("UPDATE Data_Version SET Version = Version + 1 WHERE ID = 1")
+    except mysql.connector.Error as err:
+        # MySQL rolls back only the failed statement, so the caller's transaction is unaffected
+        if err.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+        _table['available'] = False
+        logging.warning('Data_Version table is missing; apply db/migrate_data_version.sql to enable result caching')
+
+def bump_data_version_now():
+    """
+    Mark the stored data as changed in a transaction of its own, e.g. after an
+    ingestion failed with some chunks already committed. Errors are logged, not raised.
+    """
+    try:
+        with transaction() as conn:
+            with conn.cursor() as cursor:
+                bump_data_version(cursor)
+    except Exception as e:
+        logging.warning(f'Could not bump the data version: {e}')
+
+def current_data_version():
+    """
+    Return a token that changes whenever ingestion stores new data.
+
+    :return: The version number, or None if it cannot be read (e.g. the
+             Data_Version table has not been created yet).
+    """
+    with _lock:
+        if _cached['checked_at'] is not None and time.monotonic() - _cached['checked_at'] < DATA_VERSION_TTL:
+            return _cached['version']
+    try:
+        rows = fetch_all("SELECT Version FROM Data_Version WHERE ID = 1")
+        version = rows[0][0] if rows else None
+    except mysql.connector.Error as err:
+        logging.warning(f'Could not read the data version: {err}')
+        version = None
+    with _lock:
+        _cached['version'], _cached['checked_at'] = version, time.monotonic()
+    return version
@@ -0,0 +1,204 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+import mysql.connector
+from mysql.connector import pooling
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file
+load_dotenv()
+
+# Database configuration using environment variables
+db_config = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME')
+}
+
+# Connections kept open per process (mysql.connector allows at most 32)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+
+# Seconds a checkout waits for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+
+# Ping each connection on checkout and reconnect it if the server dropped it
+DB_POOL_PING = os.getenv('DB_POOL_PING', '1') == '1'
+
+_pool = None
+_pool_lock = threading.Lock()
+_connection_factory = None
+
+_stats_lock = threading.Lock()
+_stats = {
+    'checkouts': 0,
+    'waits': 0,
+    'wait_seconds': 0.0,
+    'timeouts': 0,
+    'health_check_failures': 0,
+    'in_use': 0,
+    'peak_in_use': 0,
+}
+
+def _count(**increments):
+    with _stats_lock:
+        for key, value in increments.items():
+            _stats[key] += value
+        _stats['peak_in_use'] = max(_stats['peak_in_use'], _stats['in_use'])
+
+class PooledConnection:
+    """
+    A checked-out connection. close() returns it to the pool and updates the usage counters.
+
+    Every other attribute is forwarded to the underlying mysql.connector connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._closed = False
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        _count(in_use=-1)
+        self._connection.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def set_connection_factory(factory):
+    """
+    Make get_connection() call factory instead of using the MySQL pool.
+
+    Used by benchmarks to run against a local stand-in database.
+
+    :param factory: Callable returning a DB-API connection with a context-managed cursor(), or None to restore the pool.
+    """
+    global _connection_factory
+    _connection_factory = factory
+
+def get_pool():
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    :return: mysql.connector MySQLConnectionPool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name='ai_wealth', pool_size=DB_POOL_SIZE, pool_reset_session=True, **db_config
+            )
+    return _pool
+
+def get_connection():
+    """
+    Check out a connection from the shared pool.
+
+    mysql.connector raises PoolError as soon as the pool is empty, so the
+    checkout is retried until DB_POOL_TIMEOUT. With DB_POOL_PING the connection
+    is pinged (and reconnected once) before it is handed out, so callers do not
+    get a connection the server closed while it sat idle. Close it to return it.
+
+    :return: PooledConnection.
+    :raises mysql.connector.errors.PoolError: If no connection frees up in time.
+    """
+    if _connection_factory is not None:
+        return _connection_factory()
+
+    pool = get_pool()
+    start = time.monotonic()
+    waited = False
+    while True:
+        try:
+            connection = pool.get_connection()
+            break
+        except mysql.connector.errors.PoolError:
+            if time.monotonic() - start >= DB_POOL_TIMEOUT:
+                _count(timeouts=1)
+                raise
+            waited = True
+            time.sleep(0.05)
+    if waited:
+        _count(waits=1, wait_seconds=time.monotonic() - start)
+
+    if DB_POOL_PING:
+        try:
+            connection.ping(reconnect=True, attempts=2, delay=0.5)
+        except mysql.connector.Error:
+            _count(health_check_failures=1)
+            connection.close()
+            raise
+
+    _count(checkouts=1, in_use=1)
+    return PooledConnection(connection)
+
+@contextmanager
+def connection():
+    """
+    Check out a connection for the duration of a with block.
+
+    :return: Context manager yielding a PooledConnection.
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def transaction():
+    """
+    Run a with block in one transaction: commit on success, roll back on any error.
+
+    :return: Context manager yielding the connection.
+    """
+    with connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except mysql.connector.Error as err:
+                logging.warning(f'Rollback failed: {err}')
+            raise
+
+def fetch_all(query, params=None, dictionary=False):
+    """
+    Run a read query on a pooled connection.
+
+    :param query: SQL statement with %s placeholders.
+    :param params: Query parameters.
+    :param dictionary: Return rows as dictionaries instead of tuples.
+    :return: List of rows.
+    """
+    with connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+def pool_stats():
+    """
+    Return pool usage counters.
+
+    :return: Dictionary with pool size, connections in use (now and at peak), checkouts,
+             checkouts that had to wait and for how long, timeouts and failed health checks.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['size'] = DB_POOL_SIZE
+    stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+    return stats
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import openai
+import requests
+from dotenv import load_dotenv
+from common.rate_limit import RateLimiter, call_with_retries, estimate_tokens
+
+# Load environment variables from a .env file
+load_dotenv()
+
+# OpenAI credentials and endpoint; point OPENAI_API_BASE at a local stand-in server for tests and benchmarks
+settings = {
+    'api_key': os.getenv('OPENAI_KEY'),
+    'api_base': os.getenv('OPENAI_API_BASE') or openai.api_base,
+}
+
+# Seconds a single request may take before it is abandoned and retried
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 30))
+
+# Retries of timeouts, rate limiting and server errors, with jittered exponential backoff
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 5))
+
+# Requests in flight at once across the whole process
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+
+# Keep-alive connections kept open to the API
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', 16))
+
+# Account limits shared by every request of the process
+rate_limiter = RateLimiter(
+    requests_per_minute=int(os.getenv('OPENAI_RPM', 3500)),
+    tokens_per_minute=int(os.getenv('OPENAI_TPM', 90000))
+)
+
+_slots = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+_listeners = []
+_stats_lock = threading.Lock()
+_stats = {}
+
+class SharedSession(requests.Session):
+    """
+    One HTTP session whose keep-alive connection pool is shared by every thread.
+
+    The openai package keeps a session per thread and closes it after a few
+    minutes; worker threads come and go, so each would open its own connections.
+    Handing them this session instead lets them reuse one pool, and close() is
+    ignored so one thread's rotation does not drop the others' connections.
+    """
+
+    def __init__(self, pool_size):
+        super().__init__()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def close(self):
+        pass
+
+session = SharedSession(LLM_POOL_SIZE)
+openai.requestssession = session
+
+def configure(api_key=None, api_base=None):
+    """
+    Override the API key or endpoint, e.g. to use a local stand-in server.
+
+    :param api_key: OpenAI API key.
+    :param api_base: Base URL of the API, e.g. 'http://127.0.0.1:8765/v1'.
+    """
+    if api_key is not None:
+        settings['api_key'] = api_key
+    if api_base is not None:
+        settings['api_base'] = api_base
+
+def add_listener(listener):
+    """
+    Call listener(purpose, outcome, seconds, throttle_seconds, usage) after every request attempt.
+
+    outcome is 'success' or 'error', throttle_seconds the time spent waiting for
+    the rate limiter and a free request slot, and usage the response's token
+    usage dictionary (None for failed attempts).
+
+    :param listener: Callable, e.g. a metrics recorder.
+    """
+    _listeners.append(listener)
+
+def _record(purpose, outcome, seconds, throttle_seconds, usage):
+    usage = usage or {}
+    with _stats_lock:
+        stats = _stats.setdefault(purpose, {
+            'requests': 0, 'errors': 0, 'seconds': 0.0, 'throttle_seconds': 0.0,
+            'prompt_tokens': 0, 'completion_tokens': 0
+        })
+        stats['requests'] += 1
+        stats['errors'] += outcome == 'error'
+        stats['seconds'] += seconds
+        stats['throttle_seconds'] += throttle_seconds
+        stats['prompt_tokens'] += usage.get('prompt_tokens', 0)
+        stats['completion_tokens'] += usage.get('completion_tokens', 0)
+    for listener in _listeners:
+        listener(purpose, outcome, seconds, throttle_seconds, usage)
+
+def chat_completion(purpose='chat', timeout=None, max_retries=None, **kwargs):
+    """
+    Send a chat completion request through the shared client.
+
+    Each attempt waits for the shared rate limiter and one of LLM_MAX_CONCURRENCY
+    request slots, runs on the pooled session with a timeout, and is counted with
+    its latency and token usage. Timeouts, rate limiting and server errors are
+    retried with backoff.
+
+    :param purpose: What the request is for, e.g. 'classify_batch'; stats are kept per purpose.
+    :param timeout: Seconds before an attempt is abandoned (defaults to LLM_TIMEOUT).
+    :param max_retries: Retries after the first attempt (defaults to LLM_MAX_RETRIES).
+    :param kwargs: Arguments for openai.ChatCompletion.create (model, messages, ...).
+    :return: The API response.
+    """
+    timeout = timeout or LLM_TIMEOUT
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    # Every one of the n completions can use up to max_tokens
+    estimated_tokens = estimate_tokens(kwargs['messages'], kwargs.get('max_tokens', 0) * kwargs.get('n', 1))
+
+    def attempt():
+        throttle_start = time.perf_counter()
+        rate_limiter.acquire(estimated_tokens)
+        with _slots:
+            start = time.perf_counter()
+            try:
+                response = openai.ChatCompletion.create(
+                    api_key=settings['api_key'], api_base=settings['api_base'], request_timeout=timeout, **kwargs
+                )
+            except Exception:
+                _record(purpose, 'error', time.perf_counter() - start, start - throttle_start, None)
+                raise
+        _record(purpose, 'success', time.perf_counter() - start, start - throttle_start, response.get('usage'))
+        return response
+
+    return call_with_retries(attempt, max_retries=max_retries)
+
+def llm_stats():
+    """
+    Return request counters per purpose.
+
+    :return: Dictionary of purpose to requests, errors, total and average latency,
+             time spent throttled, and prompt and completion tokens.
+    """
+    with _stats_lock:
+        stats = {purpose: dict(values) for purpose, values in _stats.items()}
+    for values in stats.values():
+        values['avg_seconds'] = round(values['seconds'] / values['requests'], 3) if values['requests'] else 0.0
+        values['seconds'] = round(values['seconds'], 3)
+        values['throttle_seconds'] = round(values['throttle_seconds'], 3)
+    return stats
@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+import logging
+import openai
+
+# OpenAI errors that are worth retrying after a pause
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.APIError,
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.ServiceUnavailableError,
+)
+
+def estimate_tokens(messages, max_tokens=0):
+    """
+    Roughly estimate the tokens a chat request will consume.
+
+    Uses the common ~4 characters per token rule, which is close enough for rate limiting.
+
+    :param messages: Chat messages of the request.
+    :param max_tokens: Completion token limit of the request.
+    :return: Estimated token count.
+    """
+    prompt_chars = sum(len(message.get('content', '')) for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        """
+        :param requests_per_minute: Maximum requests per minute (0 disables the limit).
+        :param tokens_per_minute: Maximum tokens per minute (0 disables the limit).
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        # Add the allowance earned since the last refill, capped at one minute's worth
+        now = time.monotonic()
+        elapsed_minutes = (now - self._last_refill) / 60.0
+        self._last_refill = now
+        self._request_allowance = min(
+            self.requests_per_minute, self._request_allowance + elapsed_minutes * self.requests_per_minute
+        )
+        self._token_allowance = min(
+            self.tokens_per_minute, self._token_allowance + elapsed_minutes * self.tokens_per_minute
+        )
+
+    def acquire(self, tokens=0):
+        """
+        Block until one request and the given number of tokens are available.
+
+        :param tokens: Estimated tokens for the request.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                # A single request larger than the whole budget is let through once the bucket is full
+                needed_tokens = min(tokens, self.tokens_per_minute)
+                request_ok = not self.requests_per_minute or self._request_allowance >= 1
+                tokens_ok = not self.tokens_per_minute or self._token_allowance >= needed_tokens
+                if request_ok and tokens_ok:
+                    if self.requests_per_minute:
+                        self._request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self._token_allowance -= needed_tokens
+                    return
+                wait_seconds = 0.0
+                if not request_ok:
+                    wait_seconds = max(wait_seconds, (1 - self._request_allowance) * 60.0 / self.requests_per_minute)
+                if not tokens_ok:
+                    wait_seconds = max(wait_seconds, (needed_tokens - self._token_allowance) * 60.0 / self.tokens_per_minute)
+            time.sleep(min(wait_seconds, 1.0))
+
+def call_with_retries(func, *args, max_retries=5, base_delay=1.0, max_delay=30.0, **kwargs):
+    """
+    Call func, retrying transient OpenAI errors with jittered exponential backoff.
+
+    :param func: Callable to invoke.
+    :param max_retries: Number of retries after the first attempt.
+    :param base_delay: Delay in seconds before the first retry.
+    :param max_delay: Upper bound on a single delay.
+    :return: The return value of func.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            logging.warning(f'OpenAI call failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.2f}s')
+            time.sleep(delay)
+            attempt += 1
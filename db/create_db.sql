@@ -27,7 +27,30 @@ CREATE TABLE Transaction_Info (
     Credit DECIMAL(15, 2),
     Balance DECIMAL(15, 2),
     label VARCHAR(20),
+    LabelSource VARCHAR(10),
+    RowHash CHAR(64),
+    RowID BIGINT NOT NULL AUTO_INCREMENT UNIQUE,
+    UNIQUE (AccountNo, RowHash),
     FOREIGN KEY (ID) REFERENCES Personal_Info(ID),
     FOREIGN KEY (BankName, PersonName, AccountNo) 
         REFERENCES Personal_Info(BankName, PersonName, AccountNo)
 );
+
+CREATE TABLE Statement_Upload (
+    ContentHash CHAR(64) PRIMARY KEY,
+    AccountNo VARCHAR(20),
+    PeriodStart DATE,
+    PeriodEnd DATE,
+    RowCount INT,
+    Result TEXT,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (AccountNo, PeriodStart, PeriodEnd)
+);
+
+-- Single row bumped by every ingestion commit; cached search results of an older version are stale
+CREATE TABLE Data_Version (
+    ID TINYINT PRIMARY KEY,
+    Version BIGINT NOT NULL
+);
+
+INSERT INTO Data_Version (ID, Version) VALUES (1, 0);
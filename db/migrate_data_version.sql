@@ -0,0 +1,12 @@
+-- Add the data version that search result caching keys on to an existing database.
+-- Ingestion increments it with every commit, so results cached before a commit
+-- are not served after it.
+
+USE AI_Wealth;
+
+CREATE TABLE IF NOT EXISTS Data_Version (
+    ID TINYINT PRIMARY KEY,
+    Version BIGINT NOT NULL
+);
+
+INSERT IGNORE INTO Data_Version (ID, Version) VALUES (1, 0);
@@ -0,0 +1,12 @@
+-- Add the columns the local transaction classifier trains from to an existing database.
+-- LabelSource records who assigned each label ('cache' or 'llm' for API answers,
+-- 'local' for the classifier itself; NULL for rows stored before this column existed,
+-- which were all labelled by the API). RowID numbers rows in insertion order so the
+-- classifier can train incrementally on the rows stored since its last run.
+
+USE AI_Wealth;
+
+ALTER TABLE Transaction_Info ADD COLUMN LabelSource VARCHAR(10);
+
+-- Existing rows are numbered as part of the ALTER
+ALTER TABLE Transaction_Info ADD COLUMN RowID BIGINT NOT NULL AUTO_INCREMENT UNIQUE;
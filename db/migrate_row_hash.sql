@@ -0,0 +1,28 @@
+-- Add the row fingerprint used by incremental ingestion to an existing database.
+-- RowHash must match row_fingerprint() in pdf_extraction/src/insert_db.py:
+-- SHA-256 of account|date|value date|debit|credit|balance|description, with
+-- amounts to two decimals and the description upper-cased with whitespace collapsed.
+
+USE AI_Wealth;
+
+ALTER TABLE Transaction_Info ADD COLUMN RowHash CHAR(64);
+
+UPDATE Transaction_Info
+SET RowHash = SHA2(CONCAT_WS('|',
+    TRIM(AccountNo),
+    COALESCE(CAST(TransactionDate AS CHAR), 'None'),
+    COALESCE(CAST(ValueDate AS CHAR), 'None'),
+    CAST(COALESCE(Debit, 0.00) AS CHAR),
+    CAST(COALESCE(Credit, 0.00) AS CHAR),
+    CAST(COALESCE(Balance, 0.00) AS CHAR),
+    UPPER(TRIM(REGEXP_REPLACE(COALESCE(Description, ''), '[[:space:]]+', ' ')))
+), 256)
+WHERE RowHash IS NULL;
+
+-- Rows inserted twice by earlier overlapping uploads; remove the extra copies before adding the key
+SELECT AccountNo, RowHash, COUNT(*) AS Copies
+FROM Transaction_Info
+GROUP BY AccountNo, RowHash
+HAVING COUNT(*) > 1;
+
+ALTER TABLE Transaction_Info ADD UNIQUE (AccountNo, RowHash);
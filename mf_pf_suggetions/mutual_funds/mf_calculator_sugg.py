@@ -1,26 +1,13 @@
 import mysql.connector
 from decimal import Decimal
 import json
-from dotenv import load_dotenv
-import os
+from common.db import fetch_all
 
-# Load environment variables from a .env file
-load_dotenv()
-
-# Database configuration loaded from environment variables
-db_config = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'database': os.getenv('DB_NAME')
-}
-
-def get_top_performing_funds(db_config, return_period, top_n=3):
+def get_top_performing_funds(return_period, top_n=3):
     """
     Fetch the top-performing mutual funds based on the specified return period.
     
     Args:
-        db_config (dict): Database configuration dictionary.
         return_period (str): The return period to filter (e.g., '1year').
         top_n (int): Number of top-performing funds to retrieve (default is 3).
     
@@ -31,10 +18,6 @@ def get_top_performing_funds(db_config, return_period, top_n=3):
         ValueError: If no data is found for the specified return period.
     """
     try:
-        # Connect to the MySQL database
-        connection = mysql.connector.connect(**db_config)
-        cursor = connection.cursor(dictionary=True)
-        
         # Define the query to get the top-performing funds
         query = f"""
         SELECT fund_name, ret_{return_period} AS return_percentage
@@ -42,12 +25,8 @@ def get_top_performing_funds(db_config, return_period, top_n=3):
         ORDER BY return_percentage DESC
         LIMIT %s
         """
-        cursor.execute(query, (top_n,))
-        results = cursor.fetchall()
-        
-        # Close the cursor and connection
-        cursor.close()
-        connection.close()
+        # Run the query on a pooled connection
+        results = fetch_all(query, (top_n,), dictionary=True)
         
         if results:
             # Convert results to a list of tuples with Decimal return percentages
@@ -102,7 +81,7 @@ def generate_investment_report(saving_amount):
     for period in periods:
         try:
             # Get the top-performing funds for the current period
-            top_funds = get_top_performing_funds(db_config, period, top_n)
+            top_funds = get_top_performing_funds(period, top_n)
             results[period] = []
             
             for fund_name, return_percentage in top_funds:
@@ -1,20 +1,7 @@
-import mysql.connector
 from mysql.connector import Error
-from dotenv import load_dotenv
-import os
 import json
 from decimal import Decimal
-
-# Load environment variables from a .env file
-load_dotenv()
-
-# Database configuration loaded from environment variables
-db_config = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'database': os.getenv('DB_NAME')
-}
+from common.db import connection
 
 def decimal_to_float(o):
     """
@@ -46,11 +33,9 @@ def get_average_balances():
     """
     results = []
     try:
-        # Establish a connection to the MySQL database
-        connection = mysql.connector.connect(**db_config)
-
-        if connection.is_connected():
-            cursor = connection.cursor()
+        # Check out a pooled connection; it goes back to the pool when the block ends
+        with connection() as conn:
+            cursor = conn.cursor()
             
             # Define the SQL query to calculate monthly average balances
             query = """
@@ -90,6 +75,7 @@ def get_average_balances():
             # Execute the SQL query
             cursor.execute(query)
             results = cursor.fetchall()
+            cursor.close()
             
             # Convert query results to a list of dictionaries
             result_list = []
@@ -111,9 +97,3 @@ def get_average_balances():
         # Handle database connection errors
         print(f"Error: {e}")
         return json.dumps({"error": str(e)})
-
-    finally:
-        # Ensure resources are released and connection is closed
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
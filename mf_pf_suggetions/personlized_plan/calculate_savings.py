@@ -1,26 +1,13 @@
 import mysql.connector
 from decimal import Decimal
 import json
-from dotenv import load_dotenv
-import os
+from common.db import fetch_all
 
-# Load environment variables from a .env file
-load_dotenv()
-
-# Configuration for connecting to the MySQL database
-db_config = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'database': os.getenv('DB_NAME')
-}
-
-def get_top_performing_funds(db_config, return_period, top_n=3):
+def get_top_performing_funds(return_period, top_n=3):
     """
     Fetch the top-performing mutual funds based on the return period.
 
     Args:
-        db_config (dict): Database configuration parameters.
         return_period (str): The return period (e.g., '1year', '3year').
         top_n (int): Number of top funds to retrieve (default is 3).
 
@@ -32,10 +19,6 @@ def get_top_performing_funds(db_config, return_period, top_n=3):
         ValueError: If no data is found for the specified return period.
     """
     try:
-        # Establish a connection to the MySQL database
-        connection = mysql.connector.connect(**db_config)
-        cursor = connection.cursor(dictionary=True)
-        
         # Define the SQL query to retrieve top-performing funds based on the return period
         query = f"""
         SELECT fund_name, ret_{return_period} AS return_percentage
@@ -43,13 +26,8 @@ def get_top_performing_funds(db_config, return_period, top_n=3):
         ORDER BY return_percentage DESC
         LIMIT %s
         """
-        # Execute the query with the limit parameter
-        cursor.execute(query, (top_n,))
-        results = cursor.fetchall()
-        
-        # Close the cursor and connection
-        cursor.close()
-        connection.close()
+        # Run the query on a pooled connection
+        results = fetch_all(query, (top_n,), dictionary=True)
         
         if results:
             # Return results with fund names and return percentages as Decimal objects
@@ -136,7 +114,7 @@ def generate_investment_report(saving_amount, period):
         periods_in_years = period_to_years[period]
 
         # Get top-performing funds for the given period
-        top_funds = get_top_performing_funds(db_config, period, top_n)
+        top_funds = get_top_performing_funds(period, top_n)
         results[period] = []
 
         for fund_name, return_percentage in top_funds:
@@ -2,6 +2,7 @@ import os
 import openai
 from dotenv import load_dotenv
 import ast
+from common.llm import chat_completion
 
 # Load environment variables from a .env file
 load_dotenv()
@@ -13,9 +14,6 @@ api_key = os.getenv('OPENAI_KEY')
 if api_key is None:
     raise ValueError("OpenAI API key is not set in the environment variables.")
 
-# Set the API key for OpenAI
-openai.api_key = api_key
-
 def extract_entities(sentence):
     """
     Extract entities related to 'assets', 'time_period', and 'total_amount' from the given sentence using OpenAI API.
@@ -41,7 +39,8 @@ def extract_entities(sentence):
         )
         
         # Call the OpenAI API to generate the response based on the prompt
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            purpose='extract_plan_entities',
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are an assistant that extracts specified entities from sentences."},
@@ -1,23 +1,66 @@
-from flask import Flask, request, jsonify, render_template
-import fitz
+from flask import Flask, Request, Response, request, jsonify, render_template
 import os
+import sys
 import werkzeug.utils
 import logging
-from src.info import extract_entities
-from src.transaction import PdfToTable
+
+# Add the repository root to the system path for the shared modules in common/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.info import extract_entities_with_sources
+from src.document import StatementDocument
+from src.normalize import normalize_transactions
 from src.insert_db import insert_data_to_db
+from src.label_cache import label_cache
+from src.jobs import JobManager, QueueFullError
+from src.metrics import QUEUE_DEPTH, record_header_sources, time_stage, track_statement
+from src.dedup import content_hash, statement_period, rows_period, statement_identity, find_by_hash, find_by_identity, record_upload
+from src.checkpoint import CHECKPOINTS_ENABLED, Checkpoint, is_checkpoint_file, prune_checkpoints
+from src.local_classifier import LOCAL_CLASSIFIER_ENABLED, local_classifier
 import json
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import mysql.connector
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+class UploadRequest(Request):
+    """
+    Request whose body limit depends on its route, so a single upload is
+    rejected by its size before the multipart body is parsed.
+    """
+
+    @property
+    def max_content_length(self):
+        # The URL is matched before the body is read, so the endpoint is known here
+        if self.endpoint == 'upload_batch':
+            return BATCH_MAX_CONTENT_LENGTH
+        return MAX_CONTENT_LENGTH
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 # Configuration for file upload settings
-UPLOAD_FOLDER = 'uploads'  # Directory to save uploaded files
+UPLOAD_FOLDER = 'uploads'  # Directory for uploads too large to keep in memory
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 8 * 1024 * 1024))  # Uploads above this size spill to disk
 ALLOWED_EXTENSIONS = {'pdf'}  # Allowed file extensions
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Max file size limit (16 MB)
+BATCH_MAX_CONTENT_LENGTH = int(os.getenv('BATCH_MAX_CONTENT_LENGTH', 200 * 1024 * 1024))  # Max size of a batch request
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 50))  # Max PDFs in one batch, uploaded or inside a ZIP
+BATCH_MAX_UNCOMPRESSED = int(os.getenv('BATCH_MAX_UNCOMPRESSED', 400 * 1024 * 1024))  # Max total size of the PDFs in a ZIP
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 3))  # Statements of one batch processed at the same time
+BATCH_JOB_WORKERS = int(os.getenv('BATCH_JOB_WORKERS', 1))  # Number of batches processed at the same time
+BATCH_QUEUE_SIZE = int(os.getenv('BATCH_QUEUE_SIZE', 2))  # Batches allowed to wait before batch uploads are rejected
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Number of background ingestion workers
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 10))  # Jobs allowed to wait before uploads are rejected
+PDF_STREAM_MIN_PAGES = int(os.getenv('PDF_STREAM_MIN_PAGES', 150))  # Statements this long are streamed page by page
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Batch uploads may be up to BATCH_MAX_CONTENT_LENGTH instead (see UploadRequest)
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
 # Create the upload folder if it does not exist
@@ -26,6 +69,10 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 
+# Remove checkpoints of failed statements that were never retried
+if CHECKPOINTS_ENABLED:
+    prune_checkpoints()
+
 def allowed_file(filename):
     """
     Check if the file has an allowed extension.
@@ -44,46 +91,284 @@ def secure_filename(filename):
     """
     return werkzeug.utils.secure_filename(filename)
 
-def process_pdf(file_path):
+def spool_stream(stream):
+    """
+    Read a file stream into memory, spilling it to a temporary file above UPLOAD_SPOOL_THRESHOLD.
+    
+    :param stream: Readable binary stream.
+    :return: The file's bytes, or the path of the temporary file it was spilled to.
+    """
+    data = stream.read(UPLOAD_SPOOL_THRESHOLD + 1)
+    if len(data) <= UPLOAD_SPOOL_THRESHOLD:
+        return data
+
+    # Large upload: write what was read plus the rest of the stream to a uniquely named file
+    with tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], suffix='.pdf', delete=False) as spooled:
+        spooled.write(data)
+        shutil.copyfileobj(stream, spooled)
+    return spooled.name
+
+def read_upload(file):
     """
-    Process the uploaded PDF file: extract key entities and table data, and insert into the database.
+    Read an uploaded file into memory, spilling it to a temporary file above UPLOAD_SPOOL_THRESHOLD.
     
-    :param file_path: The path to the uploaded PDF file.
+    :param file: The uploaded FileStorage.
+    :return: The file's bytes, or the path of the temporary file it was spilled to.
+    """
+    return spool_stream(file.stream)
+
+def read_zip(file):
+    """
+    Read the PDFs inside an uploaded ZIP archive.
+    
+    Directories, hidden files and non-PDF members are ignored. The member count
+    and the total uncompressed size are checked against BATCH_MAX_FILES and
+    BATCH_MAX_UNCOMPRESSED before anything is extracted.
+    
+    :param file: The uploaded FileStorage.
+    :return: List of (filename, source) tuples, see spool_stream.
+    :raises ValueError: If the archive is invalid or over the limits.
+    """
+    try:
+        archive = zipfile.ZipFile(file.stream)
+    except zipfile.BadZipFile:
+        raise ValueError(f'{file.filename} is not a valid ZIP archive')
+
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and allowed_file(info.filename)
+            and not os.path.basename(info.filename).startswith('.') and '__MACOSX' not in info.filename
+        ]
+        if len(members) > BATCH_MAX_FILES:
+            raise ValueError(f'{file.filename} holds {len(members)} PDFs, the limit is {BATCH_MAX_FILES}')
+        if sum(info.file_size for info in members) > BATCH_MAX_UNCOMPRESSED:
+            raise ValueError(f'{file.filename} expands to more than {BATCH_MAX_UNCOMPRESSED} bytes')
+
+        uploads = []
+        try:
+            for info in members:
+                with archive.open(info) as member:
+                    uploads.append((secure_filename(os.path.basename(info.filename)), spool_stream(member)))
+        except Exception:
+            for _, source in uploads:
+                discard_upload(source)
+            raise
+        return uploads
+
+def discard_upload(source):
+    """
+    Remove a spilled upload file; in-memory uploads need no cleanup.
+    
+    A PDF kept in a checkpoint for a retry is left alone: a retry that fails
+    again must still find it, and the checkpoint removes it once it is cleared.
+    
+    :param source: Upload bytes or spilled file path.
+    """
+    if is_checkpoint_file(source):
+        return
+    if isinstance(source, str) and os.path.exists(source):
+        os.remove(source)
+        logging.info(f'File removed after processing: {source}')
+
+def duplicate_response(earlier, match):
+    """
+    Build the response for an upload that was already processed.
+    
+    :param earlier: Earlier upload as returned by find_by_hash or find_by_identity.
+    :param match: How it matched: 'content_hash' or 'statement_identity'.
+    :return: Response dictionary.
+    """
+    return {
+        'message': 'Statement already processed',
+        'duplicate': True,
+        'match': match,
+        'earlier': earlier
+    }
+
+def stream_rows(pdf_document, checkpoint=None, on_page=None):
+    """
+    Yield normalized transaction rows page by page, saving each page to the checkpoint.
+    
+    Pages an earlier attempt already read are replayed from the checkpoint and
+    extraction continues with the page after them.
+    
+    :param pdf_document: Open StatementDocument.
+    :param checkpoint: Optional Checkpoint of the statement.
+    :param on_page: Optional callback on_page(page_number, page_count) after each page is read.
+    :return: Generator of normalized row dictionaries.
+    """
+    start = 0
+    if checkpoint is not None:
+        for record in checkpoint.records('pages'):
+            start = record['page']
+            yield from record['rows']
+    for page_number, rows in pdf_document.iter_page_rows(on_page=on_page, normalize=True, start=start):
+        if checkpoint is not None:
+            checkpoint.append('pages', {'page': page_number, 'rows': rows})
+        yield from rows
+
+@track_statement
+def process_pdf(source, digest=None, progress=None):
+    """
+    Process the uploaded PDF file through ingest_statement, checkpointing its progress.
+    
+    With INGEST_CHECKPOINTS, each stage's results are saved under the statement's
+    content hash as they complete. A statement that fails with a server error
+    (database, OpenAI or unexpected errors, which may pass) keeps its checkpoint
+    and PDF, so a retry of the job (or another upload of the same file) resumes
+    from the last completed stage and chunk. Any other outcome, including a PDF
+    without transaction tables (422), which would fail the same way again,
+    removes the checkpoint.
+    
+    :param source: The uploaded PDF as bytes, or the path of a spilled upload (removed afterwards).
+    :param digest: Content hash of the upload (computed if not given).
+    :param progress: Optional callback progress(stage, fraction) for job status reporting.
+    :return: A response dictionary and HTTP status code.
+    """
+    try:
+        digest = digest or content_hash(source)
+        checkpoint = Checkpoint(digest) if CHECKPOINTS_ENABLED else None
+        result, status_code = ingest_statement(source, digest, progress, checkpoint)
+        if checkpoint is not None:
+            if status_code >= 500:
+                try:
+                    checkpoint.keep_source(source)
+                    result['checkpoint'] = checkpoint.stages()
+                except OSError as e:
+                    logging.warning(f'Could not keep {digest} for a retry: {e}')
+            else:
+                checkpoint.clear()
+        return result, status_code
+    except Exception as e:
+        logging.error(f'Unexpected error: {e}')
+        return {'error': str(e)}, 500
+    finally:
+        # Clean up: remove the spilled upload file, unless it is kept in the checkpoint for a retry
+        discard_upload(source)
+
+def ingest_statement(source, digest, progress=None, checkpoint=None):
+    """
+    Extract key entities and table data from a PDF and insert them into the database.
+    
+    Statements whose account and period match an earlier upload are answered
+    from that upload before tables are extracted or rows classified. Stage
+    durations, outcomes, pages and rows are recorded for /metrics; on the
+    streaming path the 'stream' stage covers extraction interleaved with the
+    separately timed 'classify' and 'insert' stages. Stages the checkpoint
+    already holds are not run again.
+    
+    :param source: The uploaded PDF as bytes, or the path of a spilled upload.
+    :param digest: Content hash of the upload.
+    :param progress: Optional callback progress(stage, fraction) for job status reporting.
+    :param checkpoint: Optional Checkpoint of the statement.
     :return: A response dictionary and HTTP status code.
     """
     try:
-        # Open the PDF file
-        with fitz.open(file_path) as pdf_document:
+        if checkpoint is not None and checkpoint.stages():
+            logging.info(f'Resuming {digest} after {checkpoint.stages()}')
+
+        # Open the PDF file once for both entity and table extraction
+        with time_stage('open_document'):
+            pdf_document = StatementDocument(data=source) if isinstance(source, bytes) else StatementDocument(source)
+        with pdf_document:
             # Check if the PDF is empty
-            if len(pdf_document) == 0:
+            if pdf_document.page_count == 0:
                 return {'error': 'Empty PDF document'}, 400
             
-            # Extract text from the first page
-            first_page = pdf_document.load_page(0)
-            text = first_page.get_text()
-            text_to_process = text[:500]  # Limit text to process for entity extraction
-
-            # Extract key entities from the text
-            key_entities = extract_entities(text_to_process)
-            key_entities = json.dumps(key_entities, indent=2)
+            header = checkpoint.load('header') if checkpoint is not None else None
+            if header is None:
+                # Extract text from the first page
+                if progress:
+                    progress('extracting_entities', 0.05)
+                with time_stage('first_page_text'):
+                    page_text = pdf_document.first_page_text(None)
+                text_to_process = page_text[:500]  # Limit text to process for entity extraction
+
+                # Extract key entities from the text
+                with time_stage('extract_entities'):
+                    entities, entity_sources = extract_entities_with_sources(text_to_process)
+                logging.info(f'Header entity sources: {entity_sources}')
+                record_header_sources(entity_sources)
+                header = {'entities': entities, 'period': statement_period(page_text)}
+            entities = header['entities']
+
+            # Skip statements already ingested for this account and period
+            identity = statement_identity(entities, header['period'])
+            earlier = find_by_identity(identity)
+            if earlier:
+                logging.info(f'Statement {identity} was already processed as {earlier["content_hash"]}')
+                return duplicate_response(earlier, 'statement_identity'), 200
+
+            key_entities = json.dumps(entities, indent=2)
             if 'error' in key_entities:
                 logging.error(f'Error in extract_entities_external: {key_entities["error"]}')
                 return {'error': 'Error extracting entities from the text'}, 500
+            if checkpoint is not None:
+                checkpoint.save('header', header)
             
-            # Extract tables from the PDF and convert to DataFrame
-            df = PdfToTable(file_path)
-            if df.empty:
-                logging.error('Error in PdfToTable: No tables found in the PDF document')
-                return {'error': 'Error extracting tables from the PDF document'}, 500
-            
-            # Convert DataFrame to a list of dictionaries
-            transaction_data = df.to_dict(orient='records')
-            # Insert extracted data into the database
-            insert_data_to_db(key_entities, transaction_data)
+            if pdf_document.page_count >= PDF_STREAM_MIN_PAGES:
+                # Stream rows page by page into classification and insertion to bound memory
+                def on_page(page_number, page_count):
+                    if progress:
+                        progress('streaming', 0.2 + 0.75 * page_number / page_count)
+
+                with time_stage('stream'):
+                    rows = stream_rows(pdf_document, checkpoint, on_page)
+                    first_row = next(rows, None)
+                    if first_row is None:
+                        logging.error('Error in iter_transaction_rows: No tables found in the PDF document')
+                        # The document itself is at fault; a retry would fail the same way
+                        return {'error': 'Error extracting tables from the PDF document'}, 422
+                    insert_stats = insert_data_to_db(key_entities, chain([first_row], rows), progress=progress, stream=True, normalized=True, checkpoint=checkpoint)
+            else:
+                transaction_data = checkpoint.load('rows') if checkpoint is not None else None
+                if transaction_data is None:
+                    # Extract tables from the PDF and convert to DataFrame
+                    if progress:
+                        progress('extracting_tables', 0.2)
+                    with time_stage('extract_tables'):
+                        df = pdf_document.table()
+                    if df.empty:
+                        logging.error('Error in PdfToTable: No tables found in the PDF document')
+                        # The document itself is at fault; a retry would fail the same way
+                        return {'error': 'Error extracting tables from the PDF document'}, 422
+
+                    # Validate, parse and filter the rows in bulk, then convert to a list of dictionaries
+                    with time_stage('normalize'):
+                        transaction_data = normalize_transactions(df).to_dict(orient='records')
+                    if checkpoint is not None:
+                        checkpoint.save('rows', transaction_data)
+
+                # Without a printed period, identify the statement by its transaction dates
+                if identity is None:
+                    identity = statement_identity(entities, rows_period(transaction_data))
+                    earlier = find_by_identity(identity)
+                    if earlier:
+                        logging.info(f'Statement {identity} was already processed as {earlier["content_hash"]}')
+                        return duplicate_response(earlier, 'statement_identity'), 200
 
-        return {
-            'message': 'PDF processed and data inserted successfully'
-        }, 200
+                # Insert extracted data into the database
+                insert_stats = insert_data_to_db(key_entities, transaction_data, progress=progress, normalized=True, checkpoint=checkpoint)
+            logging.info(f'Inserted {insert_stats["rows"]} rows in {len(insert_stats["chunks"])} chunks: {insert_stats["chunks"]}')
+            if insert_stats['skipped']:
+                logging.info(f'Skipped {insert_stats["skipped"]} rows already stored from overlapping statements')
+            if insert_stats['resumed']:
+                logging.info(f'Resumed after {insert_stats["resumed"]} rows inserted by an earlier attempt')
+            logging.info(f'Label cache stats: {label_cache.stats()}')
+
+            page_count = pdf_document.page_count
+
+        result = {
+            'message': 'PDF processed and data inserted successfully',
+            'pages': page_count,
+            'rows_inserted': insert_stats['rows'],
+            'rows_skipped': insert_stats['skipped']
+        }
+        if insert_stats['resumed']:
+            result['rows_resumed'] = insert_stats['resumed']
+        record_upload(digest, identity, insert_stats['rows'] + insert_stats['resumed'], result)
+        return result, 200
 
     except mysql.connector.Error as err:
         logging.error(f'MySQL error: {err}')
@@ -93,11 +378,114 @@ def process_pdf(file_path):
     except Exception as e:
         logging.error(f'Unexpected error: {e}')
         return {'error': str(e)}, 500
-    finally:
-        # Clean up: remove the uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logging.info(f'File removed after processing: {file_path}')
+
+def process_batch(uploads, progress=None):
+    """
+    Process the statements of a batch upload concurrently.
+    
+    Up to BATCH_WORKERS statements run through process_pdf at once. They share
+    the database connection pool, the label cache and the OpenAI rate limiter.
+    Identical files within the batch are processed once.
+    
+    :param uploads: List of (filename, source) tuples.
+    :param progress: Optional callback progress(stage, fraction) for job status reporting.
+    :return: Per-file results with aggregate throughput, and HTTP status code.
+    """
+    start = time.perf_counter()
+    results = [None] * len(uploads)
+    digests = [None] * len(uploads)
+    completed = [0]
+    lock = threading.Lock()
+
+    def process_upload(index):
+        filename, source = uploads[index]
+        file_start = time.perf_counter()
+        try:
+            digest = digests[index]
+            earlier = find_by_hash(digest)
+            if earlier:
+                discard_upload(source)
+                result, status_code = duplicate_response(earlier, 'content_hash'), 200
+            else:
+                result, status_code = process_pdf(source, digest)
+        except Exception as e:
+            logging.error(f'Error processing {filename}: {e}')
+            discard_upload(source)
+            result, status_code = {'error': str(e)}, 500
+        results[index] = {
+            'filename': filename,
+            'content_hash': digests[index],
+            'status_code': status_code,
+            'result': result,
+            'seconds': round(time.perf_counter() - file_start, 3)
+        }
+        with lock:
+            completed[0] += 1
+            if progress:
+                progress('processing_files', completed[0] / len(uploads))
+
+    # Keep the first of several identical files; the others point at it
+    first_by_digest = {}
+    unique_indexes = []
+    for index, (filename, source) in enumerate(uploads):
+        digest = digests[index] = content_hash(source)
+        if digest in first_by_digest:
+            discard_upload(source)
+            results[index] = {
+                'filename': filename,
+                'content_hash': digest,
+                'status_code': 200,
+                'result': {'message': 'Same file as another upload in this batch', 'duplicate': True,
+                           'match': 'batch', 'same_as': uploads[first_by_digest[digest]][0]},
+                'seconds': 0.0
+            }
+        else:
+            first_by_digest[digest] = index
+            unique_indexes.append(index)
+
+    if progress:
+        progress('processing_files', 0.0)
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+        list(executor.map(process_upload, unique_indexes))
+
+    seconds = time.perf_counter() - start
+    succeeded = [entry for entry in results if entry['status_code'] < 400]
+    pages = sum(entry['result'].get('pages', 0) for entry in succeeded)
+    rows = sum(entry['result'].get('rows_inserted', 0) for entry in succeeded)
+    return {
+        'files': results,
+        'aggregate': {
+            'files': len(results),
+            'succeeded': len(succeeded),
+            'duplicates': sum(1 for entry in succeeded if entry['result'].get('duplicate')),
+            'failed': len(results) - len(succeeded),
+            'pages': pages,
+            'rows_inserted': rows,
+            'rows_skipped': sum(entry['result'].get('rows_skipped', 0) for entry in succeeded),
+            'seconds': round(seconds, 3),
+            'files_per_second': round(len(results) / seconds, 3) if seconds else None,
+            'pages_per_second': round(pages / seconds, 3) if seconds else None,
+            'rows_per_second': round(rows / seconds, 3) if seconds else None
+        }
+    }, 200
+
+# Background workers that run process_pdf for queued uploads
+job_manager = JobManager(process_pdf, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+
+# Background workers that run process_batch for queued batch uploads
+batch_manager = JobManager(process_batch, workers=BATCH_JOB_WORKERS, max_queue=BATCH_QUEUE_SIZE)
+
+# Report queue depths at scrape time
+QUEUE_DEPTH.labels(queue='statements').set_function(job_manager.queue_depth)
+QUEUE_DEPTH.labels(queue='batches').set_function(batch_manager.queue_depth)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    """
+    Answer a request over its body limit (see UploadRequest) in JSON like the other API errors.
+    :return: JSON error response.
+    """
+    return jsonify({'error': 'Request is too large'}), 413
 
 @app.route('/')
 def index():
@@ -110,9 +498,13 @@ def index():
 @app.route('/upload-and-process', methods=['POST'])
 def upload_and_process_file():
     """
-    Handle file upload, process the PDF, and return the result.
-    :return: JSON response with the result of PDF processing.
+    Handle file upload and queue the PDF for background processing.
+    :return: JSON response with the job ID and status URL, or an error.
     """
+    # Reject an oversized upload by its declared length before the body is parsed
+    if request.content_length and request.content_length > MAX_CONTENT_LENGTH:
+        return jsonify({'error': 'File is too large'}), 413
+
     # Check if the file part is present in the request
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
@@ -127,22 +519,191 @@ def upload_and_process_file():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Only PDF files are allowed'}), 400
 
-    # Secure the filename and save the file
+    # Secure the filename; it is only used for reporting since the upload is kept in memory
     filename = secure_filename(file.filename)
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    source = None
     
     try:
-        file.save(file_path)
-        logging.info(f'File uploaded: {file_path}')
+        source = read_upload(file)
+        logging.info(f'File uploaded: {filename} ({"in memory" if isinstance(source, bytes) else source})')
 
-        # Process the PDF and get the result
-        result, status_code = process_pdf(file_path)
-        return jsonify(result), status_code
+        # Answer repeat uploads of the same file without processing them again
+        digest = content_hash(source)
+        earlier = find_by_hash(digest)
+        if earlier:
+            logging.info(f'{filename} was already processed as {digest}')
+            discard_upload(source)
+            return jsonify(duplicate_response(earlier, 'content_hash')), 200
+        job = job_manager.find_active(digest)
+        if job:
+            logging.info(f'{filename} is already being processed by job {job.id}')
+            discard_upload(source)
+            return jsonify({
+                'message': 'PDF is already being processed',
+                'job_id': job.id,
+                'status_url': f'/jobs/{job.id}'
+            }), 202
 
+        # Queue the PDF for processing and return immediately
+        job = job_manager.submit(filename, source, digest, key=digest)
+        return jsonify({
+            'message': 'PDF queued for processing',
+            'job_id': job.id,
+            'status_url': f'/jobs/{job.id}'
+        }), 202
+
+    except QueueFullError as e:
+        logging.warning(f'Rejecting upload: {e}')
+        discard_upload(source)
+        response = jsonify({'error': 'Server is busy processing other statements. Please retry shortly.'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
     except Exception as e:
         logging.error(f'Error processing file: {e}')
+        discard_upload(source)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload-batch', methods=['POST'])
+def upload_batch():
+    """
+    Handle a batch of statements, as several PDFs or ZIP archives of PDFs, and queue them for processing.
+    :return: JSON response with the job ID and status URL, or an error.
+    """
+    files = [file for file in request.files.getlist('files') + request.files.getlist('file') if file.filename]
+    if not files:
+        return jsonify({'error': 'No files in the request'}), 400
+
+    uploads = []
+    try:
+        for file in files:
+            if file.filename.lower().endswith('.zip'):
+                uploads.extend(read_zip(file))
+            elif allowed_file(file.filename):
+                uploads.append((secure_filename(file.filename), read_upload(file)))
+            else:
+                raise ValueError(f'{file.filename} is neither a PDF nor a ZIP archive')
+            if len(uploads) > BATCH_MAX_FILES:
+                raise ValueError(f'A batch may hold at most {BATCH_MAX_FILES} PDFs')
+        if not uploads:
+            raise ValueError('No PDF files found in the upload')
+        logging.info(f'Batch uploaded: {[filename for filename, _ in uploads]}')
+
+        job = batch_manager.submit(f'batch of {len(uploads)} files', uploads)
+        return jsonify({
+            'message': f'{len(uploads)} PDFs queued for processing',
+            'files': [filename for filename, _ in uploads],
+            'job_id': job.id,
+            'status_url': f'/jobs/{job.id}'
+        }), 202
+
+    except ValueError as e:
+        for _, source in uploads:
+            discard_upload(source)
+        return jsonify({'error': str(e)}), 400
+    except QueueFullError as e:
+        logging.warning(f'Rejecting batch upload: {e}')
+        for _, source in uploads:
+            discard_upload(source)
+        response = jsonify({'error': 'Server is busy processing other batches. Please retry shortly.'})
+        response.headers['Retry-After'] = '60'
+        return response, 503
+    except Exception as e:
+        logging.error(f'Error processing batch upload: {e}')
+        for _, source in uploads:
+            discard_upload(source)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Report the stage, progress and timings of an ingestion job.
+    :param job_id: Job identifier returned by /upload-and-process.
+    :return: JSON description of the job.
+    """
+    manager = job_manager if job_manager.get(job_id) else batch_manager
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+    status = job.to_dict()
+    status['queue_depth'] = manager.queue_depth()
+    return jsonify(status), 200
+
+@app.route('/jobs/<job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """
+    Queue a failed job again, resuming each failed statement from its checkpoint.
+    :param job_id: Identifier of the failed job.
+    :return: JSON response with the new job ID and status URL, or an error.
+    """
+    if job_manager.get(job_id):
+        manager, job = job_manager, job_manager.get(job_id)
+    else:
+        manager, job = batch_manager, batch_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job ID'}), 404
+
+    # A batch job fails per file: retry the files that failed with a server error
+    if manager is job_manager:
+        failed = [(job.filename, job.key)] if job.status == 'failed' and job.status_code >= 500 else []
+    else:
+        failed = [
+            (entry['filename'], entry['content_hash'])
+            for entry in (job.result or {}).get('files', []) if entry['status_code'] >= 500
+        ]
+    if job.finished_at is None or not failed:
+        return jsonify({'error': 'Only finished jobs with statements that failed with a server error can be retried'}), 409
+
+    checkpoints = [(filename, Checkpoint(digest)) for filename, digest in failed]
+    uploads = [(filename, checkpoint.source_path()) for filename, checkpoint in checkpoints if checkpoint.source_path()]
+    if not uploads:
+        return jsonify({'error': 'No checkpoint left to resume from; upload the statements again'}), 409
+
+    try:
+        if manager is job_manager:
+            filename, source = uploads[0]
+            active = job_manager.find_active(job.key)
+            retry = active or job_manager.submit(filename, source, job.key, key=job.key)
+        else:
+            retry = batch_manager.submit(f'retry of {len(uploads)} files', uploads)
+    except QueueFullError as e:
+        logging.warning(f'Rejecting retry of job {job_id}: {e}')
+        response = jsonify({'error': 'Server is busy processing other statements. Please retry shortly.'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    return jsonify({
+        'message': f'{len(uploads)} statements queued to resume from their checkpoints',
+        'resumes': {filename: checkpoint.stages() for filename, checkpoint in checkpoints if checkpoint.source_path()},
+        'job_id': retry.id,
+        'status_url': f'/jobs/{retry.id}'
+    }), 202
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Expose ingestion metrics in the Prometheus text format.
+    :return: Metrics response.
+    """
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+def start_classifier_training(debug):
+    """
+    Keep the local classifier learning from the labels of newly stored rows, in the serving process only.
+
+    With the reloader of debug mode the __main__ block runs in a watcher process and
+    again in the serving child, which Werkzeug marks with WERKZEUG_RUN_MAIN. Only the
+    child trains, so a single process reads new rows and replaces the model file.
+
+    :param debug: The app runs in debug mode, with the reloader.
+    :return: The training thread, or None if it was not started here.
+    """
+    if not LOCAL_CLASSIFIER_ENABLED or (debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'):
+        return None
+    thread = threading.Thread(target=local_classifier.refresh_periodically, name='local-classifier', daemon=True)
+    thread.start()
+    return thread
+
 # Run the Flask app
 if __name__ == '__main__':
+    start_classifier_training(debug=True)
     app.run(host="0.0.0.0", port=3002, debug=True)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Benchmarks run from the pdf_extraction directory; add the repository root for the shared modules in common/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -0,0 +1,88 @@
+"""
+Benchmark statement classification against the local fake OpenAI API.
+
+Compares wall-clock time and request counts for different worker counts and
+checks that every row gets back the label of its own description.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.bench_classification --rows 2000 --unique 400 --latency 0.3 --workers 1 4 8
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+import common.llm
+from benchmarks.fake_openai import KEYWORD_LABELS, fake_label, start_fake_openai
+import src.classification as classification
+from src.label_cache import LabelCache
+
+def synthetic_descriptions(rows, unique, seed=7):
+    """
+    Generate statement-like descriptions with a fixed number of distinct merchants.
+
+    :param rows: Number of descriptions to generate.
+    :param unique: Number of distinct merchants among them.
+    :param seed: Random seed so runs are comparable.
+    :return: List of description strings.
+    """
+    rng = random.Random(seed)
+    keywords = [keyword for keyword, _ in KEYWORD_LABELS] + ['ONLINE PURCHASE', 'PAYTM']
+    merchants = []
+    for _ in range(unique):
+        # Alphabetic store codes keep merchants distinct after reference numbers are normalized away
+        store = ''.join(rng.choice(string.ascii_uppercase) for _ in range(6))
+        merchants.append(f"{rng.choice(keywords)} {store}")
+    descriptions = []
+    for _ in range(rows):
+        reference = ''.join(rng.choice(string.digits) for _ in range(12))
+        descriptions.append(f"PCA:5000944243:{reference} {rng.choice(merchants)} {reference}-733608213111")
+    return descriptions
+
+def run(descriptions, workers, batch_size, server):
+    """
+    Classify descriptions with a cold cache and report timing and request counts.
+
+    :return: Dictionary of results for one worker count.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        classification.label_cache = LabelCache(os.path.join(cache_dir, 'labels.sqlite3'))
+        requests_before, connections_before = server.request_count, server.connection_count
+        start = time.perf_counter()
+        labels = classification.classify_descriptions(descriptions, batch_size=batch_size, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        mismatches = sum(1 for description, label in zip(descriptions, labels) if label != fake_label(description))
+        return {
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(len(descriptions) / elapsed, 1),
+            'requests': server.request_count - requests_before,
+            'connections': server.connection_count - connections_before,
+            'mismatched_labels': mismatches,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent description classification.')
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--unique', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.3, help='Injected API latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that get HTTP 429')
+    parser.add_argument('--batch-size', type=int, default=classification.CLASSIFY_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server = start_fake_openai(latency=args.latency, error_rate=args.error_rate)
+    common.llm.configure(api_key='fake-key', api_base=server.api_base)
+
+    descriptions = synthetic_descriptions(args.rows, args.unique)
+    print(f"{args.rows} rows, {args.unique} merchants, {args.latency}s latency, batch size {args.batch_size}")
+    print(f"{'workers':>8} {'seconds':>9} {'rows/sec':>10} {'requests':>9} {'connections':>12} {'mismatched':>11}")
+    for workers in args.workers:
+        result = run(descriptions, workers, args.batch_size, server)
+        print(f"{result['workers']:>8} {result['seconds']:>9} {result['rows_per_sec']:>10} "
+              f"{result['requests']:>9} {result['connections']:>12} {result['mismatched_labels']:>11}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+End-to-end ingestion benchmark: synthetic statements through process_pdf.
+
+Generates statements of the requested size and header layouts, serves the
+OpenAI API from the local fake (benchmarks.fake_openai) and writes to a fresh
+SQLite stand-in (benchmarks.sqlite_db) or to the MySQL database configured in
+.env. Reports pages/sec, rows/sec, peak RSS and the per-stage time recorded
+by src.metrics, saves the results as JSON and compares them with an earlier run.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.bench_ingest --statements 6 --pages 20 --layouts yes hdfc sbi unlabelled
+    python -m benchmarks.bench_ingest --pages 200 --latency 0.5 --compare latest
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from prometheus_client import REGISTRY
+from benchmarks.fake_openai import start_fake_openai
+from benchmarks.synthetic_pdf import HEADER_LAYOUTS, generate_statement, layout_header
+import benchmarks.sqlite_db as sqlite_db
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Settings that change the pipeline's behaviour, recorded with every run
+RECORDED_SETTINGS = [
+    'PDF_WORKERS', 'PDF_TABLE_BACKEND', 'PDF_PARALLEL_MIN_PAGES', 'PDF_STREAM_MIN_PAGES',
+    'CLASSIFY_BATCH_SIZE', 'CLASSIFY_WORKERS', 'DB_INSERT_CHUNK_SIZE', 'DB_INCREMENTAL_INGEST',
+]
+
+# Metrics compared between runs, with whether higher is better
+COMPARED = [
+    ('pages_per_sec', True), ('rows_per_sec', True), ('seconds', False),
+    ('peak_rss_mb', False), ('llm_requests', False),
+]
+
+def histogram_sums(name, label):
+    """
+    Read the running totals of a labelled histogram from the metrics registry.
+
+    :param name: Histogram name, e.g. 'ingest_stage_seconds'.
+    :param label: Label to key the totals by.
+    :return: Dictionary of label value to (sum of seconds, count).
+    """
+    totals = {}
+    for metric in REGISTRY.collect():
+        if metric.name != name:
+            continue
+        for sample in metric.samples:
+            key = sample.labels.get(label)
+            if sample.name == f'{name}_sum':
+                totals[key] = (sample.value, totals.get(key, (0.0, 0))[1])
+            elif sample.name == f'{name}_count':
+                totals[key] = (totals.get(key, (0.0, 0))[0], int(sample.value))
+    return totals
+
+def histogram_delta(before, after):
+    """
+    :return: Dictionary of label value to {'seconds', 'count'} accumulated between two readings.
+    """
+    delta = {}
+    for key, (seconds, count) in after.items():
+        previous_seconds, previous_count = before.get(key, (0.0, 0))
+        if count > previous_count:
+            delta[key] = {'seconds': round(seconds - previous_seconds, 3), 'count': count - previous_count}
+    return delta
+
+def peak_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def generate_corpus(workdir, statements, pages, rows_per_page, layouts):
+    """
+    Write the synthetic statements, cycling through the header layouts.
+
+    :return: List of (filename, layout, bytes) tuples.
+    """
+    corpus = []
+    for seed in range(statements):
+        layout = layouts[seed % len(layouts)]
+        path = os.path.join(workdir, f'statement_{seed}_{layout}.pdf')
+        generate_statement(path, pages=pages, rows_per_page=rows_per_page, seed=seed,
+                           header_lines=layout_header(layout, seed))
+        with open(path, 'rb') as pdf_file:
+            corpus.append((os.path.basename(path), layout, pdf_file.read()))
+    return corpus
+
+def run(corpus, workers, process_pdf):
+    """
+    Process the corpus with process_pdf, workers statements at a time.
+
+    :return: (wall-clock seconds, per-statement results)
+    """
+    def process(entry):
+        filename, layout, data = entry
+        start = time.perf_counter()
+        result, status_code = process_pdf(data)
+        return {
+            'file': filename,
+            'layout': layout,
+            'status_code': status_code,
+            'seconds': round(time.perf_counter() - start, 3),
+            'pages': result.get('pages', 0),
+            'rows': result.get('rows_inserted', 0),
+            'error': result.get('error'),
+        }
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        statements = list(executor.map(process, corpus))
+    return time.perf_counter() - start, statements
+
+def latest_result(directory):
+    paths = sorted(glob.glob(os.path.join(directory, 'ingest_*.json')))
+    return paths[-1] if paths else None
+
+def print_comparison(previous, current):
+    print(f"\nCompared with {previous['run_id']} ({previous.get('commit')}):")
+    print(f"{'metric':<16} {'before':>12} {'after':>12} {'change':>9}")
+    for metric, higher_is_better in COMPARED:
+        before, after = previous['totals'].get(metric), current['totals'].get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        better = change > 0 if higher_is_better else change < 0
+        marker = '' if abs(change) < 5 else (' better' if better else ' worse')
+        print(f'{metric:<16} {before:>12} {after:>12} {change:>+8.1f}%{marker}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark end-to-end statement ingestion.')
+    parser.add_argument('--statements', type=int, default=4)
+    parser.add_argument('--pages', type=int, default=20, help='Pages per statement')
+    parser.add_argument('--rows-per-page', type=int, default=35)
+    parser.add_argument('--layouts', nargs='+', default=['yes', 'hdfc', 'sbi', 'unlabelled'],
+                        choices=sorted(HEADER_LAYOUTS), help='Header layouts, cycled over the statements')
+    parser.add_argument('--workers', type=int, default=1, help='Statements processed at the same time')
+    parser.add_argument('--latency', type=float, default=0.3, help='Fake OpenAI latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake OpenAI requests that get HTTP 429')
+    parser.add_argument('--db', choices=['sqlite', 'mysql'], default='sqlite',
+                        help="'mysql' writes to the database configured in .env")
+    parser.add_argument('--label-cache', help='Label cache file to use (default: a fresh, cold cache)')
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--compare', help="Earlier result file to compare with, or 'latest'")
+    parser.add_argument('--no-save', action='store_true', help='Do not write the result file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The label cache is opened when src.label_cache is imported, so choose it before importing api
+        os.environ['LABEL_CACHE_PATH'] = args.label_cache or os.path.join(workdir, 'labels.sqlite3')
+        import api
+        import common.db
+        import common.llm
+
+        server = start_fake_openai(latency=args.latency, error_rate=args.error_rate)
+        common.llm.configure(api_key='benchmark', api_base=server.api_base)
+
+        if args.db == 'sqlite':
+            db_path = os.path.join(workdir, 'ingest.sqlite3')
+            sqlite_db.create_schema(db_path)
+            common.db.set_connection_factory(sqlite_db.connection_factory(db_path))
+
+        print(f'Generating {args.statements} statements of {args.pages} pages ({", ".join(args.layouts)})...')
+        corpus = generate_corpus(workdir, args.statements, args.pages, args.rows_per_page, args.layouts)
+
+        stages_before = histogram_sums('ingest_stage_seconds', 'stage')
+        llm_before = histogram_sums('llm_request_seconds', 'purpose')
+        requests_before = server.request_count
+        seconds, statements = run(corpus, args.workers, api.process_pdf)
+        # Read peak RSS before any other subprocess starts: a forked child inherits the high-water mark
+        peak_rss = peak_rss_mb(resource.RUSAGE_SELF), peak_rss_mb(resource.RUSAGE_CHILDREN)
+        stages = histogram_delta(stages_before, histogram_sums('ingest_stage_seconds', 'stage'))
+        llm = histogram_delta(llm_before, histogram_sums('llm_request_seconds', 'purpose'))
+
+        stored_rows = sqlite_db.table_count(db_path, 'Transaction_Info') if args.db == 'sqlite' else None
+
+    pages = sum(statement['pages'] for statement in statements)
+    rows = sum(statement['rows'] for statement in statements)
+    result = {
+        'run_id': datetime.now().strftime('%Y%m%d-%H%M%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'config': dict(vars(args), settings={name: os.getenv(name) for name in RECORDED_SETTINGS}),
+        'totals': {
+            'statements': len(statements),
+            'failed': sum(1 for statement in statements if statement['status_code'] >= 400),
+            'pages': pages,
+            'rows': rows,
+            'stored_rows': stored_rows,
+            'seconds': round(seconds, 3),
+            'pages_per_sec': round(pages / seconds, 2) if seconds else None,
+            'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+            'peak_rss_mb': peak_rss[0],
+            'children_peak_rss_mb': peak_rss[1],
+            'llm_requests': server.request_count - requests_before,
+        },
+        'stages': stages,
+        'llm': llm,
+        'statements': statements,
+    }
+
+    totals = result['totals']
+    print(f"{'file':<32} {'status':>6} {'pages':>6} {'rows':>6} {'seconds':>8}")
+    for statement in statements:
+        print(f"{statement['file']:<32} {statement['status_code']:>6} {statement['pages']:>6} "
+              f"{statement['rows']:>6} {statement['seconds']:>8.2f}" + (f"  {statement['error']}" if statement['error'] else ''))
+    print(f"\n{totals['statements']} statements ({totals['failed']} failed), {pages} pages, {rows} rows "
+          f"in {totals['seconds']}s: {totals['pages_per_sec']} pages/sec, {totals['rows_per_sec']} rows/sec")
+    print(f"Peak RSS {totals['peak_rss_mb']} MB (pool workers {totals['children_peak_rss_mb']} MB), "
+          f"{totals['llm_requests']} OpenAI requests")
+    print(f"\n{'stage':<18} {'seconds':>9} {'count':>6}")
+    for stage, timing in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+        print(f"{stage:<18} {timing['seconds']:>9.3f} {timing['count']:>6}")
+
+    previous_path = latest_result(args.results_dir) if args.compare == 'latest' else args.compare
+    if previous_path:
+        with open(previous_path) as previous_file:
+            print_comparison(json.load(previous_file), result)
+
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        path = os.path.join(args.results_dir, f"ingest_{result['run_id']}.json")
+        with open(path, 'w') as result_file:
+            json.dump(result, result_file, indent=2)
+        print(f'\nResults saved to {path}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the local description classifier against labels it has not seen.
+
+Trains incrementally on synthetic descriptions labelled by the fake OpenAI
+API's rules and evaluates on merchants held out of training, reporting overall
+accuracy, how many rows clear the confidence threshold (and so skip the API),
+the accuracy of those rows, and prediction latency.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.bench_local_classifier --rows 20000 --unique 2000 --thresholds 0.6 0.8 0.9
+"""
+import argparse
+import time
+from benchmarks.bench_classification import synthetic_descriptions
+from benchmarks.fake_openai import fake_label
+from src.label_cache import normalize_description
+from src.local_classifier import LOCAL_CLASSIFIER_THRESHOLD, TRAIN_BATCH_SIZE, LocalClassifier
+
+def split_by_merchant(descriptions, test_share):
+    """
+    Split descriptions so no merchant appears in both sets.
+
+    :param descriptions: List of raw descriptions.
+    :param test_share: Approximate share of merchants held out for evaluation.
+    :return: (train, test) lists of descriptions.
+    """
+    step = max(2, round(1 / test_share))
+    train, test = [], []
+    for description in descriptions:
+        merchant = normalize_description(description) or description
+        (test if sum(map(ord, merchant)) % step == 0 else train).append(description)
+    return train, test
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the local description classifier.')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--unique', type=int, default=2000)
+    parser.add_argument('--test-share', type=float, default=0.2, help='Share of merchants held out of training')
+    parser.add_argument('--batch-size', type=int, default=TRAIN_BATCH_SIZE, help='Rows per partial_fit call')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[LOCAL_CLASSIFIER_THRESHOLD])
+    args = parser.parse_args()
+
+    train, test = split_by_merchant(synthetic_descriptions(args.rows, args.unique), args.test_share)
+    classifier = LocalClassifier(path=None, min_rows=0)
+    start = time.perf_counter()
+    for offset in range(0, len(train), args.batch_size):
+        batch = train[offset:offset + args.batch_size]
+        classifier.partial_fit(batch, [fake_label(description) for description in batch])
+    training_seconds = time.perf_counter() - start
+
+    expected = [fake_label(description) for description in test]
+    start = time.perf_counter()
+    predictions = classifier.predict(test)
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for description in test[:1000]:
+        classifier.predict([description])
+    single_seconds = (time.perf_counter() - start) / min(len(test), 1000)
+
+    accuracy = sum(1 for (label, _), truth in zip(predictions, expected) if label == truth) / len(test)
+    print(f"{len(train)} training rows, {len(test)} held-out rows, trained in {training_seconds:.2f}s")
+    print(f"accuracy {accuracy:.3f}, {batch_seconds / len(test) * 1e6:.1f}us per row in one batch, "
+          f"{single_seconds * 1e6:.1f}us for a single row")
+    print(f"{'threshold':>10} {'coverage':>9} {'confident accuracy':>19}")
+    for threshold in args.thresholds:
+        confident = [(label, truth) for (label, probability), truth in zip(predictions, expected) if probability >= threshold]
+        coverage = len(confident) / len(test)
+        correct = sum(1 for label, truth in confident if label == truth) / len(confident) if confident else 0.0
+        print(f"{threshold:>10.2f} {coverage:>9.3f} {correct:>19.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark vectorized transaction normalization against the per-row path.
+
+Builds a PdfToTable-shaped DataFrame of synthetic rows (with a share of
+invalid ones), normalizes it both ways and checks the outputs agree.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.bench_normalize --rows 10000 100000
+"""
+import argparse
+import time
+import pandas as pd
+from benchmarks.synthetic_pdf import COLUMNS, synthetic_transactions
+from src.insert_db import convert_date_format, convert_decimal_value, filter_valid_transactions
+from src.normalize import normalize_transactions
+
+def synthetic_frame(rows, invalid_share=0.02):
+    """
+    Build a DataFrame shaped like PdfToTable output, with some blank cells.
+
+    :param rows: Number of rows.
+    :param invalid_share: Fraction of rows with a blank required cell.
+    :return: DataFrame keyed by the statement column headers.
+    """
+    df = pd.DataFrame(synthetic_transactions(rows), columns=[title for title, _ in COLUMNS])
+    step = int(1 / invalid_share) if invalid_share else 0
+    if step:
+        df.loc[::step, 'Debit'] = ''
+    return df
+
+def per_row(df):
+    """
+    The original path: records, filter_valid_transactions, per-field conversion.
+    """
+    records = filter_valid_transactions(df.to_dict(orient='records'))
+    return [
+        (
+            convert_date_format(record.get('Transaction\nDate', '')),
+            convert_date_format(record.get('ValueDate', '')),
+            record.get('Description', ''),
+            convert_decimal_value(record.get('Debit', '0')),
+            convert_decimal_value(record.get('Credit', '0')),
+            convert_decimal_value(record.get('Balance', '0')),
+        )
+        for record in records
+    ]
+
+def vectorized(df):
+    """
+    The normalization stage followed by the conversion to records that process_pdf does.
+    """
+    records = normalize_transactions(df).to_dict(orient='records')
+    return [
+        (record['TransactionDate'], record['ValueDate'], record['Description'],
+         record['Debit'], record['Credit'], record['Balance'])
+        for record in records
+    ]
+
+def best_time(func, df, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorized transaction normalization.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'per-row s':>10} {'vectorized s':>13} {'speedup':>8} {'same output':>12}")
+    for rows in args.rows:
+        df = synthetic_frame(rows)
+        row_seconds, row_output = best_time(per_row, df, args.repeat)
+        vector_seconds, vector_output = best_time(vectorized, df, args.repeat)
+        print(f"{rows:>8} {row_seconds:>10.3f} {vector_seconds:>13.3f} {row_seconds / vector_seconds:>8.1f} "
+              f"{str(row_output == vector_output):>12}")
+
+if __name__ == '__main__':
+    main()
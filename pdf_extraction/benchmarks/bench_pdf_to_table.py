@@ -0,0 +1,65 @@
+"""
+Benchmark PdfToTable with different worker counts.
+
+Uses the given statement PDFs, or generates synthetic statements of the
+requested page counts, and checks that parallel output matches the
+sequential output row for row.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.bench_pdf_to_table --pages 50 150 300 --workers 1 2 4
+    python -m benchmarks.bench_pdf_to_table --files statements/*.pdf --workers 1 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.synthetic_pdf import generate_statement
+import src.transaction as transaction
+
+def time_extraction(path, workers, repeat):
+    """
+    Run PdfToTable and return the best wall-clock time and the DataFrame.
+    """
+    best = None
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = transaction.PdfToTable(path, workers=workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel PDF table extraction.')
+    parser.add_argument('--files', nargs='*', default=[], help='Statement PDFs to benchmark')
+    parser.add_argument('--pages', type=int, nargs='*', default=[50, 150, 300], help='Synthetic statement sizes')
+    parser.add_argument('--rows-per-page', type=int, default=35)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per configuration; the best time is kept')
+    args = parser.parse_args()
+
+    # Parallel extraction is what is being measured, so never fall back to in-process for short files
+    transaction.PDF_PARALLEL_MIN_PAGES = 1
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = list(args.files)
+        if not paths:
+            for pages in args.pages:
+                path = os.path.join(workdir, f'synthetic_{pages}p.pdf')
+                generate_statement(path, pages=pages, rows_per_page=args.rows_per_page)
+                paths.append(path)
+
+        print(f"{'file':<32} {'pages':>6} {'workers':>8} {'seconds':>9} {'pages/sec':>10} {'speedup':>8} {'same rows':>10}")
+        for path in paths:
+            baseline_seconds, baseline_df = None, None
+            for workers in args.workers:
+                seconds, df = time_extraction(path, workers, args.repeat)
+                if baseline_df is None:
+                    baseline_seconds, baseline_df = seconds, df
+                with transaction.pdfplumber.open(path) as pdf:
+                    pages = len(pdf.pages)
+                print(f"{os.path.basename(path):<32} {pages:>6} {workers:>8} {seconds:>9.2f} "
+                      f"{pages / seconds:>10.1f} {baseline_seconds / seconds:>8.2f} {str(df.equals(baseline_df)):>10}")
+
+if __name__ == '__main__':
+    main()
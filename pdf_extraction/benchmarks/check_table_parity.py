@@ -0,0 +1,99 @@
+"""
+Check that the pymupdf table backend returns the same rows as pdfplumber.
+
+Runs both backends over every PDF in a corpus directory (or a generated
+synthetic corpus), compares the tables cell by cell after whitespace
+normalization, and reports timings. Exits non-zero if any file differs.
+
+Run from the pdf_extraction directory:
+    python -m benchmarks.check_table_parity statements/
+    python -m benchmarks.check_table_parity --synthetic 5
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from benchmarks.synthetic_pdf import generate_statement
+from src.document import StatementDocument
+
+def normalized_rows(df):
+    """
+    Normalize a table for comparison: header and cells with whitespace collapsed.
+
+    :param df: Extracted DataFrame.
+    :return: (header tuple, list of row tuples)
+    """
+    def clean(value):
+        return ' '.join(str(value).split()) if value is not None else ''
+    header = tuple(clean(column) for column in df.columns)
+    rows = [tuple(clean(value) for value in row) for row in df.itertuples(index=False, name=None)]
+    return header, rows
+
+def compare(path):
+    """
+    Extract one PDF with both backends and compare the results.
+
+    :param path: Path to the PDF.
+    :return: Dictionary with timings, row counts and the first differences found.
+    """
+    timings = {}
+    tables = {}
+    with StatementDocument(path) as document:
+        for backend in ('pdfplumber', 'pymupdf'):
+            start = time.perf_counter()
+            tables[backend] = normalized_rows(document.table(workers=1, backend=backend))
+            timings[backend] = time.perf_counter() - start
+
+    (plumber_header, plumber_rows), (fitz_header, fitz_rows) = tables['pdfplumber'], tables['pymupdf']
+    differences = []
+    if plumber_header != fitz_header:
+        differences.append(f'header: {plumber_header} != {fitz_header}')
+    if len(plumber_rows) != len(fitz_rows):
+        differences.append(f'row count: {len(plumber_rows)} != {len(fitz_rows)}')
+    for index, (plumber_row, fitz_row) in enumerate(zip(plumber_rows, fitz_rows)):
+        if plumber_row != fitz_row:
+            differences.append(f'row {index}: {plumber_row} != {fitz_row}')
+    return {
+        'file': os.path.basename(path),
+        'rows': len(plumber_rows),
+        'pdfplumber_seconds': timings['pdfplumber'],
+        'pymupdf_seconds': timings['pymupdf'],
+        'differences': differences,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare pdfplumber and pymupdf table extraction.')
+    parser.add_argument('corpus', nargs='?', help='Directory of statement PDFs')
+    parser.add_argument('--synthetic', type=int, default=0, help='Generate this many synthetic statements instead')
+    parser.add_argument('--pages', type=int, default=10, help='Pages per synthetic statement')
+    parser.add_argument('--show', type=int, default=5, help='Differences to print per file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.corpus:
+            paths = sorted(glob.glob(os.path.join(args.corpus, '*.pdf')))
+        else:
+            paths = []
+            for seed in range(max(args.synthetic, 1)):
+                path = os.path.join(workdir, f'synthetic_{seed}.pdf')
+                generate_statement(path, pages=args.pages, seed=seed)
+                paths.append(path)
+
+        failures = 0
+        print(f"{'file':<32} {'rows':>6} {'pdfplumber s':>13} {'pymupdf s':>10} {'match':>6}")
+        for path in paths:
+            result = compare(path)
+            match = not result['differences']
+            failures += 0 if match else 1
+            print(f"{result['file']:<32} {result['rows']:>6} {result['pdfplumber_seconds']:>13.2f} "
+                  f"{result['pymupdf_seconds']:>10.2f} {str(match):>6}")
+            for difference in result['differences'][:args.show]:
+                print(f'    {difference}')
+
+    print(f'{len(paths) - failures}/{len(paths)} files match')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Labels descriptions with simple keyword rules after an injected delay so the
+classification pipeline can be benchmarked without network access or cost.
+Header extraction prompts get a JSON answer with placeholder values.
+
+Run standalone with:
+    python -m benchmarks.fake_openai --port 8765 --latency 0.3
+and point the apps at it with OPENAI_API_BASE=http://127.0.0.1:8765/v1.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keyword rules used to label descriptions, checked in order
+KEYWORD_LABELS = [
+    ('SWIGGY', 'Food'), ('ZOMATO', 'Food'), ('KFC', 'Food'), ('DOMINOS', 'Food'),
+    ('INDIAN OIL', 'Fuel'), ('BHARAT PETROLEUM', 'Fuel'), ('HPCL', 'Fuel'),
+    ('EMI', 'EMI'), ('LOAN', 'EMI'),
+    ('BIG BAZAAR', 'Super Market'), ('DMART', 'Super Market'), ('RELIANCE FRESH', 'Super Market'),
+    ('IMPS', 'IPMS'),
+    ('IRCTC', 'Travel'), ('INDIGO', 'Travel'), ('APSRTC', 'Travel'), ('UBER', 'Travel'),
+]
+
+# Matches one numbered description line of a batch request
+numbered_line_pattern = re.compile(r'^\s*(\d+)\.\s*(.*)$')
+
+# Matches one '"Field": "<value>"' line of the header extraction prompt template
+entity_field_pattern = re.compile(r'^\s*"(\w+)": "<value>"', re.MULTILINE)
+
+def fake_label(description):
+    """
+    Label a description with the keyword rules.
+
+    :param description: Description text.
+    :return: Label string.
+    """
+    upper = description.upper()
+    for keyword, label in KEYWORD_LABELS:
+        if keyword in upper:
+            return label
+    return 'Others'
+
+def fake_entities(prompt):
+    """
+    Answer a header extraction prompt with placeholder values derived from the prompt text.
+
+    :param prompt: Extraction prompt built by src.info.build_prompt.
+    :return: JSON answer text.
+    """
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    entities = {}
+    for field in entity_field_pattern.findall(prompt):
+        if field == 'AccountNo':
+            entities[field] = str(int(digest[:12], 16))[:14]
+        elif field == 'IFSC':
+            entities[field] = 'FAKE0' + digest[:6].upper()
+        else:
+            entities[field] = f'{field.upper()}{digest[:8].upper()}'
+    return json.dumps(entities)
+
+def fake_answer(messages):
+    """
+    Build the answer the real model is expected to give for a request.
+
+    :param messages: Chat messages of the request.
+    :return: Answer text.
+    """
+    user_content = messages[-1]['content']
+    if entity_field_pattern.search(user_content):
+        return fake_entities(user_content)
+    numbered = [numbered_line_pattern.match(line) for line in user_content.splitlines()]
+    numbered = [match for match in numbered if match]
+    if numbered:
+        return "\n".join(f"{match.group(1)}. {fake_label(match.group(2))}" for match in numbered)
+    return fake_label(user_content)
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Handles POST /v1/chat/completions with an injected delay.
+    """
+
+    # Keep connections open between requests, as the real API does
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connection_count += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.latency * 0.1)))
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(429, {'error': {'message': 'Rate limit reached (injected)', 'type': 'requests'}})
+            return
+
+        messages = body.get('messages', [])
+        answer = fake_answer(messages)
+        prompt_tokens = sum(len(message.get('content', '')) for message in messages) // 4
+        self._send(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'gpt-3.5-turbo'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': answer},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': len(answer) // 4,
+                'total_tokens': prompt_tokens + len(answer) // 4
+            }
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+def start_fake_openai(port=0, latency=0.3, error_rate=0.0):
+    """
+    Start the fake API on a background thread.
+
+    :param port: Port to listen on (0 picks a free port).
+    :param latency: Mean delay in seconds added to every request.
+    :param error_rate: Fraction of requests answered with HTTP 429.
+    :return: The running server; its api_base attribute is the URL to pass to common.llm.configure.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.request_count = 0
+    server.connection_count = 0
+    server.stats_lock = threading.Lock()
+    server.api_base = f'http://127.0.0.1:{server.server_address[1]}/v1'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local fake OpenAI chat completions API.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.3, help='Mean response delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that get HTTP 429')
+    args = parser.parse_args()
+
+    fake_server = start_fake_openai(args.port, args.latency, args.error_rate)
+    print(f'Fake OpenAI API listening on {fake_server.api_base}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake_server.shutdown()
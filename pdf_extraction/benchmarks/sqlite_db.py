@@ -0,0 +1,156 @@
+"""
+SQLite stand-in for the MySQL database, for benchmarks without a MySQL server.
+
+Wraps sqlite3 connections so the MySQL-flavoured statements in src.insert_db
+and src.dedup run unchanged: %s placeholders become ?, and
+INSERT ... ON DUPLICATE KEY UPDATE becomes INSERT OR IGNORE (existing rows are
+kept as they are rather than updated, which is all the benchmark needs).
+
+Use with common.db.set_connection_factory(connection_factory(path)).
+"""
+import sqlite3
+
+# Tables of db/create_db.sql that ingestion writes to, in SQLite syntax, and their initial rows
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS Personal_Info (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        BankName TEXT NOT NULL,
+        PersonName TEXT NOT NULL,
+        BranchName TEXT NOT NULL,
+        PersonAddress TEXT,
+        BankAddress TEXT,
+        AccountNo TEXT UNIQUE NOT NULL,
+        IFSC TEXT NOT NULL,
+        CustomerID TEXT UNIQUE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Transaction_Info (
+        ID INTEGER,
+        BankName TEXT,
+        PersonName TEXT,
+        AccountNo TEXT,
+        TransactionDate TEXT,
+        ValueDate TEXT,
+        Description TEXT,
+        Debit REAL,
+        Credit REAL,
+        Balance REAL,
+        label TEXT,
+        LabelSource TEXT,
+        RowHash TEXT,
+        RowID INTEGER PRIMARY KEY AUTOINCREMENT,
+        UNIQUE (AccountNo, RowHash)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Statement_Upload (
+        ContentHash TEXT PRIMARY KEY,
+        AccountNo TEXT,
+        PeriodStart TEXT,
+        PeriodEnd TEXT,
+        RowCount INTEGER,
+        Result TEXT,
+        CreatedAt TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (AccountNo, PeriodStart, PeriodEnd)
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS Data_Version (ID INTEGER PRIMARY KEY, Version INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO Data_Version (ID, Version) VALUES (1, 0)",
+]
+
+def translate(query):
+    """
+    Rewrite a MySQL statement for SQLite.
+
+    :param query: Statement with %s placeholders.
+    :return: Equivalent SQLite statement.
+    """
+    if 'ON DUPLICATE KEY UPDATE' in query:
+        query = query.split('ON DUPLICATE KEY UPDATE')[0].replace('INSERT INTO', 'INSERT OR IGNORE INTO', 1)
+    return query.replace('%s', '?')
+
+class SQLiteCursor:
+    """
+    Cursor usable as a context manager, like mysql.connector cursors.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate(query), tuple(params))
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(translate(query), [tuple(row) for row in rows])
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class SQLiteConnection:
+    """
+    The part of the mysql.connector connection interface ingestion uses.
+    """
+
+    def __init__(self, path):
+        # A generous busy timeout lets concurrent benchmark workers queue for the write lock
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+
+    def cursor(self):
+        return SQLiteCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+def create_schema(path):
+    """
+    Create the ingestion tables in a SQLite file.
+
+    :param path: SQLite database file.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+def connection_factory(path):
+    """
+    :param path: SQLite database file with the schema created.
+    :return: Callable returning a new SQLiteConnection, for set_connection_factory.
+    """
+    return lambda: SQLiteConnection(path)
+
+def table_count(path, table):
+    """
+    :return: Number of rows in a table of the SQLite file.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
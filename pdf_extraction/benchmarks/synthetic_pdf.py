@@ -0,0 +1,218 @@
+"""
+Generate synthetic bank statement PDFs for benchmarks.
+
+Each page carries one ruled transaction table with the same columns as the
+statements PdfToTable is written for; the first page also carries a header block
+in one of several bank layouts (HEADER_LAYOUTS).
+
+Run standalone with:
+    python -m benchmarks.synthetic_pdf --pages 100 --rows-per-page 35 --output statement.pdf
+"""
+import argparse
+import random
+from datetime import date, timedelta
+import fitz
+
+# Column headers and widths in points; "Transaction\nDate" wraps like on real statements
+COLUMNS = [
+    ('Transaction\nDate', 62),
+    ('ValueDate', 62),
+    ('Description', 215),
+    ('Debit', 60),
+    ('Credit', 60),
+    ('Balance', 66),
+]
+
+# Merchants used for synthetic descriptions
+MERCHANTS = [
+    'SWIGGY BANGALORE', 'ZOMATO ONLINE ORDER', 'INDIAN OIL FUELING STATION', 'BHARAT PETROLEUM',
+    'BIG BAZAAR SUPERMARKET', 'RELIANCE FRESH SERVICESP', 'IRCTC RAIL BOOKING', 'INDIGO AIRLINES',
+    'EMI PAYMENT LOAN', 'IMPS TRANSFER HDFC BANK', 'ONLINE PURCHASE TRANSACTION', 'PAYTM WALLET',
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LEFT_MARGIN = 15
+ROW_HEIGHT = 18
+HEADER_HEIGHT = 24
+FONT_SIZE = 6.5
+
+def synthetic_transactions(count, seed=7, start=date(2020, 1, 1)):
+    """
+    Generate transaction rows with a consistent running balance.
+
+    :param count: Number of transactions.
+    :param seed: Random seed so runs are reproducible.
+    :param start: Date of the first transaction.
+    :return: List of row tuples matching COLUMNS.
+    """
+    rng = random.Random(seed)
+    balance = 50000.0
+    current = start
+    rows = []
+    for _ in range(count):
+        current += timedelta(days=rng.choice([0, 0, 1, 1, 2]))
+        reference = ''.join(rng.choice('0123456789') for _ in range(12))
+        description = f"PCA:5000944243:{reference} {rng.choice(MERCHANTS)}"
+        amount = round(rng.uniform(50, 5000), 2)
+        if rng.random() < 0.2:
+            balance += amount
+            debit, credit = 0.0, amount
+        else:
+            balance -= amount
+            debit, credit = amount, 0.0
+        day = current.strftime('%d/%m/%Y')
+        rows.append((day, day, description, f"{debit:,.2f}", f"{credit:,.2f}", f"{balance:,.2f}"))
+    return rows
+
+def draw_table(page, top, rows):
+    """
+    Draw a ruled table with a header row and the given rows.
+
+    :param page: PyMuPDF page.
+    :param top: Y coordinate of the table's top edge.
+    :param rows: Row tuples matching COLUMNS.
+    """
+    x_edges = [LEFT_MARGIN]
+    for _, width in COLUMNS:
+        x_edges.append(x_edges[-1] + width)
+    y_edges = [top, top + HEADER_HEIGHT]
+    for _ in rows:
+        y_edges.append(y_edges[-1] + ROW_HEIGHT)
+
+    for y in y_edges:
+        page.draw_line((x_edges[0], y), (x_edges[-1], y), width=0.5)
+    for x in x_edges:
+        page.draw_line((x, y_edges[0]), (x, y_edges[-1]), width=0.5)
+
+    for column, (title, _) in enumerate(COLUMNS):
+        for line_no, line in enumerate(title.split('\n')):
+            page.insert_text((x_edges[column] + 2, top + 9 + line_no * 9), line, fontsize=FONT_SIZE)
+    for row_no, row in enumerate(rows):
+        y = y_edges[row_no + 1] + 11
+        for column, value in enumerate(row):
+            page.insert_text((x_edges[column] + 2, y), value, fontsize=FONT_SIZE)
+
+def write_header(page, header_lines):
+    """
+    Write the statement header block at the top of the first page.
+
+    :param page: PyMuPDF page.
+    :param header_lines: Lines of header text.
+    :return: Y coordinate below the header.
+    """
+    y = 30
+    for line in header_lines:
+        page.insert_text((LEFT_MARGIN, y), line, fontsize=8)
+        y += 11
+    return y + 10
+
+def default_header():
+    """
+    :return: Header lines of a typical statement.
+    """
+    return [
+        'YES BANK',
+        'Statement of Account',
+        'Name : MRS.K GEETHANJALI',
+        'Address : 12 MG ROAD, BANGALORE 560001',
+        'Customer ID : 5000944243',
+        'Account No : 063991900002710',
+        'Branch : MG ROAD BANGALORE',
+        'IFSC : YESB0000639',
+    ]
+
+# Header layouts keyed by name. {account}, {customer}, {start} and {end} are filled per
+# statement; 'unlabelled' has no field labels, so header extraction falls back to the LLM.
+HEADER_LAYOUTS = {
+    'yes': [
+        'YES BANK',
+        'Statement of Account',
+        'Name : MRS.K GEETHANJALI',
+        'Address : 12 MG ROAD, BANGALORE 560001',
+        'Customer ID : {customer}',
+        'Account No : {account}',
+        'Branch : MG ROAD BANGALORE',
+        'IFSC : YESB0000639',
+    ],
+    'hdfc': [
+        'HDFC BANK Ltd.',
+        'Account Branch : KORAMANGALA',
+        'MR RAHUL SHARMA',
+        'Address : 45 HOSUR ROAD, BANGALORE 560034',
+        'Cust ID : {customer}',
+        'Account No : {account}',
+        'RTGS/NEFT IFSC : HDFC0000053',
+        'Statement From : {start} To : {end}',
+    ],
+    'sbi': [
+        'STATE BANK OF INDIA',
+        'Account Name : MS ANITA RAO',
+        'Address : 7 PARK STREET, KOLKATA 700016',
+        'CIF No. : {customer}',
+        'Account Number : {account}',
+        'Branch : PARK STREET',
+        'IFS Code : SBIN0000120',
+        'Statement Period : {start} to {end}',
+    ],
+    'unlabelled': [
+        'ACCOUNT STATEMENT',
+        'MR VIKRAM SINGH',
+        '22 LAKE VIEW, PUNE 411001',
+        '{account}',
+        '{start} - {end}',
+    ],
+}
+
+def layout_header(layout, seed):
+    """
+    Fill a header layout with an account and customer ID derived from the seed.
+
+    :param layout: Key of HEADER_LAYOUTS.
+    :param seed: Statement seed; different seeds give different accounts.
+    :return: Header lines with {start} and {end} left for generate_statement.
+    """
+    rng = random.Random(seed)
+    account = ''.join(rng.choice('0123456789') for _ in range(15))
+    customer = ''.join(rng.choice('0123456789') for _ in range(10))
+    return [line.replace('{account}', account).replace('{customer}', customer) for line in HEADER_LAYOUTS[layout]]
+
+def generate_statement(path, pages=50, rows_per_page=35, seed=7, header_lines=None):
+    """
+    Write a synthetic statement PDF.
+
+    :param path: Output file path.
+    :param pages: Number of pages.
+    :param rows_per_page: Transactions per page (the first page holds fewer to fit the header).
+    :param seed: Random seed so runs are reproducible.
+    :param header_lines: Header text for the first page (defaults to default_header()); {start} and
+                         {end} are replaced by the first and last transaction dates.
+    :return: Number of transaction rows written.
+    """
+    header_lines = header_lines if header_lines is not None else default_header()
+    first_page_rows = max(1, rows_per_page - len(header_lines) // 2 - 1)
+    transactions = synthetic_transactions(first_page_rows + rows_per_page * (pages - 1), seed)
+    header_lines = [
+        line.replace('{start}', transactions[0][0]).replace('{end}', transactions[-1][0]) for line in header_lines
+    ]
+
+    document = fitz.open()
+    position = 0
+    for page_no in range(pages):
+        page = document.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        top = write_header(page, header_lines) if page_no == 0 else 30
+        count = first_page_rows if page_no == 0 else rows_per_page
+        draw_table(page, top, transactions[position:position + count])
+        position += count
+    document.save(path)
+    document.close()
+    return len(transactions)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic bank statement PDF.')
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=35)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='synthetic_statement.pdf')
+    args = parser.parse_args()
+    rows = generate_statement(args.output, args.pages, args.rows_per_page, args.seed)
+    print(f'Wrote {args.pages} pages, {rows} transactions to {args.output}')
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import shutil
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Persist each ingestion stage so a failed statement resumes where it stopped
+CHECKPOINTS_ENABLED = os.getenv('INGEST_CHECKPOINTS', '1') == '1'
+
+# Directory holding one checkpoint directory per statement, named by its content hash
+CHECKPOINT_DIR = os.getenv('INGEST_CHECKPOINT_DIR', 'checkpoints')
+
+# Checkpoints of statements nobody retried are removed after this many seconds
+CHECKPOINT_RETENTION = int(os.getenv('INGEST_CHECKPOINT_RETENTION', 7 * 24 * 3600))
+
+# Stage files in pipeline order: snapshots are JSON documents, logs are appended to as work completes
+SNAPSHOTS = ['header', 'rows']
+LOGS = ['pages', 'labels', 'inserted']
+SOURCE_FILE = 'source.pdf'
+
+class Checkpoint:
+    """
+    On-disk progress of one statement's ingestion, keyed by its content hash.
+
+    The header entities and the normalized rows are saved as snapshots once their
+    stage completes. Streamed pages, assigned labels and committed insert chunks
+    are appended to logs as each piece completes, so a failure loses at most the
+    piece in flight. A failed statement also keeps its PDF here for a retry.
+    """
+
+    def __init__(self, digest, root=CHECKPOINT_DIR):
+        """
+        :param digest: Content hash of the statement.
+        :param root: Directory holding the checkpoints.
+        """
+        self.digest = digest
+        self.path = os.path.join(root, digest)
+        self._terminated = set()
+
+    def _file(self, name, extension='json'):
+        return os.path.join(self.path, f'{name}.{extension}')
+
+    def load(self, stage):
+        """
+        Read a stage snapshot.
+
+        :param stage: Stage name from SNAPSHOTS.
+        :return: The saved data, or None if the stage has not completed.
+        """
+        try:
+            with open(self._file(stage)) as snapshot:
+                return json.load(snapshot)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logging.warning(f'Ignoring unreadable {stage} checkpoint of {self.digest}: {e}')
+            return None
+
+    def save(self, stage, data):
+        """
+        Write a stage snapshot atomically.
+
+        :param stage: Stage name from SNAPSHOTS.
+        :param data: JSON-serializable stage result.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        temporary = self._file(stage, 'tmp')
+        with open(temporary, 'w') as snapshot:
+            json.dump(data, snapshot)
+        os.replace(temporary, self._file(stage))
+
+    def append(self, log, record):
+        """
+        Append a record to a stage log.
+
+        :param log: Log name from LOGS.
+        :param record: JSON-serializable record.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(log, 'jsonl')
+        with open(path, 'a+b') as log_file:
+            # A crash mid-write leaves a partial last line; start a new line after it
+            if log not in self._terminated:
+                if log_file.tell() > 0:
+                    log_file.seek(-1, os.SEEK_END)
+                    if log_file.read(1) != b'\n':
+                        log_file.write(b'\n')
+                self._terminated.add(log)
+            log_file.write(json.dumps(record).encode('utf-8') + b'\n')
+
+    def records(self, log):
+        """
+        Read a stage log lazily, skipping a partially written line.
+
+        :param log: Log name from LOGS.
+        :return: Generator of records in the order they were appended.
+        """
+        try:
+            log_file = open(self._file(log, 'jsonl'), 'rb')
+        except FileNotFoundError:
+            return
+        with log_file:
+            for line in log_file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logging.warning(f'Skipping a partial {log} checkpoint record of {self.digest}')
+
+    def labels(self):
+        """
+        :return: Dictionary of row fingerprint to [label, label source] for the rows classified so far.
+        """
+        labels = {}
+        for record in self.records('labels'):
+            labels.update(record)
+        return labels
+
+    def inserted(self):
+        """
+        :return: Set of the row fingerprints in committed insert chunks.
+        """
+        return {row_hash for record in self.records('inserted') for row_hash in record}
+
+    def stages(self):
+        """
+        :return: Names of the stages with saved progress, in pipeline order.
+        """
+        return [stage for stage in SNAPSHOTS if os.path.exists(self._file(stage))] + \
+               [log for log in LOGS if os.path.exists(self._file(log, 'jsonl'))]
+
+    def keep_source(self, source):
+        """
+        Keep the statement's PDF with the checkpoint so the job can be retried.
+
+        :param source: PDF bytes, or the path of a spilled upload (moved, not copied).
+        :return: Path of the kept PDF.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, SOURCE_FILE)
+        if isinstance(source, bytes):
+            with open(path, 'wb') as pdf_file:
+                pdf_file.write(source)
+        elif os.path.abspath(source) != os.path.abspath(path):
+            shutil.move(source, path)
+        return path
+
+    def source_path(self):
+        """
+        :return: Path of the kept PDF, or None if the statement did not fail.
+        """
+        path = os.path.join(self.path, SOURCE_FILE)
+        return path if os.path.exists(path) else None
+
+    def clear(self):
+        """
+        Remove the checkpoint once the statement no longer needs it.
+        """
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def is_checkpoint_file(path, root=CHECKPOINT_DIR):
+    """
+    Tell whether a path lies inside the checkpoint directory, like a PDF kept for a retry.
+
+    Such files belong to their checkpoint and are only removed with it.
+
+    :param path: File path (any other source, e.g. bytes, is not a checkpoint file).
+    :param root: Directory holding the checkpoints.
+    :return: True if the path is inside root.
+    """
+    if not isinstance(path, str):
+        return False
+    root = os.path.abspath(root)
+    return os.path.commonpath([root, os.path.abspath(path)]) == root
+
+def prune_checkpoints(root=CHECKPOINT_DIR, max_age=CHECKPOINT_RETENTION):
+    """
+    Remove checkpoints untouched for longer than max_age seconds.
+
+    :param root: Directory holding the checkpoints.
+    :param max_age: Maximum age in seconds.
+    :return: Number of checkpoints removed.
+    """
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
@@ -1,12 +1,25 @@
-import openai
 from dotenv import load_dotenv
 import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from common.llm import chat_completion
+from src.label_cache import label_cache, normalize_description
+from src.local_classifier import LABELS, LOCAL_CLASSIFIER_ENABLED, local_classifier
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Set OpenAI API key from environment variable
-openai.api_key = os.getenv('OPENAI_KEY')
+# Valid category labels
+VALID_LABELS = set(LABELS)
+
+# Limits for a single multi-description request
+CLASSIFY_BATCH_SIZE = int(os.getenv('CLASSIFY_BATCH_SIZE', 40))
+CLASSIFY_BATCH_MAX_CHARS = int(os.getenv('CLASSIFY_BATCH_MAX_CHARS', 6000))
+
+# Classification requests in flight at once, and retries of each (account limits are applied by common.llm)
+CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', 4))
+CLASSIFY_MAX_RETRIES = int(os.getenv('CLASSIFY_MAX_RETRIES', 5))
 
 # Define the system message that instructs the AI on how to classify eCommerce descriptions
 system_message = """You are an advanced AI specialized in classifying eCommerce descriptions into one of the specified categories. If the description does not fit any of the given categories, classify it as 'Other',
@@ -86,8 +99,15 @@ Important Note: When a description could potentially fall into more than one cat
 """
 
 def classify_description(description):
+    # Serve repeated merchants from the label cache before calling the API
+    cached_label = label_cache.get(description)
+    if cached_label is not None:
+        return cached_label
+
     # Send a request to OpenAI's API to classify the description
-    response = openai.ChatCompletion.create(
+    response = chat_completion(
+        purpose='classify_single',
+        max_retries=CLASSIFY_MAX_RETRIES,
         model="gpt-3.5-turbo",  # Specify the model to use for classification
         messages=[
             {"role": "system", "content": system_message},  # System message containing classification instructions
@@ -100,11 +120,173 @@ def classify_description(description):
     # Extract and clean the classification response
     answer = response.choices[0].message['content'].strip()
     
-    # Define valid category labels
-    valid_labels = {"Food", "Fuel", "EMI", "Super Market", "IPMS", "Others"}
-    
     # Return the label if it's valid; otherwise, classify as "Others"
-    if answer in valid_labels:
-        return answer
-    else:
-        return "Others"
+    label = answer if answer in VALID_LABELS else "Others"
+    label_cache.set(description, label)
+    return label
+
+# Extra instructions appended to the system message for multi-description requests
+batch_instructions = """
+Batch mode:
+You will receive several descriptions, one per numbered line.
+Answer with exactly one line per description, in the same order, formatted as "<number>. <label>".
+Do not skip, merge or repeat numbers, and do not add any other text.
+"""
+
+# Matches one "<number>. <label>" line of a batch answer
+batch_line_pattern = re.compile(r'^\s*(\d+)\s*[.):-]\s*(.+?)\s*$')
+
+def split_batches(descriptions, batch_size=CLASSIFY_BATCH_SIZE, max_chars=CLASSIFY_BATCH_MAX_CHARS):
+    """
+    Split descriptions into request-sized batches.
+    
+    A batch is closed when it reaches batch_size items or adding the next
+    description would exceed max_chars of prompt text.
+    
+    :param descriptions: List of description strings.
+    :param batch_size: Maximum number of descriptions per batch.
+    :param max_chars: Maximum total description length per batch.
+    :return: Generator of description lists.
+    """
+    batch = []
+    batch_chars = 0
+    for description in descriptions:
+        if batch and (len(batch) >= batch_size or batch_chars + len(description) > max_chars):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append(description)
+        batch_chars += len(description)
+    if batch:
+        yield batch
+
+def parse_batch_answer(answer, expected_count):
+    """
+    Parse a numbered batch answer into labels.
+    
+    :param answer: Raw model output.
+    :param expected_count: Number of descriptions that were sent.
+    :return: List of labels with None for lines that are missing or invalid.
+    """
+    labels = [None] * expected_count
+    for line in answer.splitlines():
+        match = batch_line_pattern.match(line)
+        if not match:
+            continue
+        position = int(match.group(1)) - 1
+        label = match.group(2).strip().strip('"\'')
+        if 0 <= position < expected_count and label in VALID_LABELS and labels[position] is None:
+            labels[position] = label
+    return labels
+
+def classify_batch(descriptions):
+    """
+    Classify several descriptions with a single API request.
+    
+    If the answer is cut off by the token limit the batch is halved and retried.
+    
+    :param descriptions: List of description strings.
+    :return: List of labels aligned with descriptions, None where the answer could not be parsed.
+    """
+    numbered = "\n".join(
+        f"{position}. {' '.join(description.split())}" for position, description in enumerate(descriptions, start=1)
+    )
+    response = chat_completion(
+        purpose='classify_batch',
+        max_retries=CLASSIFY_MAX_RETRIES,
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": system_message + batch_instructions},
+            {"role": "user", "content": f"Descriptions:\n{numbered}"}
+        ],
+        max_tokens=8 * len(descriptions) + 10,  # Roughly one short label line per description
+        temperature=0.0
+    )
+
+    choice = response.choices[0]
+    if choice.get('finish_reason') == 'length' and len(descriptions) > 1:
+        middle = len(descriptions) // 2
+        return classify_batch(descriptions[:middle]) + classify_batch(descriptions[middle:])
+
+    answer = choice.message['content'].strip()
+    labels = parse_batch_answer(answer, len(descriptions))
+    answered = sum(1 for line in answer.splitlines() if line.strip())
+    if answered != len(descriptions):
+        logging.warning(f'Batch classification returned {answered} lines for {len(descriptions)} descriptions')
+    return labels
+
+def resolve_batch(batch_items):
+    """
+    Classify one batch and fill in lines that did not parse with single requests.
+    
+    :param batch_items: List of pending items with a 'description' key.
+    :return: List of labels aligned with batch_items.
+    """
+    labels = classify_batch([item['description'] for item in batch_items])
+    for position, (item, label) in enumerate(zip(batch_items, labels)):
+        if label is None:
+            # Fall back to a single request for lines that did not parse
+            labels[position] = classify_description(item['description'])
+        else:
+            label_cache.set(item['description'], label)
+    return labels
+
+def classify_descriptions(descriptions, batch_size=CLASSIFY_BATCH_SIZE, max_chars=CLASSIFY_BATCH_MAX_CHARS, max_workers=CLASSIFY_WORKERS, sources=None, use_local=LOCAL_CLASSIFIER_ENABLED):
+    """
+    Classify a list of descriptions using the label cache, the local model and batched API requests.
+    
+    Descriptions that share a cache key are looked up once. Those the local
+    classifier labels with enough confidence never reach the API; the rest are
+    sent in batches on a bounded thread pool behind the shared rate limiter, and
+    lines the model fails to answer are retried one at a time with classify_description.
+    
+    :param descriptions: List of description strings.
+    :param batch_size: Maximum number of descriptions per request.
+    :param max_chars: Maximum total description length per request.
+    :param max_workers: Number of requests in flight at once.
+    :param sources: Optional list filled with where each label came from: 'cache', 'local' or 'llm'.
+    :param use_local: Consult the local classifier before the API.
+    :return: List of labels aligned with descriptions.
+    """
+    labels = [None] * len(descriptions)
+    label_sources = [None] * len(descriptions)
+    pending = {}  # Unique description -> positions that share its label
+
+    for position, description in enumerate(descriptions):
+        description = description if isinstance(description, str) else ''
+        cached_label = label_cache.get(description)
+        if cached_label is not None:
+            labels[position] = cached_label
+            label_sources[position] = 'cache'
+            continue
+        key = normalize_description(description) or description
+        pending.setdefault(key, {'description': description, 'positions': []})['positions'].append(position)
+
+    # Keep confident local predictions; only the uncertain descriptions go to the API.
+    # They are not written to the label cache, which holds API answers only.
+    if use_local and pending:
+        keys = list(pending)
+        local_labels = local_classifier.confident_labels([pending[key]['description'] for key in keys])
+        for key, label in zip(keys, local_labels):
+            if label is not None:
+                for position in pending.pop(key)['positions']:
+                    labels[position] = label
+                    label_sources[position] = 'local'
+
+    unique = list(pending.values())
+    batches = []
+    for batch in split_batches([item['description'] for item in unique], batch_size, max_chars):
+        batches.append(unique[:len(batch)])
+        unique = unique[len(batch):]
+
+    # Results come back in batch order, so every label maps to the rows that share its description
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for batch_items, batch_labels in zip(batches, executor.map(resolve_batch, batches)):
+            for item, label in zip(batch_items, batch_labels):
+                for position in item['positions']:
+                    labels[position] = label
+                    label_sources[position] = 'llm'
+
+    if sources is not None:
+        sources.extend(label_sources)
+    return labels
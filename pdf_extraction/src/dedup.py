@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime
+import mysql.connector
+from common.db import get_connection
+from src.normalize import DATE_FORMATS
+
+# A date as printed in statement headers: 01/04/2023, 01-Apr-2023, 01 Apr 2023, 2023-04-01
+HEADER_DATE = r'(\d{1,2}[/\-.]\d{1,2}[/\-.]\d{2,4}|\d{1,2}[ \-][A-Za-z]{3}[ \-]\d{2,4}|\d{4}-\d{2}-\d{2})'
+
+# Phrases that introduce the statement period, e.g. "Statement Period: 01/04/2023 to 30/04/2023"
+period_pattern = re.compile(
+    r'(?:period|from)[^0-9\n]{0,30}?' + HEADER_DATE + r'\s*(?:to|-|till|until)[\s:]*' + HEADER_DATE,
+    re.IGNORECASE
+)
+
+# Statement_Upload columns read back for a repeat upload
+UPLOAD_COLUMNS = 'ContentHash, AccountNo, PeriodStart, PeriodEnd, RowCount, Result, CreatedAt'
+
+def content_hash(source):
+    """
+    Fingerprint an upload by the SHA-256 of its bytes.
+
+    :param source: PDF bytes, or the path of a spilled upload.
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, bytes):
+        digest.update(source)
+    else:
+        with open(source, 'rb') as pdf_file:
+            for block in iter(lambda: pdf_file.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def parse_header_date(value):
+    """
+    Parse a date printed in a statement header.
+
+    :param value: Date string.
+    :return: Date as YYYY-MM-DD, or None if no known format matches.
+    """
+    value = ' '.join(value.split())
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def statement_period(text):
+    """
+    Find the statement period in the page-one text.
+
+    :param text: Text of the first page.
+    :return: (start, end) as YYYY-MM-DD strings, or None if no period is printed.
+    """
+    for match in period_pattern.finditer(text):
+        start, end = parse_header_date(match.group(1)), parse_header_date(match.group(2))
+        if start and end and start <= end:
+            return start, end
+    return None
+
+def rows_period(transaction_data):
+    """
+    Derive the statement period from normalized rows when the header has none.
+
+    :param transaction_data: Normalized transaction dictionaries.
+    :return: (start, end) as YYYY-MM-DD strings, or None if there are no rows.
+    """
+    dates = [transaction['TransactionDate'] for transaction in transaction_data]
+    return (min(dates), max(dates)) if dates else None
+
+def statement_identity(entities, period):
+    """
+    Normalize the account and period into the identity of a statement.
+
+    :param entities: Header entities with AccountNo.
+    :param period: (start, end) tuple or None.
+    :return: (account_no, start, end), or None if either part is unknown.
+    """
+    account_no = re.sub(r'\s+', '', str(entities.get('AccountNo') or '')).upper()
+    if not account_no or not period:
+        return None
+    return (account_no,) + tuple(period)
+
+def fetch_upload(query, params):
+    """
+    Return the stored result of a matching processed upload.
+
+    Lookup failures are logged and treated as a miss, so deduplication never
+    blocks ingestion.
+
+    :param query: SELECT of UPLOAD_COLUMNS from Statement_Upload.
+    :param params: Query parameters.
+    :return: Dictionary describing the earlier upload and its result, or None.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        content_hash_value, account_no, period_start, period_end, row_count, result, created_at = row
+        return {
+            'content_hash': content_hash_value,
+            'account_no': account_no,
+            'period': [str(period_start), str(period_end)] if period_start else None,
+            'rows': row_count,
+            'result': json.loads(result) if result else None,
+            'processed_at': str(created_at)
+        }
+    except mysql.connector.Error as err:
+        logging.warning(f'Statement_Upload lookup failed, processing anyway: {err}')
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+def find_by_hash(digest):
+    """
+    Look up an earlier upload of exactly the same file.
+
+    :param digest: content_hash of the upload.
+    :return: Earlier upload (see fetch_upload), or None.
+    """
+    return fetch_upload(f"SELECT {UPLOAD_COLUMNS} FROM Statement_Upload WHERE ContentHash = %s", (digest,))
+
+def find_by_identity(identity):
+    """
+    Look up an earlier upload of the same account and period, e.g. a re-downloaded statement.
+
+    :param identity: statement_identity tuple.
+    :return: Earlier upload (see fetch_upload), or None.
+    """
+    if identity is None:
+        return None
+    return fetch_upload(
+        f"SELECT {UPLOAD_COLUMNS} FROM Statement_Upload WHERE AccountNo = %s AND PeriodStart = %s AND PeriodEnd = %s",
+        identity
+    )
+
+def record_upload(digest, identity, row_count, result):
+    """
+    Remember a successfully processed upload so repeats can be answered from it.
+
+    :param digest: content_hash of the upload.
+    :param identity: statement_identity tuple, or None.
+    :param row_count: Number of transaction rows inserted.
+    :param result: Response dictionary returned for the upload.
+    """
+    account_no, period_start, period_end = identity if identity else (None, None, None)
+    conn = None
+    try:
+        conn = get_connection()
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO Statement_Upload (ContentHash, AccountNo, PeriodStart, PeriodEnd, RowCount, Result)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE RowCount = VALUES(RowCount), Result = VALUES(Result)
+                """,
+                (digest, account_no, period_start, period_end, row_count, json.dumps(result))
+            )
+        conn.commit()
+    except mysql.connector.Error as err:
+        logging.warning(f'Could not record Statement_Upload {digest}: {err}')
+    finally:
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,62 @@
+from src.transaction import open_fitz, PdfToTable, iter_page_rows, iter_transaction_rows
+
+class StatementDocument:
+    """
+    An uploaded statement read once and shared by entity and table extraction.
+
+    The file is read into memory a single time and opened with PyMuPDF. Page-one
+    text comes from that handle, and so do the tables with the pymupdf backend;
+    the pdfplumber backend parses the same bytes instead of re-reading the file.
+    """
+
+    def __init__(self, path=None, data=None):
+        """
+        :param path: Path to the PDF file.
+        :param data: PDF bytes, used instead of reading path.
+        """
+        if data is None:
+            with open(path, 'rb') as pdf_file:
+                data = pdf_file.read()
+        self.path = path
+        self.data = data
+        self.pdf = open_fitz(data)
+
+    @property
+    def page_count(self):
+        return len(self.pdf)
+
+    def first_page_text(self, limit=500):
+        """
+        Return the start of the first page's text for entity extraction.
+
+        :param limit: Maximum number of characters, or None for the whole page.
+        :return: Text of page one, truncated to limit.
+        """
+        return self.pdf.load_page(0).get_text()[:limit]
+
+    def table(self, workers=None, backend=None):
+        """
+        Extract all transaction tables as one DataFrame (see PdfToTable).
+        """
+        return PdfToTable(self.data, workers=workers, backend=backend, fitz_document=self.pdf)
+
+    def iter_rows(self, on_page=None, backend=None, normalize=False):
+        """
+        Yield transaction rows page by page (see iter_transaction_rows).
+        """
+        return iter_transaction_rows(self.data, on_page=on_page, backend=backend, fitz_document=self.pdf, normalize=normalize)
+
+    def iter_page_rows(self, on_page=None, backend=None, normalize=False, start=0):
+        """
+        Yield (page_number, rows) for each page from start onwards (see iter_page_rows).
+        """
+        return iter_page_rows(self.data, on_page=on_page, backend=backend, fitz_document=self.pdf, normalize=normalize, start=start)
+
+    def close(self):
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
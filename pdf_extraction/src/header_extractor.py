@@ -0,0 +1,169 @@
+import re
+
+# Fields extracted from the statement header, in the order the LLM prompt lists them
+HEADER_FIELDS = ['BankName', 'PersonName', 'PersonAddress', 'CustomerID', 'BranchName', 'BranchAddress', 'IFSC', 'AccountNo']
+
+# Fields Personal_Info cannot do without; only these send a statement to the LLM when missing
+REQUIRED_FIELDS = ['BankName', 'PersonName', 'CustomerID', 'BranchName', 'IFSC', 'AccountNo']
+
+# IFSC codes are four bank letters, a zero, and a six character branch code
+ifsc_pattern = re.compile(r'\b([A-Z]{4}0[A-Z0-9]{6})\b')
+
+# Bank names keyed by IFSC prefix
+BANK_BY_IFSC_PREFIX = {
+    'YESB': 'YES Bank',
+    'HDFC': 'HDFC Bank',
+    'SBIN': 'State Bank of India',
+    'ICIC': 'ICICI Bank',
+    'UTIB': 'Axis Bank',
+    'KKBK': 'Kotak Mahindra Bank',
+    'PUNB': 'Punjab National Bank',
+    'BARB': 'Bank of Baroda',
+    'CNRB': 'Canara Bank',
+    'UBIN': 'Union Bank of India',
+    'IDFB': 'IDFC FIRST Bank',
+    'INDB': 'IndusInd Bank',
+}
+
+# Phrases that identify a bank when the header carries no IFSC
+BANK_NAME_PATTERNS = {
+    'YES Bank': r'\bYES\s+BANK\b',
+    'HDFC Bank': r'\bHDFC\s+BANK\b',
+    'State Bank of India': r'\bSTATE\s+BANK\s+OF\s+INDIA\b',
+    'ICICI Bank': r'\bICICI\s+BANK\b',
+    'Axis Bank': r'\bAXIS\s+BANK\b',
+    'Kotak Mahindra Bank': r'\bKOTAK\s+MAHINDRA\s+BANK\b',
+    'Punjab National Bank': r'\bPUNJAB\s+NATIONAL\s+BANK\b',
+    'Bank of Baroda': r'\bBANK\s+OF\s+BARODA\b',
+    'Canara Bank': r'\bCANARA\s+BANK\b',
+    'Union Bank of India': r'\bUNION\s+BANK\s+OF\s+INDIA\b',
+    'IDFC FIRST Bank': r'\bIDFC\s+FIRST\s+BANK\b',
+    'IndusInd Bank': r'\bINDUSIND\s+BANK\b',
+}
+
+# A value runs to the end of the line or to a gap of two or more spaces before the next label
+VALUE = r'[ \t]*[:\-][ \t]*(\S.*?)(?:[ \t]{2,}|$)'
+
+# Label patterns that hold for most Indian bank statements
+GENERIC_PATTERNS = {
+    'PersonName': [r'^[ \t]*(?:Customer\s+Name|Account\s+Holder(?:\s+Name)?|Name)' + VALUE],
+    'PersonAddress': [r'^[ \t]*(?:Customer\s+Address|Address)' + VALUE],
+    'CustomerID': [r'(?:Customer|Cust)[ \t]*(?:ID|No\.?|Number)' + VALUE, r'\bCIF(?:\s+No\.?)?' + VALUE],
+    'BranchName': [r'^[ \t]*(?:Branch\s+Name|Branch|Home\s+Branch)' + VALUE],
+    'BranchAddress': [r'^[ \t]*Branch\s+Address' + VALUE],
+    'IFSC': [r'\bIFS(?:C|\s+Code|C\s+Code)' + VALUE],
+    'AccountNo': [r'(?:A/C|Account|Acct)[ \t]*(?:No\.?|Number)' + VALUE],
+}
+
+# Per-bank layouts, tried before the generic patterns
+BANK_TEMPLATES = {
+    'HDFC Bank': {
+        'CustomerID': [r'\bCust\s+ID' + VALUE],
+        'AccountNo': [r'\bAccount\s+No' + VALUE],
+        'BranchName': [r'^[ \t]*Account\s+Branch' + VALUE],
+    },
+    'State Bank of India': {
+        'CustomerID': [r'\bCIF\s+No\.?' + VALUE],
+        'AccountNo': [r'\bAccount\s+Number' + VALUE],
+        'PersonName': [r'^[ \t]*Account\s+Name' + VALUE],
+    },
+    'ICICI Bank': {
+        'CustomerID': [r'\bCust(?:omer)?\s+ID' + VALUE],
+        'PersonName': [r'^[ \t]*Account\s+Holder' + VALUE],
+    },
+    'Axis Bank': {
+        'CustomerID': [r'\bCustomer\s+No' + VALUE],
+        'BranchName': [r'^[ \t]*Branch\s+Name' + VALUE],
+    },
+    'YES Bank': {
+        'CustomerID': [r'\bCustomer\s+ID' + VALUE],
+        'AccountNo': [r'\bAccount\s+No' + VALUE],
+    },
+}
+
+# Checks a value must pass before it is trusted without the LLM
+VALIDATORS = {
+    'IFSC': lambda value: bool(ifsc_pattern.fullmatch(value)),
+    'AccountNo': lambda value: bool(re.fullmatch(r'[0-9]{9,18}', value)),
+    'CustomerID': lambda value: bool(re.fullmatch(r'[A-Z0-9]{4,20}', value, re.IGNORECASE)),
+}
+
+def clean_value(field, value):
+    """
+    Tidy a captured value before validation.
+
+    :param field: Header field name.
+    :param value: Raw captured text.
+    :return: Cleaned value.
+    """
+    value = ' '.join(value.split()).strip(' :-,')
+    if field in ('IFSC', 'AccountNo', 'CustomerID'):
+        value = value.replace(' ', '').upper()
+    return value
+
+def search_field(field, patterns, text):
+    """
+    Return the first valid value matched by any of the patterns.
+
+    :param field: Header field name.
+    :param patterns: Regular expressions with the value in group 1.
+    :param text: Header text.
+    :return: Value, or None if nothing valid matched.
+    """
+    for pattern in patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE):
+            value = clean_value(field, match.group(1))
+            validator = VALIDATORS.get(field)
+            if value and (validator is None or validator(value)):
+                return value
+    return None
+
+def detect_bank(text):
+    """
+    Identify the bank from the IFSC prefix or a bank name in the text.
+
+    :param text: Header text.
+    :return: (bank name or None, IFSC or None)
+    """
+    ifsc_match = ifsc_pattern.search(text.upper())
+    ifsc = ifsc_match.group(1) if ifsc_match else None
+    if ifsc and ifsc[:4] in BANK_BY_IFSC_PREFIX:
+        return BANK_BY_IFSC_PREFIX[ifsc[:4]], ifsc
+    for bank_name, pattern in BANK_NAME_PATTERNS.items():
+        if re.search(pattern, text, re.IGNORECASE):
+            return bank_name, ifsc
+    return None, ifsc
+
+def extract_header_fields(text):
+    """
+    Extract header fields with regexes and per-bank templates.
+
+    :param text: Text from the top of the first page.
+    :return: (entities, sources) where entities maps each filled field to its value and
+             sources maps it to 'template' (bank-specific layout) or 'regex' (generic pattern).
+    """
+    entities = {}
+    sources = {}
+
+    bank_name, ifsc = detect_bank(text)
+    if bank_name:
+        entities['BankName'] = bank_name
+        sources['BankName'] = 'regex'
+
+    template = BANK_TEMPLATES.get(bank_name, {})
+    for field in HEADER_FIELDS:
+        if field == 'BankName':
+            continue
+        value = search_field(field, template.get(field, []), text)
+        if value is not None:
+            entities[field] = value
+            sources[field] = 'template'
+            continue
+        value = search_field(field, GENERIC_PATTERNS.get(field, []), text)
+        if value is None and field == 'IFSC':
+            value = ifsc
+        if value is not None:
+            entities[field] = value
+            sources[field] = 'regex'
+
+    return entities, sources
@@ -1,45 +1,38 @@
 import openai
 import json
-from dotenv import load_dotenv
-import os
+from common.llm import chat_completion
+from src.header_extractor import HEADER_FIELDS, REQUIRED_FIELDS, extract_header_fields
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Set OpenAI API key from environment variable
-openai.api_key = os.getenv('OPENAI_KEY')
-
-def extract_entities(text):
-    # Define the prompt for extracting key information from bank statements
-    prompt = (
+def build_prompt(text, fields=HEADER_FIELDS):
+    """
+    Build the extraction prompt for the given header fields.
+    
+    :param text: Text from the top of the first page.
+    :param fields: Field names to ask for.
+    :return: Prompt string.
+    """
+    numbered_fields = "".join(f"{number}. {field}\n" for number, field in enumerate(fields, start=1))
+    json_template = ",\n".join(f'  "{field}": "<value>"' for field in fields)
+    return (
         "You are an advanced AI trained to extract key information from bank statements. "
         "Extract the following information into JSON format. Make sure there is no extra text, only the JSON object with key-value pairs. The keys are as follows: "
-        "1. BankName\n"
-        "2. PersonName\n"
-        "3. PersonAddress\n"
-        "4. CustomerID\n"
-        "5. BranchName\n"
-        "6. BranchAddress\n"
-        "7. IFSC\n"
-        "8. AccountNo\n\n"
+        f"{numbered_fields}\n"
         f"Here is the text from which to extract the information:\n{text}\n\n"
         "Provide the extracted information in this format:\n"
         "{\n"
-        '  "BankName": "<value>",\n'
-        '  "PersonName": "<value>",\n'
-        '  "PersonAddress": "<value>",\n'
-        '  "CustomerID": "<value>",\n'
-        '  "BranchName": "<value>",\n'
-        '  "BranchAddress": "<value>",\n'
-        '  "IFSC": "<value>",\n'
-        '  "AccountNo": "<value>"\n'
+        f"{json_template}\n"
         "}\n"
         "ExtractedInfo:"
     )
+
+def extract_entities_llm(text, fields=HEADER_FIELDS):
+    # Define the prompt for extracting key information from bank statements
+    prompt = build_prompt(text, fields)
     
     try:
         # Send a request to OpenAI's API to extract information based on the provided prompt
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            purpose='extract_entities',
             model="gpt-3.5-turbo",  # Specify the model to use for extraction
             messages=[
                 {"role": "system", "content": "You are an advanced AI trained to extract key information from bank statements."},  # System message with instructions
@@ -66,3 +59,31 @@ def extract_entities(text):
     
     # Return the extracted information as a JSON object
     return extracted_info_json
+
+def extract_entities_with_sources(text):
+    """
+    Extract header entities locally first and ask the LLM only for what is missing.
+    
+    The LLM is called when a field Personal_Info requires could not be filled by
+    the regex and template extractor; it is then asked for every unfilled field.
+    
+    :param text: Text from the top of the first page.
+    :return: (entities, sources) where sources maps each field to 'template', 'regex', 'llm' or 'missing'.
+    """
+    entities, sources = extract_header_fields(text)
+
+    if any(field not in entities for field in REQUIRED_FIELDS):
+        llm_fields = [field for field in HEADER_FIELDS if field not in entities]
+        llm_entities = extract_entities_llm(text, llm_fields)
+        for field in llm_fields:
+            if llm_entities.get(field):
+                entities[field] = llm_entities[field]
+                sources[field] = 'llm'
+
+    for field in HEADER_FIELDS:
+        sources.setdefault(field, 'missing')
+    return {field: entities.get(field, '') for field in HEADER_FIELDS}, sources
+
+def extract_entities(text):
+    # Return only the entities; see extract_entities_with_sources for where each came from
+    return extract_entities_with_sources(text)[0]
@@ -2,21 +2,26 @@ import mysql.connector
 from mysql.connector import errorcode
 from datetime import datetime
 import ast
+import hashlib
+from decimal import Decimal, ROUND_HALF_UP
+import time
+from itertools import islice
 import pandas as pd
-from src.classification import classify_description
+from common.data_version import bump_data_version, bump_data_version_now
+from common.db import get_connection
+from src.classification import classify_descriptions
+from src.metrics import time_stage
 from dotenv import load_dotenv
 import os
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configuration for connecting to the MySQL database
-db_config = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME')
-}
+# Number of transaction rows sent to MySQL per executemany() call
+INSERT_CHUNK_SIZE = int(os.getenv('DB_INSERT_CHUNK_SIZE', 500))
+
+# Skip rows already stored for the account (by RowHash) instead of inserting them again
+INCREMENTAL_INGEST = os.getenv('DB_INCREMENTAL_INGEST', '1') == '1'
 
 # Custom exception for handling database errors
 class DatabaseError(Exception):
@@ -76,21 +81,320 @@ def filter_valid_transactions(transaction_data):
             filtered_data.append(transaction)
     return filtered_data
 
-def insert_data_to_db(personal_info, transaction_data):
+def transaction_values(transaction, normalized=False):
+    """
+    Convert one transaction to the values stored in Transaction_Info.
+    
+    :param transaction: Transaction dictionary.
+    :param normalized: The row comes from normalize_transactions.
+    :return: (TransactionDate, ValueDate, Description, Debit, Credit, Balance) tuple.
+    """
+    if normalized:
+        return (
+            transaction['TransactionDate'],
+            transaction['ValueDate'],
+            transaction.get('Description', ''),
+            transaction['Debit'],
+            transaction['Credit'],
+            transaction['Balance']
+        )
+    # Convert date and value fields
+    return (
+        convert_date_format(transaction.get('Transaction\nDate', '')),
+        convert_date_format(transaction.get('ValueDate', '')),
+        transaction.get('Description', ''),
+        convert_decimal_value(transaction.get('Debit', '0')),
+        convert_decimal_value(transaction.get('Credit', '0')),
+        convert_decimal_value(transaction.get('Balance', '0'))
+    )
+
+def fingerprint_amount(value):
+    """
+    Format an amount as MySQL shows it once stored in a DECIMAL(15, 2) column.
+
+    mysql.connector sends a float as its repr(), which MySQL rounds half away
+    from zero, e.g. 0.125 is stored as 0.13 where f'{0.125:.2f}' gives '0.12'.
+
+    :param value: Amount, or None for a missing one.
+    :return: Amount with two decimals, as in db/migrate_row_hash.sql.
+    """
+    return str(Decimal(repr(float(value or 0))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+def row_fingerprint(account_no, values):
+    """
+    Compute the stable fingerprint of a stored transaction.
+    
+    Dates, amounts (to the paisa), running balance and the description with
+    whitespace and case folded identify a row across overlapping statements.
+    
+    :param account_no: Account the row belongs to.
+    :param values: Tuple returned by transaction_values.
+    :return: SHA-256 hex digest stored in Transaction_Info.RowHash.
+    """
+    transaction_date, value_date, description, debit, credit, balance = values
+    key = '|'.join([
+        str(account_no).strip(),
+        str(transaction_date),
+        str(value_date),
+        fingerprint_amount(debit),
+        fingerprint_amount(credit),
+        fingerprint_amount(balance),
+        ' '.join(str(description or '').split()).upper()
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def prepare_transactions(transactions, account_no, normalized=False):
+    """
+    Convert transactions to stored values and fingerprint them.
+    
+    :param transactions: Valid transaction dictionaries.
+    :param account_no: Account the rows belong to.
+    :param normalized: Rows come from normalize_transactions.
+    :return: List of (values, row_hash) tuples.
+    """
+    prepared = []
+    for transaction in transactions:
+        values = transaction_values(transaction, normalized)
+        prepared.append((values, row_fingerprint(account_no, values)))
+    return prepared
+
+def existing_row_hashes(cursor, account_no, row_hashes):
+    """
+    Find which fingerprints are already stored for an account.
+    
+    :param cursor: Cursor on an open connection.
+    :param account_no: Account to check.
+    :param row_hashes: Fingerprints to look up.
+    :return: Set of the fingerprints already in Transaction_Info.
+    """
+    existing = set()
+    for chunk in chunked(row_hashes, INSERT_CHUNK_SIZE):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(
+            f"SELECT RowHash FROM Transaction_Info WHERE AccountNo = %s AND RowHash IN ({placeholders})",
+            [account_no] + chunk
+        )
+        existing.update(row[0] for row in cursor.fetchall())
+    return existing
+
+def drop_existing(cursor, account_no, prepared):
+    """
+    Keep only the prepared rows not yet stored for the account.
+    
+    :param cursor: Cursor on an open connection.
+    :param account_no: Account the rows belong to.
+    :param prepared: List of (values, row_hash) tuples.
+    :return: (new rows, number of rows skipped)
+    """
+    existing = existing_row_hashes(cursor, account_no, [row_hash for _, row_hash in prepared])
+    new_rows = [(values, row_hash) for values, row_hash in prepared if row_hash not in existing]
+    return new_rows, len(prepared) - len(new_rows)
+
+def drop_inserted(prepared, inserted):
+    """
+    Keep only the prepared rows an earlier attempt did not commit.
+    
+    :param prepared: List of (values, row_hash) tuples.
+    :param inserted: Set of fingerprints from the checkpoint's committed chunks.
+    :return: (remaining rows, number of rows already inserted)
+    """
+    remaining = [(values, row_hash) for values, row_hash in prepared if row_hash not in inserted]
+    return remaining, len(prepared) - len(remaining)
+
+def label_rows(prepared, chunk_size, checkpoint=None, known_labels=None):
+    """
+    Classify prepared rows, reusing the labels a checkpoint already holds.
+    
+    With a checkpoint, the rows still missing a label are classified chunk_size
+    at a time and each chunk's labels are saved as soon as they arrive, so a
+    failure loses at most one chunk of classification work.
+    
+    :param prepared: List of (values, row_hash) tuples.
+    :param chunk_size: Rows classified per saved chunk.
+    :param checkpoint: Optional Checkpoint of the statement.
+    :param known_labels: Fingerprint to [label, source] dictionary loaded from the checkpoint; extended in place.
+    :return: (labels, label sources) lists in row order, see classify_descriptions.
+    """
+    if checkpoint is None:
+        sources = []
+        labels = classify_descriptions([values[2] for values, _ in prepared], sources=sources)
+        return labels, sources
+    missing = [(values, row_hash) for values, row_hash in prepared if row_hash not in known_labels]
+    for chunk in chunked(missing, chunk_size):
+        sources = []
+        labels = classify_descriptions([values[2] for values, _ in chunk], sources=sources)
+        assigned = {row_hash: [label, source] for (_, row_hash), label, source in zip(chunk, labels, sources)}
+        checkpoint.append('labels', assigned)
+        known_labels.update(assigned)
+    return [known_labels[row_hash][0] for _, row_hash in prepared], [known_labels[row_hash][1] for _, row_hash in prepared]
+
+def chunked(items, chunk_size):
+    """
+    Split a list or any other iterable into consecutive chunks of at most chunk_size items.
+    
+    :param items: Iterable to split; generators are consumed lazily.
+    :param chunk_size: Maximum number of items per chunk.
+    :return: Generator of lists.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def bulk_insert_transactions(conn, cursor, insert_query, rows, chunk_size=INSERT_CHUNK_SIZE, commit_per_chunk=False, start_index=0, on_commit=None):
+    """
+    Insert rows with one executemany() call per chunk.
+    
+    mysql.connector rewrites an executemany() INSERT into a single multi-row
+    VALUES statement, so each chunk costs one round trip instead of one per row.
+    
+    :param conn: Open MySQL connection.
+    :param cursor: Cursor on that connection.
+    :param insert_query: Parameterized INSERT ... VALUES (%s, ...) statement.
+    :param rows: List of parameter tuples.
+    :param chunk_size: Number of rows per executemany() call.
+    :param commit_per_chunk: Commit after every chunk instead of leaving it to the caller.
+    :param start_index: Number of the first chunk in the returned stats.
+    :param on_commit: Optional callback on_commit(chunk) after each chunk is committed (with commit_per_chunk).
+    :return: List of per-chunk stats with row count and elapsed seconds.
+    """
+    chunk_stats = []
+    for index, chunk in enumerate(chunked(rows, chunk_size), start=start_index):
+        start = time.perf_counter()
+        cursor.executemany(insert_query, chunk)
+        if commit_per_chunk:
+            conn.commit()
+            if on_commit:
+                on_commit(chunk)
+        chunk_stats.append({
+            'chunk': index,
+            'rows': len(chunk),
+            'seconds': round(time.perf_counter() - start, 6)
+        })
+    return chunk_stats
+
+def labelled_chunks(transaction_data, chunk_size, account_no, normalized=False, cursor=None, skipped=None, checkpoint=None, resumed=None):
+    """
+    Read transactions lazily in chunks and classify each chunk as it arrives.
+    
+    :param transaction_data: Iterable of transaction dictionaries.
+    :param chunk_size: Number of transactions read per chunk.
+    :param account_no: Account the rows belong to.
+    :param normalized: Rows were already validated by normalize_transactions.
+    :param cursor: When given, rows already stored for the account are dropped before classification.
+    :param skipped: List the number of dropped rows per chunk is appended to.
+    :param checkpoint: Optional Checkpoint: rows it shows as inserted are dropped and saved labels are reused.
+    :param resumed: List the number of rows an earlier attempt inserted, per chunk, is appended to.
+    :return: Generator of (prepared rows, labels, label sources) tuples.
+    """
+    if checkpoint is not None:
+        inserted, known_labels = checkpoint.inserted(), checkpoint.labels()
+    for chunk in chunked(transaction_data, chunk_size):
+        if not normalized:
+            chunk = filter_valid_transactions(chunk)
+        prepared = prepare_transactions(chunk, account_no, normalized)
+        if checkpoint is not None:
+            prepared, resumed_rows = drop_inserted(prepared, inserted)
+            if resumed is not None:
+                resumed.append(resumed_rows)
+        if cursor is not None:
+            with time_stage('dedup_lookup'):
+                prepared, skipped_rows = drop_existing(cursor, account_no, prepared)
+            if skipped is not None:
+                skipped.append(skipped_rows)
+        if prepared:
+            with time_stage('classify'):
+                labels, sources = label_rows(prepared, chunk_size, checkpoint, known_labels if checkpoint is not None else None)
+            yield prepared, labels, sources
+
+def insert_data_to_db(personal_info, transaction_data, chunk_size=None, commit_per_chunk=False, progress=None, stream=False, normalized=False, incremental=None, checkpoint=None):
     """
     Insert personal information and transaction data into the database.
     
+    By default the whole statement is classified before connecting. With
+    stream=True, transaction_data may be a generator: it is read, classified and
+    inserted one chunk at a time so memory stays bounded by the chunk size.
+    
     :param personal_info: Personal information as a string to be converted to a dictionary.
-    :param transaction_data: List of transaction dictionaries.
+    :param transaction_data: List (or, when streaming, any iterable) of transaction dictionaries.
+    :param chunk_size: Rows per bulk insert batch (defaults to DB_INSERT_CHUNK_SIZE).
+    :param commit_per_chunk: Commit after each batch so a failure keeps earlier batches.
+    :param progress: Optional callback progress(stage, fraction) for job status reporting.
+    :param stream: Classify and insert chunk by chunk as rows arrive.
+    :param normalized: Rows come from normalize_transactions: already validated, with
+                       TransactionDate/ValueDate as YYYY-MM-DD and float amounts.
+    :param incremental: Skip rows already stored for the account, matched by their RowHash
+                        fingerprint, before classifying them (defaults to DB_INCREMENTAL_INGEST).
+                        Otherwise an overlapping row fails the insert with a duplicate entry error.
+    :param checkpoint: Optional Checkpoint of the statement. Labels are saved as they are assigned and
+                       every chunk is committed and recorded as it is inserted; rows an earlier attempt
+                       committed are not inserted again and saved labels are not requested again.
+    :return: Dictionary with the inserted, skipped and resumed (inserted by an earlier attempt)
+             row counts and per-chunk insert stats.
     """
+    chunk_size = chunk_size or INSERT_CHUNK_SIZE
+    incremental = INCREMENTAL_INGEST if incremental is None else incremental
+    # Chunks committed before the final commit, which must still invalidate cached search results on failure
+    committed = []
+
+    def on_commit(chunk):
+        committed.append(len(chunk))
+        if checkpoint is not None:
+            # RowHash is the last column of every inserted row
+            checkpoint.append('inserted', [row[-1] for row in chunk])
+
+    if checkpoint is not None:
+        # Only committed chunks can be recorded as done
+        commit_per_chunk = True
+    conn = None
     try:
+        # Convert personal_info string to a dictionary
+        personal_info = ast.literal_eval(personal_info)
+        account_no = personal_info.get('AccountNo', '')
+        skipped = []
+        resumed = []
+
+        if not stream:
+            # Filter valid transactions
+            if not normalized:
+                transaction_data = filter_valid_transactions(transaction_data)
+            prepared = prepare_transactions(transaction_data, account_no, normalized)
+
+            # Leave out the rows an earlier attempt at this statement already committed
+            if checkpoint is not None:
+                prepared, resumed_rows = drop_inserted(prepared, checkpoint.inserted())
+                resumed.append(resumed_rows)
+
+            # Drop rows an overlapping statement already stored, using a short-lived connection
+            if incremental and prepared:
+                lookup_conn = get_connection()
+                try:
+                    with lookup_conn.cursor() as lookup_cursor, time_stage('dedup_lookup'):
+                        prepared, skipped_rows = drop_existing(lookup_cursor, account_no, prepared)
+                    skipped.append(skipped_rows)
+                finally:
+                    lookup_conn.close()
+
+            # Classify all descriptions before connecting so no connection sits idle during API calls
+            if progress:
+                progress('classifying', 0.4)
+            with time_stage('classify'):
+                labels, sources = label_rows(prepared, chunk_size, checkpoint, checkpoint.labels() if checkpoint is not None else None)
+            batches = [(prepared, labels, sources)]
+
         # Connect to the MySQL database
-        conn = mysql.connector.connect(
-            **db_config
-        )
+        if progress and not stream:
+            progress('inserting', 0.8)
+        conn = get_connection()
         with conn.cursor() as cursor:
-            # Convert personal_info string to a dictionary
-            personal_info = ast.literal_eval(personal_info)
+            if stream:
+                batches = labelled_chunks(transaction_data, chunk_size, account_no, normalized,
+                                          cursor=cursor if incremental else None, skipped=skipped,
+                                          checkpoint=checkpoint, resumed=resumed)
 
             # Insert or update personal information
             personal_insert_query = """
@@ -123,44 +427,49 @@ def insert_data_to_db(personal_info, transaction_data):
             else:
                 raise DatabaseError("Error: Personal record was not found after insertion.")
 
-            # Filter valid transactions
-            transaction_data = filter_valid_transactions(transaction_data)
-
             # Insert transaction data
             transaction_insert_query = """
                 INSERT INTO Transaction_Info 
-                (ID, BankName, PersonName, AccountNo, TransactionDate, ValueDate, Description, Debit, Credit, Balance,label) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s,%s)
+                (ID, BankName, PersonName, AccountNo, TransactionDate, ValueDate, Description, Debit, Credit, Balance,label, LabelSource, RowHash) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s,%s, %s, %s)
             """
-            for transaction in transaction_data:
-                # Convert date and value fields
-                transaction_date = convert_date_format(transaction.get('Transaction\nDate', ''))
-                value_date = convert_date_format(transaction.get('ValueDate', ''))
-                debit = convert_decimal_value(transaction.get('Debit', '0'))
-                credit = convert_decimal_value(transaction.get('Credit', '0'))
-                balance = convert_decimal_value(transaction.get('Balance', '0'))
-
-                # Classify the transaction description
-                label = classify_description(transaction.get('Description', ''))
-                
-                # Prepare transaction data for insertion
-                transaction_data_tuple = (
-                    personal_id,
-                    personal_info.get('BankName', ''),
-                    personal_info.get('PersonName', ''),
-                    personal_info.get('AccountNo', ''),
-                    transaction_date,
-                    value_date,
-                    transaction.get('Description', ''),
-                    debit,
-                    credit,
-                    balance,
-                    label
-                )
-                cursor.execute(transaction_insert_query, transaction_data_tuple)
-
-            # Commit all changes to the database
+            if incremental:
+                # A row stored by a concurrent upload since the lookup is left as it is
+                transaction_insert_query += " ON DUPLICATE KEY UPDATE RowHash = RowHash"
+            total_rows = 0
+            chunk_stats = []
+            for prepared_rows, labels, sources in batches:
+                rows = []
+                for (values, row_hash), label, source in zip(prepared_rows, labels, sources):
+                    # Prepare transaction data for insertion
+                    transaction_data_tuple = (
+                        personal_id,
+                        personal_info.get('BankName', ''),
+                        personal_info.get('PersonName', ''),
+                        account_no,
+                    ) + values + (label, source, row_hash)
+                    rows.append(transaction_data_tuple)
+
+                # Insert the prepared rows in chunks
+                with time_stage('insert'):
+                    chunk_stats.extend(bulk_insert_transactions(
+                        conn,
+                        cursor,
+                        transaction_insert_query,
+                        rows,
+                        chunk_size=chunk_size,
+                        commit_per_chunk=commit_per_chunk,
+                        start_index=len(chunk_stats),
+                        on_commit=on_commit
+                    ))
+                total_rows += len(rows)
+
+            # Commit all changes to the database, invalidating cached search results once per statement
+            bump_data_version(cursor)
             conn.commit()
+            committed.clear()
+
+        return {'rows': total_rows, 'skipped': sum(skipped), 'resumed': sum(resumed), 'chunks': chunk_stats}
 
     except mysql.connector.Error as err:
         # Handle MySQL errors
@@ -172,6 +481,9 @@ def insert_data_to_db(personal_info, transaction_data):
         # Handle unexpected errors
         raise DatabaseError(f"Unexpected error: {str(e)}")
     finally:
-        # Ensure database connection is closed
-        if conn.is_connected():
+        # Return the connection to the pool
+        if conn is not None:
             conn.close()
+        if committed:
+            # The statement failed after some chunks were committed; those rows are visible now
+            bump_data_version_now()
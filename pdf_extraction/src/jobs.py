@@ -0,0 +1,171 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+# Custom exception raised when the job queue cannot take more work
+class QueueFullError(Exception):
+    pass
+
+class Job:
+    """
+    State of one background ingestion job.
+    """
+
+    def __init__(self, filename, args, key=None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.key = key
+        self.args = args
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.timings = {}
+        self.result = None
+        self.status_code = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._stage_started = None
+        self._lock = threading.Lock()
+
+    def update(self, stage, progress=None):
+        """
+        Move the job to a new stage and record how long the previous one took.
+
+        :param stage: Name of the stage that is starting.
+        :param progress: Overall progress between 0 and 1.
+        """
+        with self._lock:
+            now = time.perf_counter()
+            if stage != self.stage:
+                if self._stage_started is not None:
+                    self.timings[self.stage] = round(now - self._stage_started, 3)
+                self.stage = stage
+                self._stage_started = now
+            if progress is not None:
+                self.progress = round(min(max(progress, 0.0), 1.0), 3)
+
+    def start(self):
+        self.status = 'running'
+        self.started_at = time.time()
+        self.update('started', 0.0)
+
+    def finish(self, result, status_code):
+        # Failed jobs keep their progress; timings show the last stage that ran
+        self.update('done' if status_code < 400 else 'failed', 1.0 if status_code < 400 else None)
+        self.result = result
+        self.status_code = status_code
+        self.status = 'succeeded' if status_code < 400 else 'failed'
+        self.finished_at = time.time()
+
+    def to_dict(self):
+        """
+        Serialize the job for the status endpoint.
+
+        :return: Dictionary describing the job.
+        """
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'filename': self.filename,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': self.progress,
+                'timings': dict(self.timings),
+                'queued_seconds': round((self.started_at or time.time()) - self.created_at, 3),
+                'total_seconds': round(self.finished_at - self.created_at, 3) if self.finished_at else None,
+                'result': self.result,
+                'status_code': self.status_code
+            }
+
+class JobManager:
+    """
+    Bounded queue of ingestion jobs processed by a fixed pool of worker threads.
+    """
+
+    def __init__(self, handler, workers=2, max_queue=10, retention_seconds=3600):
+        """
+        :param handler: Callable run as handler(*job.args, progress=job.update) returning (result, status_code).
+        :param workers: Number of worker threads.
+        :param max_queue: Maximum number of jobs waiting to start.
+        :param retention_seconds: How long finished jobs stay queryable.
+        """
+        self.handler = handler
+        self.retention_seconds = retention_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        for index in range(workers):
+            threading.Thread(target=self._work, name=f'ingest-worker-{index}', daemon=True).start()
+
+    def submit(self, filename, *args, key=None):
+        """
+        Queue a job without blocking.
+
+        :param filename: Name of the uploaded file, for reporting.
+        :param args: Positional arguments for the handler.
+        :param key: Optional identity of the work (e.g. a content hash), see find_active.
+        :return: The queued Job.
+        :raises QueueFullError: If the queue is at capacity.
+        """
+        self._prune()
+        job = Job(filename, args, key)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError(f"Ingestion queue is full ({self._queue.maxsize} jobs waiting)")
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        """
+        Look up a job by ID.
+
+        :param job_id: Job identifier returned by submit.
+        :return: The Job, or None if it is unknown or expired.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, key):
+        """
+        Find a queued or running job submitted with the given key.
+
+        :param key: Key passed to submit.
+        :return: The Job, or None if no such job is in flight.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.finished_at is None:
+                    return job
+        return None
+
+    def queue_depth(self):
+        """
+        :return: Number of jobs waiting to start.
+        """
+        return self._queue.qsize()
+
+    def _prune(self):
+        # Forget finished jobs past the retention window
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.start()
+            try:
+                result, status_code = self.handler(*job.args, progress=job.update)
+            except Exception as e:
+                logging.error(f'Job {job.id} failed: {e}')
+                result, status_code = {'error': str(e)}, 500
+            job.finish(result, status_code)
+            logging.info(f'Job {job.id} finished with status {status_code} in {job.to_dict()["total_seconds"]}s')
+            self._queue.task_done()
@@ -0,0 +1,119 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Location of the durable label store and size of the in-memory LRU in front of it
+LABEL_CACHE_PATH = os.getenv('LABEL_CACHE_PATH', 'label_cache.sqlite3')
+LABEL_CACHE_SIZE = int(os.getenv('LABEL_CACHE_SIZE', 10000))
+
+def normalize_description(description):
+    """
+    Build the cache key for a transaction description.
+
+    Reference numbers, card prefixes and punctuation change on every transaction,
+    so only the alphabetic tokens (merchant name, channel) are kept.
+
+    :param description: Raw description from the statement.
+    :return: Normalized key, or an empty string if nothing usable is left.
+    """
+    if not isinstance(description, str):
+        return ''
+    tokens = re.split(r'[^A-Z0-9]+', description.upper())
+    return ' '.join(token for token in tokens if token and not any(ch.isdigit() for ch in token))
+
+class LabelCache:
+    """
+    Two-level cache of description labels: an in-memory LRU over a SQLite table.
+    """
+
+    def __init__(self, path=LABEL_CACHE_PATH, max_size=LABEL_CACHE_SIZE):
+        """
+        :param path: SQLite file used as the durable store.
+        :param max_size: Maximum number of entries kept in memory.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS label_cache (description_key TEXT PRIMARY KEY, label TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _remember(self, key, label):
+        # Insert into the LRU and evict the least recently used entry if full
+        self._memory[key] = label
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, description):
+        """
+        Look up the label for a description.
+
+        :param description: Raw description from the statement.
+        :return: Cached label, or None on a miss.
+        """
+        key = normalize_description(description)
+        if not key:
+            return None
+        with self._lock:
+            label = self._memory.get(key)
+            if label is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._conn.execute(
+                    "SELECT label FROM label_cache WHERE description_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    label = row[0]
+                    self._remember(key, label)
+            if label is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return label
+
+    def set(self, description, label):
+        """
+        Store the label for a description in memory and on disk.
+
+        :param description: Raw description from the statement.
+        :param label: Label assigned by the classifier.
+        """
+        key = normalize_description(description)
+        if not key:
+            return
+        with self._lock:
+            self._remember(key, label)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO label_cache (description_key, label) VALUES (?, ?)", (key, label)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return hit and miss counters for the cache.
+
+        :return: Dictionary with hits, misses, hit ratio and in-memory size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory)
+            }
+
+# Shared cache instance used by the classifier
+label_cache = LabelCache()
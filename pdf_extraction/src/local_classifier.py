@@ -0,0 +1,228 @@
+import copy
+import logging
+import os
+import threading
+import time
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from dotenv import load_dotenv
+from common.db import connection
+from src.label_cache import normalize_description
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Labels the classifier can assign: the categories the LLM is asked to choose from
+LABELS = ['EMI', 'Food', 'Fuel', 'IPMS', 'Others', 'Super Market', 'Travel']
+
+# Label descriptions locally and send only the uncertain ones to the API
+LOCAL_CLASSIFIER_ENABLED = os.getenv('LOCAL_CLASSIFIER', '1') == '1'
+
+# File the trained model and its training watermark are kept in
+LOCAL_CLASSIFIER_PATH = os.getenv('LOCAL_CLASSIFIER_PATH', 'local_classifier.joblib')
+
+# Minimum predicted probability for a local label to be used instead of asking the API
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', 0.8))
+
+# LLM-labelled rows the model must have seen before its predictions are used
+LOCAL_CLASSIFIER_MIN_ROWS = int(os.getenv('LOCAL_CLASSIFIER_MIN_ROWS', 500))
+
+# Seconds between incremental training runs on newly stored rows
+LOCAL_CLASSIFIER_REFRESH = int(os.getenv('LOCAL_CLASSIFIER_REFRESH', 900))
+
+# Rows read from Transaction_Info per training step
+TRAIN_BATCH_SIZE = 5000
+
+def description_text(description):
+    # Train and predict on the merchant part: reference numbers only add noise
+    if not isinstance(description, str):
+        return ''
+    return normalize_description(description) or description.upper()
+
+class LocalClassifier:
+    """
+    Linear model over hashed character n-grams, trained on LLM-assigned labels.
+
+    The hashing vectorizer needs no fitted vocabulary, so the model can be
+    updated with partial_fit as new labelled rows arrive instead of being
+    retrained from scratch. Predictions below the confidence threshold are
+    returned as None so the caller can ask the API instead.
+    """
+
+    def __init__(self, path=LOCAL_CLASSIFIER_PATH, threshold=LOCAL_CLASSIFIER_THRESHOLD, min_rows=LOCAL_CLASSIFIER_MIN_ROWS):
+        """
+        :param path: File the model is saved to and loaded from (None keeps it in memory only).
+        :param threshold: Minimum probability of a label that is used.
+        :param min_rows: Training rows needed before predictions are used.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.min_rows = min_rows
+        # char_wb n-grams stay inside words, so merchant names match whatever surrounds them
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 5), n_features=2 ** 18, alternate_sign=False, norm='l2'
+        )
+        self.model = None
+        self.watermark = 0
+        self.trained_rows = 0
+        self.confident = 0
+        self.deferred = 0
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                state = joblib.load(path)
+                self.model, self.watermark, self.trained_rows = state['model'], state['watermark'], state['trained_rows']
+            except Exception as e:
+                logging.warning(f'Ignoring unreadable local classifier {path}: {e}')
+
+    def features(self, descriptions):
+        """
+        :param descriptions: List of raw descriptions.
+        :return: Sparse feature matrix.
+        """
+        return self.vectorizer.transform([description_text(description) for description in descriptions])
+
+    def ready(self):
+        """
+        :return: True once the model has seen enough rows for its predictions to be used.
+        """
+        return self.model is not None and self.trained_rows >= self.min_rows
+
+    def partial_fit(self, descriptions, labels):
+        """
+        Update the model with labelled descriptions.
+
+        The update runs on a copy that replaces the model when done, so
+        predictions made meanwhile use a consistent model.
+
+        :param descriptions: List of raw descriptions.
+        :param labels: Labels aligned with descriptions; labels outside LABELS are ignored.
+        :return: Number of rows the model learned from.
+        """
+        rows = [(description, label) for description, label in zip(descriptions, labels) if label in LABELS]
+        if not rows:
+            return 0
+        with self._lock:
+            model = copy.deepcopy(self.model) if self.model is not None else SGDClassifier(
+                loss='modified_huber', alpha=1e-5, random_state=0
+            )
+        model.partial_fit(self.features([description for description, _ in rows]), [label for _, label in rows], classes=LABELS)
+        with self._lock:
+            self.model = model
+            self.trained_rows += len(rows)
+        return len(rows)
+
+    def predict(self, descriptions):
+        """
+        Predict labels with their probabilities.
+
+        :param descriptions: List of raw descriptions.
+        :return: List of (label, probability) tuples, (None, 0.0) for all while the model is untrained.
+        """
+        model = self.model
+        if model is None or not descriptions:
+            return [(None, 0.0)] * len(descriptions)
+        probabilities = model.predict_proba(self.features(descriptions))
+        best = probabilities.argmax(axis=1)
+        return [(model.classes_[index], float(probabilities[row, index])) for row, index in enumerate(best)]
+
+    def confident_labels(self, descriptions):
+        """
+        Label the descriptions the model is sure about.
+
+        :param descriptions: List of raw descriptions.
+        :return: List aligned with descriptions: the label, or None where the caller should ask the API.
+        """
+        if not self.ready():
+            return [None] * len(descriptions)
+        labels = [label if probability >= self.threshold else None for label, probability in self.predict(descriptions)]
+        confident = sum(1 for label in labels if label is not None)
+        with self._lock:
+            self.confident += confident
+            self.deferred += len(labels) - confident
+        return labels
+
+    def train_from_db(self):
+        """
+        Learn from the rows stored since the last run.
+
+        Reads Transaction_Info past the RowID watermark in batches, skipping rows
+        this model labelled itself so it only ever learns from API answers.
+
+        :return: Number of new rows learned from.
+        """
+        with self._train_lock:
+            learned = 0
+            while True:
+                with connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute(
+                            """
+                            SELECT RowID, Description, label FROM Transaction_Info
+                            WHERE RowID > %s AND label IS NOT NULL AND (LabelSource IS NULL OR LabelSource <> 'local')
+                            ORDER BY RowID LIMIT %s
+                            """,
+                            (self.watermark, TRAIN_BATCH_SIZE)
+                        )
+                        rows = cursor.fetchall()
+                    finally:
+                        cursor.close()
+                if not rows:
+                    break
+                learned += self.partial_fit([row[1] for row in rows], [row[2] for row in rows])
+                self.watermark = rows[-1][0]
+                if len(rows) < TRAIN_BATCH_SIZE:
+                    break
+            if learned:
+                self.save()
+            return learned
+
+    def save(self):
+        """
+        Write the model and watermark atomically to the model file.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            state = {'model': self.model, 'watermark': self.watermark, 'trained_rows': self.trained_rows}
+        temporary = f'{self.path}.tmp'
+        joblib.dump(state, temporary)
+        os.replace(temporary, self.path)
+
+    def refresh_periodically(self, interval=LOCAL_CLASSIFIER_REFRESH):
+        """
+        Train on new rows every interval seconds; run in a daemon thread.
+
+        :param interval: Seconds between training runs.
+        """
+        while True:
+            try:
+                start = time.perf_counter()
+                learned = self.train_from_db()
+                if learned:
+                    logging.info(f'Local classifier learned {learned} rows in {time.perf_counter() - start:.2f}s '
+                                 f'({self.trained_rows} in total)')
+            except Exception as e:
+                logging.warning(f'Local classifier training failed: {e}')
+            time.sleep(interval)
+
+    def stats(self):
+        """
+        :return: Dictionary with training rows, watermark, readiness and confident/deferred prediction counts.
+        """
+        with self._lock:
+            predictions = self.confident + self.deferred
+            return {
+                'trained_rows': self.trained_rows,
+                'watermark': self.watermark,
+                'ready': self.ready(),
+                'confident': self.confident,
+                'deferred': self.deferred,
+                'confident_ratio': round(self.confident / predictions, 4) if predictions else 0.0
+            }
+
+# Shared classifier instance used by classify_descriptions
+local_classifier = LocalClassifier()
@@ -0,0 +1,139 @@
+import functools
+import time
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from common.db import pool_stats
+from common.llm import add_listener
+from src.label_cache import label_cache
+from src.local_classifier import local_classifier
+
+# Bucket bounds in seconds: stages run from milliseconds (regex header parsing) to minutes (long statements)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    'ingest_stage_seconds', 'Time spent in each ingestion stage', ['stage'], buckets=STAGE_BUCKETS
+)
+STATEMENT_SECONDS = Histogram(
+    'ingest_statement_seconds', 'End-to-end processing time of one statement', ['outcome'], buckets=STAGE_BUCKETS
+)
+STATEMENTS = Counter('ingest_statements', 'Statements processed, by outcome', ['outcome'])
+PAGES = Counter('ingest_pages', 'PDF pages of successfully processed statements')
+ROWS = Counter('ingest_rows', 'Transaction rows, by what happened to them', ['outcome'])
+HEADER_FIELDS = Counter('ingest_header_fields', 'Header fields, by where their value came from', ['source'])
+
+LLM_REQUESTS = Counter('llm_requests', 'OpenAI API requests, by purpose and outcome', ['purpose', 'outcome'])
+LLM_SECONDS = Histogram('llm_request_seconds', 'OpenAI API request latency', ['purpose'], buckets=LLM_BUCKETS)
+LLM_THROTTLE_SECONDS = Counter('llm_throttle_seconds', 'Time spent waiting for the client-side rate limiter and a request slot')
+LLM_TOKENS = Counter('llm_tokens', 'OpenAI API tokens used, by purpose and kind', ['purpose', 'kind'])
+
+QUEUE_DEPTH = Gauge('ingest_queue_depth', 'Jobs waiting to start', ['queue'])
+
+def time_stage(stage):
+    """
+    Time a block of work as an ingestion stage.
+
+    :param stage: Stage name, e.g. 'extract_tables'.
+    :return: Context manager that observes the block's duration.
+    """
+    return STAGE_SECONDS.labels(stage=stage).time()
+
+def record_llm_request(purpose, outcome, seconds, throttle_seconds, usage):
+    """
+    Count, time and tally the tokens of one OpenAI API request attempt (a common.llm listener).
+
+    :param purpose: What the request is for, e.g. 'classify_batch'.
+    :param outcome: 'success' or 'error'.
+    :param seconds: Request latency.
+    :param throttle_seconds: Time spent waiting before the request was sent.
+    :param usage: Token usage dictionary of the response.
+    """
+    LLM_REQUESTS.labels(purpose=purpose, outcome=outcome).inc()
+    LLM_SECONDS.labels(purpose=purpose).observe(seconds)
+    LLM_THROTTLE_SECONDS.inc(throttle_seconds)
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        if usage.get(kind):
+            LLM_TOKENS.labels(purpose=purpose, kind=kind.split('_')[0]).inc(usage[kind])
+
+def record_header_sources(sources):
+    """
+    Count header fields by source ('template', 'regex', 'llm' or 'missing').
+
+    :param sources: Field to source mapping from extract_entities_with_sources.
+    """
+    for source in sources.values():
+        HEADER_FIELDS.labels(source=source).inc()
+
+def statement_outcome(result, status_code):
+    if status_code >= 400:
+        return 'error'
+    return 'duplicate' if result.get('duplicate') else 'success'
+
+def track_statement(func):
+    """
+    Decorate a statement handler returning (result, status_code) to record its outcome,
+    duration, pages and rows.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result, status_code = func(*args, **kwargs)
+        outcome = statement_outcome(result, status_code)
+        STATEMENTS.labels(outcome=outcome).inc()
+        STATEMENT_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+        if outcome == 'success':
+            PAGES.inc(result.get('pages', 0))
+            ROWS.labels(outcome='inserted').inc(result.get('rows_inserted', 0))
+            ROWS.labels(outcome='skipped').inc(result.get('rows_skipped', 0))
+        return result, status_code
+    return wrapper
+
+class LabelCacheCollector:
+    """
+    Expose the label cache's own hit and miss counters at scrape time.
+    """
+
+    def collect(self):
+        stats = label_cache.stats()
+        yield CounterMetricFamily('label_cache_hits', 'Label cache lookups that found a label', value=stats['hits'])
+        yield CounterMetricFamily('label_cache_misses', 'Label cache lookups that found nothing', value=stats['misses'])
+        yield GaugeMetricFamily('label_cache_hit_ratio', 'Share of label cache lookups that hit', value=stats['hit_ratio'])
+        yield GaugeMetricFamily('label_cache_size', 'Labels held in memory', value=stats['memory_entries'])
+
+class DbPoolCollector:
+    """
+    Expose the shared database pool's usage counters at scrape time.
+    """
+
+    def collect(self):
+        stats = pool_stats()
+        yield GaugeMetricFamily('db_pool_size', 'Connections the pool holds', value=stats['size'])
+        yield GaugeMetricFamily('db_pool_in_use', 'Connections currently checked out', value=stats['in_use'])
+        yield GaugeMetricFamily('db_pool_peak_in_use', 'Most connections checked out at once', value=stats['peak_in_use'])
+        yield CounterMetricFamily('db_pool_checkouts', 'Connections handed out', value=stats['checkouts'])
+        yield CounterMetricFamily('db_pool_waits', 'Checkouts that waited for a free connection', value=stats['waits'])
+        yield CounterMetricFamily('db_pool_wait_seconds', 'Time checkouts spent waiting', value=stats['wait_seconds'])
+        yield CounterMetricFamily('db_pool_timeouts', 'Checkouts that gave up waiting', value=stats['timeouts'])
+        yield CounterMetricFamily(
+            'db_pool_health_check_failures', 'Checkouts whose connection failed its ping', value=stats['health_check_failures']
+        )
+
+class LocalClassifierCollector:
+    """
+    Expose how often the local classifier answered without the API.
+    """
+
+    def collect(self):
+        stats = local_classifier.stats()
+        predictions = CounterMetricFamily(
+            'local_classifier_predictions', 'Descriptions seen by the local classifier, by outcome', labels=['outcome']
+        )
+        predictions.add_metric(['confident'], stats['confident'])
+        predictions.add_metric(['deferred'], stats['deferred'])
+        yield predictions
+        yield GaugeMetricFamily('local_classifier_trained_rows', 'Labelled rows the local classifier has learned from', value=stats['trained_rows'])
+
+add_listener(record_llm_request)
+REGISTRY.register(LabelCacheCollector())
+REGISTRY.register(DbPoolCollector())
+REGISTRY.register(LocalClassifierCollector())
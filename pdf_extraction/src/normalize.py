@@ -0,0 +1,159 @@
+import logging
+import pandas as pd
+
+# Date formats found on supported bank statements, tried in order
+DATE_FORMATS = ['%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d-%b-%Y', '%d %b %Y', '%d/%m/%y', '%d-%b-%y', '%Y-%m-%d']
+
+# Statement column headers (whitespace collapsed, lower case) mapped to normalized column names
+COLUMN_ALIASES = {
+    'transaction date': 'TransactionDate',
+    'txn date': 'TransactionDate',
+    'tran date': 'TransactionDate',
+    'date': 'TransactionDate',
+    'valuedate': 'ValueDate',
+    'value date': 'ValueDate',
+    'value dt': 'ValueDate',
+    'description': 'Description',
+    'narration': 'Description',
+    'particulars': 'Description',
+    'debit': 'Debit',
+    'withdrawal': 'Debit',
+    'withdrawal amt.': 'Debit',
+    'credit': 'Credit',
+    'deposit': 'Credit',
+    'deposit amt.': 'Credit',
+    'balance': 'Balance',
+    'closing balance': 'Balance',
+}
+
+# Columns produced by normalize_transactions, in insert order
+NORMALIZED_COLUMNS = ['TransactionDate', 'ValueDate', 'Description', 'Debit', 'Credit', 'Balance']
+
+# Columns a row must have a value in to be kept (same rule as filter_valid_transactions)
+REQUIRED_COLUMNS = ['TransactionDate', 'ValueDate', 'Debit', 'Credit', 'Balance']
+
+def canonical_column(name):
+    """
+    Map a statement column header to its normalized name.
+
+    :param name: Column header as extracted from the PDF.
+    :return: Normalized name, or the header unchanged if it is not recognized.
+    """
+    key = ' '.join(str(name).split()).lower()
+    return COLUMN_ALIASES.get(key, name)
+
+def blank_mask(series, text):
+    """
+    Flag values that count as missing: NaN, None, empty strings and 'nan'.
+
+    :param series: Column to check.
+    :param text: The same column as stripped strings.
+    :return: Boolean Series, True where the value is missing.
+    """
+    return series.isna() | text.isin(['', 'nan', 'None'])
+
+def coalesce_columns(df):
+    """
+    Merge columns that were renamed to the same normalized name, such as
+    'Narration' and 'Description' or two date columns, into one.
+
+    :param df: DataFrame with normalized column names, possibly repeated.
+    :return: DataFrame with unique column names, each keeping the first non-blank value of the row.
+    """
+    if df.columns.is_unique:
+        return df
+    merged = {}
+    for position, name in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if name not in merged:
+            merged[name] = values
+            continue
+        missing = blank_mask(merged[name], merged[name].astype(str).str.strip())
+        merged[name] = merged[name].where(~missing, values)
+    return pd.DataFrame(merged, index=df.index)
+
+def parse_dates(text):
+    """
+    Parse a column of date strings that may mix several statement formats.
+
+    Each format is applied in bulk to the values no earlier format could parse.
+
+    :param text: Column of stripped date strings.
+    :return: datetime64 Series with NaT where no format matched.
+    """
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    for date_format in DATE_FORMATS:
+        pending = parsed.isna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(text[pending], format=date_format, errors='coerce')
+    return parsed
+
+def format_dates(dates):
+    """
+    Format parsed dates as YYYY-MM-DD strings using NumPy's ISO conversion.
+
+    :param dates: datetime64 Series without NaT.
+    :return: Series of date strings.
+    """
+    return pd.Series(dates.to_numpy().astype('datetime64[D]').astype(str), index=dates.index)
+
+def parse_amounts(text):
+    """
+    Parse a column of amounts such as '1,234.50' in bulk.
+
+    :param text: Column of stripped amount strings.
+    :return: float Series with NaN where the value is not a number.
+    """
+    return pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce')
+
+def normalize_transactions(df):
+    """
+    Validate and convert a PdfToTable DataFrame in bulk.
+
+    Renames known column headers, drops rows missing a required value or whose
+    dates or amounts do not parse, formats dates as YYYY-MM-DD and converts
+    amounts to floats.
+
+    :param df: DataFrame as returned by PdfToTable.
+    :return: DataFrame with NORMALIZED_COLUMNS, ready for insert_data_to_db(normalized=True).
+    """
+    if df.empty:
+        return pd.DataFrame(columns=NORMALIZED_COLUMNS)
+
+    df = coalesce_columns(df.rename(columns=canonical_column))
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing_columns:
+        logging.warning(f'Statement table has no {missing_columns} columns; found {list(df.columns)}')
+        return pd.DataFrame(columns=NORMALIZED_COLUMNS)
+    if 'Description' not in df.columns:
+        df['Description'] = ''
+
+    # Keep rows that have every required value
+    text = {column: df[column].astype(str).str.strip() for column in REQUIRED_COLUMNS}
+    valid = pd.Series(True, index=df.index)
+    for column in REQUIRED_COLUMNS:
+        valid &= ~blank_mask(df[column], text[column])
+    df = df[valid]
+    text = {column: values[valid] for column, values in text.items()}
+
+    transaction_dates = parse_dates(text['TransactionDate'])
+    value_dates = parse_dates(text['ValueDate'])
+    amounts = {column: parse_amounts(text[column]) for column in ('Debit', 'Credit', 'Balance')}
+
+    # Drop rows whose values are present but unparseable
+    parsed = transaction_dates.notna() & value_dates.notna()
+    for values in amounts.values():
+        parsed &= values.notna()
+    if not parsed.all():
+        logging.warning(f'Dropping {int((~parsed).sum())} rows with unparseable dates or amounts')
+
+    normalized = pd.DataFrame({
+        'TransactionDate': format_dates(transaction_dates[parsed]),
+        'ValueDate': format_dates(value_dates[parsed]),
+        'Description': df.loc[parsed, 'Description'].fillna('').astype(str),
+        'Debit': amounts['Debit'][parsed].astype(float),
+        'Credit': amounts['Credit'][parsed].astype(float),
+        'Balance': amounts['Balance'][parsed].astype(float),
+    })
+    return normalized.reset_index(drop=True)
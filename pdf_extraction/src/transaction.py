@@ -1,36 +1,240 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import fitz
 import pdfplumber
 import pandas as pd
+from dotenv import load_dotenv
+from src.normalize import normalize_transactions
 
-def PdfToTable(path):
+# Load environment variables from .env file
+load_dotenv()
+
+# Number of processes used for table extraction (1 keeps extraction in-process)
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', 1))
+
+# Statements shorter than this are extracted in-process; starting a pool costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 20))
+
+# Table extraction backend: 'pdfplumber' or 'pymupdf' (needs PyMuPDF >= 1.23 for page.find_tables)
+PDF_TABLE_BACKEND = os.getenv('PDF_TABLE_BACKEND', 'pdfplumber')
+TABLE_BACKENDS = ('pdfplumber', 'pymupdf')
+
+def open_pdfplumber(source):
+    """
+    Open a PDF with pdfplumber from a path or from the file's bytes.
+
+    :param source: File path or PDF bytes.
+    :return: pdfplumber PDF handle.
+    """
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def open_fitz(source):
+    """
+    Open a PDF with PyMuPDF from a path or from the file's bytes.
+
+    :param source: File path or PDF bytes.
+    :return: PyMuPDF document.
+    """
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(source)
+
+def table_to_frame(table):
+    """
+    Convert an extracted table (header row first) to a DataFrame.
+
+    :param table: List of rows as returned by the extraction backend.
+    :return: DataFrame of the table, or None if the table is empty.
+    """
+    if not table:
+        return None
+    # Convert the table data to a DataFrame and drop rows with missing values
+    df = pd.DataFrame(table[1:], columns=table[0])
+    return df.dropna()
+
+def page_to_frame(page):
+    """
+    Extract the table on one pdfplumber page as a DataFrame.
+
+    :param page: pdfplumber page.
+    :return: DataFrame of the page's table, or None if the page has no table.
+    """
+    return table_to_frame(page.extract_table())
+
+def fitz_page_to_frame(page):
+    """
+    Extract the first table on one PyMuPDF page as a DataFrame.
+
+    :param page: PyMuPDF page.
+    :return: DataFrame of the page's table, or None if the page has no table.
+    """
+    tables = page.find_tables().tables
+    if not tables:
+        return None
+    table = tables[0]
+    rows = table.extract()
+    if table.header.external:
+        # The header sits above the ruled area, so it is not part of the extracted rows
+        rows = [table.header.names] + rows
+    return table_to_frame(rows)
+
+def check_backend(backend):
+    """
+    Validate a table backend name.
+
+    :param backend: Backend name, or None for PDF_TABLE_BACKEND.
+    :return: The backend name to use.
+    """
+    backend = backend or PDF_TABLE_BACKEND
+    if backend not in TABLE_BACKENDS:
+        raise ValueError(f"Unknown table backend '{backend}', expected one of {TABLE_BACKENDS}")
+    if backend == 'pymupdf' and not hasattr(fitz.Page, 'find_tables'):
+        raise RuntimeError("The pymupdf table backend needs PyMuPDF >= 1.23 (page.find_tables)")
+    return backend
+
+def iter_page_frames(source, backend=None, fitz_document=None, start=0, end=None):
+    """
+    Yield the table of each page in [start, end) as a DataFrame.
+
+    :param source: File path or PDF bytes.
+    :param backend: Table backend name (defaults to PDF_TABLE_BACKEND).
+    :param fitz_document: Already open PyMuPDF document to reuse with the pymupdf backend.
+    :param start: Index of the first page.
+    :param end: Index one past the last page (defaults to the page count).
+    :return: Generator of (page_number, page_count, DataFrame or None) tuples.
+    """
+    backend = check_backend(backend)
+    if backend == 'pymupdf':
+        document = fitz_document if fitz_document is not None else open_fitz(source)
+        try:
+            page_count = len(document)
+            for index in range(start, page_count if end is None else end):
+                yield index + 1, page_count, fitz_page_to_frame(document.load_page(index))
+        finally:
+            if document is not fitz_document:
+                document.close()
+    else:
+        with open_pdfplumber(source) as pdf:
+            page_count = len(pdf.pages)
+            for index, page in enumerate(pdf.pages[start:end], start=start):
+                df = page_to_frame(page)
+                # Drop the parsed layout objects of this page before moving on
+                page.flush_cache()
+                yield index + 1, page_count, df
+
+def extract_page_range(source, start, end, backend=None):
+    """
+    Extract the tables of pages [start, end) in their own document handle.
+
+    Runs inside pool workers, so each call opens the file independently.
+
+    :param source: File path or PDF bytes.
+    :param start: Index of the first page.
+    :param end: Index one past the last page.
+    :param backend: Table backend name.
+    :return: List of DataFrames in page order.
+    """
+    return [df for _, _, df in iter_page_frames(source, backend, start=start, end=end) if df is not None]
+
+def page_ranges(page_count, parts):
+    """
+    Split page indices into contiguous, nearly equal ranges.
+
+    :param page_count: Number of pages in the document.
+    :param parts: Number of ranges to produce.
+    :return: List of (start, end) tuples in page order.
+    """
+    parts = max(1, min(parts, page_count))
+    size, remainder = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def iter_page_rows(source, on_page=None, backend=None, fitz_document=None, normalize=False, start=0):
+    """
+    Yield the table rows of each page as a list of dictionaries, one page at a time.
+
+    :param source: File path or PDF bytes.
+    :param on_page: Optional callback on_page(page_number, page_count) after each page is read.
+    :param backend: Table backend name (defaults to PDF_TABLE_BACKEND).
+    :param fitz_document: Already open PyMuPDF document to reuse with the pymupdf backend.
+    :param normalize: Run each page through normalize_transactions before yielding its rows.
+    :param start: Index of the first page to read.
+    :return: Generator of (page_number, rows) tuples; rows is empty for pages without a table.
+    """
+    for page_number, page_count, df in iter_page_frames(source, backend, fitz_document, start=start):
+        if on_page:
+            on_page(page_number, page_count)
+        if df is None:
+            yield page_number, []
+            continue
+        if normalize:
+            df = normalize_transactions(df)
+        yield page_number, df.to_dict(orient='records')
+
+def iter_transaction_rows(source, on_page=None, backend=None, fitz_document=None, normalize=False):
+    """
+    Yield table rows page by page as dictionaries, keeping at most one page in memory.
+
+    :param source: File path or PDF bytes.
+    :param on_page: Optional callback on_page(page_number, page_count) after each page is read.
+    :param backend: Table backend name (defaults to PDF_TABLE_BACKEND).
+    :param fitz_document: Already open PyMuPDF document to reuse with the pymupdf backend.
+    :param normalize: Run each page through normalize_transactions before yielding its rows.
+    :return: Generator of row dictionaries keyed by the table header (or normalized columns).
+    """
+    for _, rows in iter_page_rows(source, on_page, backend, fitz_document, normalize):
+        yield from rows
+
+def PdfToTable(source, workers=None, backend=None, fitz_document=None):
     """
     Extracts tables from a PDF file and returns the combined data as a pandas DataFrame.
-    
-    :param path: Path to the PDF file.
+
+    With more than one worker, long statements are split into page ranges that a
+    process pool extracts in parallel; results are concatenated in page order.
+
+    :param source: File path or PDF bytes.
+    :param workers: Number of extraction processes (defaults to PDF_WORKERS).
+    :param backend: Table backend name (defaults to PDF_TABLE_BACKEND).
+    :param fitz_document: Already open PyMuPDF document, reused for page counting and the pymupdf backend.
     :return: A DataFrame containing the combined table data from all pages of the PDF.
     """
-    # Open the PDF file
-    pdf = pdfplumber.open(path)
-    all_tables = []  # List to hold DataFrames of tables from each page
-    
-    # Iterate over each page in the PDF
-    for page in pdf.pages:
-        # Extract table from the current page
-        table = page.extract_table()
-        if table:
-            # Convert the table data to a DataFrame
-            df = pd.DataFrame(table[1:], columns=table[0])
-            # Drop rows with missing values
-            df = df.dropna()
-            # Append the DataFrame to the list of tables
-            all_tables.append(df)
-    
+    workers = workers or PDF_WORKERS
+    backend = check_backend(backend)
+
+    if fitz_document is not None:
+        page_count = len(fitz_document)
+    else:
+        with open_fitz(source) as document:
+            page_count = len(document)
+
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        # Iterate over each page in the PDF
+        all_tables = [df for _, _, df in iter_page_frames(source, backend, fitz_document) if df is not None]
+    else:
+        # Twice as many ranges as workers evens out pages that take longer than others
+        ranges = page_ranges(page_count, workers * 2)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, which keeps pages in order
+            results = executor.map(
+                extract_page_range,
+                [source] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [backend] * len(ranges)
+            )
+            all_tables = [df for frames in results for df in frames]
+
     # Concatenate all DataFrames into a single DataFrame
     if all_tables:
         final_df = pd.concat(all_tables, ignore_index=True)
     else:
         # Return an empty DataFrame if no tables were found
-        final_df = pd.DataFrame() 
-    
-    # Close the PDF file
-    pdf.close()
+        final_df = pd.DataFrame()
+
     return final_df
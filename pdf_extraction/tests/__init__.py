@@ -0,0 +1,16 @@
+"""
+Tests for the ingestion pipeline. Run from the pdf_extraction directory:
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+# Add the repository root for the shared modules in common/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Settings read at import time point at a scratch directory, never at the working copy's caches
+WORK_DIR = tempfile.mkdtemp(prefix='pdf_extraction_tests_')
+os.environ['LABEL_CACHE_PATH'] = os.path.join(WORK_DIR, 'labels.sqlite3')
+os.environ['INGEST_CHECKPOINT_DIR'] = os.path.join(WORK_DIR, 'checkpoints')
+os.environ['LOCAL_CLASSIFIER_PATH'] = os.path.join(WORK_DIR, 'local_classifier.joblib')
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+from unittest import mock
+import common.db
+import common.llm
+import api
+import benchmarks.sqlite_db as sqlite_db
+import src.insert_db as insert_db
+from benchmarks.fake_openai import start_fake_openai
+from benchmarks.synthetic_pdf import generate_statement, layout_header
+from src.checkpoint import CHECKPOINT_DIR, Checkpoint
+
+def wait_for(manager, job_id, timeout=120):
+    deadline = time.time() + timeout
+    while manager.get(job_id).finished_at is None:
+        if time.time() > deadline:
+            raise TimeoutError(f'Job {job_id} did not finish')
+        time.sleep(0.05)
+    return manager.get(job_id)
+
+class TestCheckpointRetry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = start_fake_openai(latency=0.0)
+        common.llm.configure(api_key='fake-key', api_base=cls.server.api_base)
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.work_dir, 'db.sqlite3')
+        sqlite_db.create_schema(self.db)
+        common.db.set_connection_factory(sqlite_db.connection_factory(self.db))
+        pdf = os.path.join(self.work_dir, 'statement.pdf')
+        generate_statement(pdf, pages=4, rows_per_page=35, seed=1, header_lines=layout_header('yes', 1))
+        with open(pdf, 'rb') as pdf_file:
+            self.data = pdf_file.read()
+        self.digest = api.content_hash(self.data)
+        self.client = api.app.test_client()
+
+    def tearDown(self):
+        common.db.set_connection_factory(None)
+
+    def fail_inserts(self, failing_calls):
+        # Fail the given executemany() calls, counted across every attempt, like a dropped connection
+        calls = [0]
+        original = sqlite_db.SQLiteCursor.executemany
+
+        def executemany(cursor, query, rows):
+            calls[0] += 1
+            if calls[0] in failing_calls:
+                raise RuntimeError('connection lost')
+            return original(cursor, query, rows)
+        return mock.patch.object(sqlite_db.SQLiteCursor, 'executemany', executemany)
+
+    def retry(self, job_id):
+        response = self.client.post(f'/jobs/{job_id}/retry')
+        self.assertEqual(response.status_code, 202, response.json)
+        return wait_for(api.job_manager, response.json['job_id'])
+
+    def test_retry_that_fails_again_can_be_retried(self):
+        checkpoint = Checkpoint(self.digest)
+        with mock.patch.object(insert_db, 'INSERT_CHUNK_SIZE', 30), self.fail_inserts({3, 4}):
+            job = api.job_manager.submit('statement.pdf', self.data, self.digest, key=self.digest)
+            first = wait_for(api.job_manager, job.id)
+            self.assertEqual(first.status_code, 500)
+            self.assertIsNotNone(checkpoint.source_path())
+            stored_after_first = sqlite_db.table_count(self.db, 'Transaction_Info')
+            self.assertEqual(stored_after_first, 60)
+
+            # The kept PDF is the retry's source; failing again must not delete it
+            second = self.retry(job.id)
+            self.assertEqual(second.status_code, 500)
+            self.assertIsNotNone(checkpoint.source_path())
+
+            third = self.retry(second.id)
+
+        self.assertEqual(third.status_code, 200, third.result)
+        self.assertEqual(third.result['rows_resumed'], stored_after_first)
+        self.assertEqual(sqlite_db.table_count(self.db, 'Transaction_Info'), 135)
+        self.assertFalse(os.path.exists(checkpoint.path))
+
+    def test_statement_without_tables_is_not_kept_for_retry(self):
+        checkpoint = Checkpoint(self.digest)
+        with mock.patch.object(api.StatementDocument, 'table', return_value=pd.DataFrame()):
+            job = api.job_manager.submit('statement.pdf', self.data, self.digest, key=self.digest)
+            failed = wait_for(api.job_manager, job.id)
+        self.assertEqual(failed.status_code, 422)
+        self.assertEqual(failed.result['error'], 'Error extracting tables from the PDF document')
+        self.assertIsNone(checkpoint.source_path())
+        self.assertFalse(os.path.exists(checkpoint.path))
+        response = self.client.post(f'/jobs/{job.id}/retry')
+        self.assertEqual(response.status_code, 409)
+
+    def test_checkpoint_file_is_not_discarded(self):
+        checkpoint = Checkpoint(self.digest)
+        path = checkpoint.keep_source(self.data)
+        try:
+            api.discard_upload(path)
+            self.assertTrue(os.path.exists(path))
+            self.assertTrue(path.startswith(CHECKPOINT_DIR))
+        finally:
+            checkpoint.clear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from src.classification import parse_batch_answer, split_batches
+
+class TestParseBatchAnswer(unittest.TestCase):
+
+    def test_numbered_lines(self):
+        answer = '1. Food\n2) Fuel\n3 - "Travel"\n 4: EMI '
+        self.assertEqual(parse_batch_answer(answer, 4), ['Food', 'Fuel', 'Travel', 'EMI'])
+
+    def test_out_of_order_and_missing_lines(self):
+        self.assertEqual(parse_batch_answer('3. Others\n1. Food', 3), ['Food', None, 'Others'])
+
+    def test_invalid_lines_are_left_empty(self):
+        answer = 'Here are the labels:\n1. Shopping\n2. Fuel\n5. Food\n0. Food'
+        self.assertEqual(parse_batch_answer(answer, 3), [None, 'Fuel', None])
+
+    def test_first_answer_for_a_position_wins(self):
+        self.assertEqual(parse_batch_answer('1. Food\n1. Fuel', 1), ['Food'])
+
+    def test_empty_answer(self):
+        self.assertEqual(parse_batch_answer('', 2), [None, None])
+
+class TestSplitBatches(unittest.TestCase):
+
+    def test_limits(self):
+        descriptions = ['a' * 10] * 5
+        self.assertEqual([len(batch) for batch in split_batches(descriptions, batch_size=2, max_chars=100)], [2, 2, 1])
+        self.assertEqual([len(batch) for batch in split_batches(descriptions, batch_size=10, max_chars=25)], [2, 2, 1])
+
+    def test_long_description_gets_its_own_batch(self):
+        self.assertEqual(list(split_batches(['a' * 50, 'b'], batch_size=10, max_chars=20)), [['a' * 50], ['b']])
+
+if __name__ == '__main__':
+    unittest.main()
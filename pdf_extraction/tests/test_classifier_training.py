@@ -0,0 +1,30 @@
+import os
+import unittest
+from unittest import mock
+import api
+
+class TestStartClassifierTraining(unittest.TestCase):
+
+    def start(self, debug, environ):
+        with mock.patch.dict(os.environ), mock.patch.object(api, 'LOCAL_CLASSIFIER_ENABLED', True), \
+                mock.patch.object(api.threading, 'Thread') as thread:
+            os.environ.pop('WERKZEUG_RUN_MAIN', None)
+            os.environ.update(environ)
+            started = api.start_classifier_training(debug)
+        return started is not None, thread.call_count
+
+    def test_reloader_watcher_does_not_train(self):
+        self.assertEqual(self.start(True, {}), (False, 0))
+
+    def test_reloader_child_trains(self):
+        self.assertEqual(self.start(True, {'WERKZEUG_RUN_MAIN': 'true'}), (True, 1))
+
+    def test_without_reloader(self):
+        self.assertEqual(self.start(False, {}), (True, 1))
+
+    def test_disabled(self):
+        with mock.patch.object(api, 'LOCAL_CLASSIFIER_ENABLED', False):
+            self.assertIsNone(api.start_classifier_training(False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import mysql.connector
+from mysql.connector import errorcode
+import common.data_version as data_version
+import common.db
+import common.llm
+import benchmarks.sqlite_db as sqlite_db
+from benchmarks.fake_openai import start_fake_openai
+from src.insert_db import DatabaseError, insert_data_to_db
+
+PERSONAL_INFO = repr({'BankName': 'Test Bank', 'PersonName': 'Test Person', 'BranchName': 'Main',
+                      'AccountNo': '1234567890', 'IFSC': 'TEST0000001', 'CustomerID': 'C1'})
+
+def transactions(count):
+    return [{
+        'TransactionDate': f'2024-01-{day % 28 + 1:02d}',
+        'ValueDate': f'2024-01-{day % 28 + 1:02d}',
+        'Description': f'UPI/PAYMENT/{day}',
+        'Debit': 10.0 + day,
+        'Credit': 0.0,
+        'Balance': 1000.0 - day
+    } for day in range(count)]
+
+class MissingTableCursor:
+    # Cursor of a database where db/migrate_data_version.sql was not applied
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, query, params=None):
+        self.calls += 1
+        raise mysql.connector.ProgrammingError(msg="Table 'Data_Version' doesn't exist", errno=errorcode.ER_NO_SUCH_TABLE)
+
+class TestDataVersion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = start_fake_openai(latency=0.0)
+        common.llm.configure(api_key='fake-key', api_base=cls.server.api_base)
+
+    def setUp(self):
+        self.db = os.path.join(tempfile.mkdtemp(), 'db.sqlite3')
+        sqlite_db.create_schema(self.db)
+        common.db.set_connection_factory(sqlite_db.connection_factory(self.db))
+        table = mock.patch.dict(data_version._table, {'available': True})
+        table.start()
+        self.addCleanup(table.stop)
+
+    def tearDown(self):
+        common.db.set_connection_factory(None)
+
+    def version(self):
+        conn = sqlite3.connect(self.db)
+        try:
+            return conn.execute("SELECT Version FROM Data_Version WHERE ID = 1").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_bumped_once_per_statement(self):
+        result = insert_data_to_db(PERSONAL_INFO, transactions(50), chunk_size=10, commit_per_chunk=True, normalized=True)
+        self.assertEqual(result['rows'], 50)
+        self.assertEqual(len(result['chunks']), 5)
+        self.assertEqual(self.version(), 1)
+
+    def test_bumped_after_failure_with_committed_chunks(self):
+        calls = [0]
+        original = sqlite_db.SQLiteCursor.executemany
+
+        def executemany(cursor, query, rows):
+            calls[0] += 1
+            if calls[0] == 3:
+                raise RuntimeError('connection lost')
+            return original(cursor, query, rows)
+        with mock.patch.object(sqlite_db.SQLiteCursor, 'executemany', executemany):
+            with self.assertRaises(DatabaseError):
+                insert_data_to_db(PERSONAL_INFO, transactions(50), chunk_size=10, commit_per_chunk=True, normalized=True)
+        self.assertEqual(sqlite_db.table_count(self.db, 'Transaction_Info'), 20)
+        self.assertEqual(self.version(), 1)
+
+    def test_missing_table_is_tolerated(self):
+        cursor = MissingTableCursor()
+        with self.assertLogs(level='WARNING'):
+            data_version.bump_data_version(cursor)
+        # Not looked for again
+        data_version.bump_data_version(cursor)
+        self.assertEqual(cursor.calls, 1)
+
+    def test_other_errors_are_raised(self):
+        cursor = mock.Mock()
+        cursor.execute.side_effect = mysql.connector.OperationalError(msg='Lock wait timeout exceeded',
+                                                                     errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        with self.assertRaises(mysql.connector.OperationalError):
+            data_version.bump_data_version(cursor)
+        self.assertTrue(data_version._table['available'])
+
+if __name__ == '__main__':
+    unittest.main()
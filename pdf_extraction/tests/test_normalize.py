@@ -0,0 +1,34 @@
+import unittest
+import pandas as pd
+from src.normalize import NORMALIZED_COLUMNS, normalize_transactions
+
+class TestNormalizeTransactions(unittest.TestCase):
+
+    def test_known_headers(self):
+        df = pd.DataFrame([['01/02/2024', '01/02/2024', 'UPI/COFFEE', '1,250.50', '0', '10,000.00']],
+                          columns=['Txn Date', 'Value  Dt', 'Particulars', 'Withdrawal Amt.', 'Deposit Amt.', 'Closing Balance'])
+        normalized = normalize_transactions(df)
+        self.assertEqual(list(normalized.columns), NORMALIZED_COLUMNS)
+        self.assertEqual(normalized.iloc[0].tolist(), ['2024-02-01', '2024-02-01', 'UPI/COFFEE', 1250.5, 0.0, 10000.0])
+
+    def test_duplicate_canonical_columns_are_coalesced(self):
+        # Two columns map to TransactionDate and two to Description
+        df = pd.DataFrame([
+            ['05/03/2024', '', '05/03/2024', 'NEFT/RENT', 'Rent March', '20000', '0', '50000'],
+            ['', '06-03-2024', '06/03/2024', '', 'ATM CASH', '500', '0', '49500'],
+            ['07/03/2024', '07/03/2024', '07/03/2024', None, '', '0', '1000', '50500'],
+        ], columns=['Date', 'Tran Date', 'Value Date', 'Narration', 'Description', 'Debit', 'Credit', 'Balance'])
+        normalized = normalize_transactions(df)
+        self.assertEqual(list(normalized.columns), NORMALIZED_COLUMNS)
+        self.assertEqual(normalized['TransactionDate'].tolist(), ['2024-03-05', '2024-03-06', '2024-03-07'])
+        self.assertEqual(normalized['Description'].tolist(), ['NEFT/RENT', 'ATM CASH', ''])
+        self.assertEqual(normalized['Debit'].tolist(), [20000.0, 500.0, 0.0])
+
+    def test_missing_required_column(self):
+        df = pd.DataFrame([['05/03/2024', 'RENT', '20000']], columns=['Date', 'Narration', 'Debit'])
+        normalized = normalize_transactions(df)
+        self.assertTrue(normalized.empty)
+        self.assertEqual(list(normalized.columns), NORMALIZED_COLUMNS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+import unittest
+from src.insert_db import row_fingerprint, transaction_values
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', '..', 'db', 'migrate_row_hash.sql')
+
+# RowHash expression of the migration, modelled by mysql_row_hash below
+ROW_HASH_SQL = """SHA2(CONCAT_WS('|',
+    TRIM(AccountNo),
+    COALESCE(CAST(TransactionDate AS CHAR), 'None'),
+    COALESCE(CAST(ValueDate AS CHAR), 'None'),
+    CAST(COALESCE(Debit, 0.00) AS CHAR),
+    CAST(COALESCE(Credit, 0.00) AS CHAR),
+    CAST(COALESCE(Balance, 0.00) AS CHAR),
+    UPPER(TRIM(REGEXP_REPLACE(COALESCE(Description, ''), '[[:space:]]+', ' ')))
+), 256)"""
+
+def squash(sql):
+    return ' '.join(sql.split())
+
+def mysql_row_hash(account_no, transaction_date, value_date, description, debit, credit, balance):
+    """
+    What the migration's RowHash expression evaluates to for a stored row.
+
+    Amounts are given as MySQL shows a DECIMAL(15, 2) column, e.g. '1250.50', or None for NULL.
+    """
+    parts = [
+        account_no.strip(' '),
+        transaction_date if transaction_date is not None else 'None',
+        value_date if value_date is not None else 'None',
+        debit if debit is not None else '0.00',
+        credit if credit is not None else '0.00',
+        balance if balance is not None else '0.00',
+        re.sub(r'\s+', ' ', description or '').strip(' ').upper(),
+    ]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+class TestRowFingerprint(unittest.TestCase):
+
+    def test_migration_expression_is_the_modelled_one(self):
+        with open(MIGRATION) as migration:
+            self.assertIn(squash(ROW_HASH_SQL), squash(migration.read()))
+
+    def test_matches_migration(self):
+        # (account, dates, description, amounts sent by ingestion, the same amounts as stored by MySQL)
+        rows = [
+            ('1234567890', '2024-03-05', '2024-03-05', 'NEFT/RENT MARCH', (20000.0, 0.0, 50000.0), ('20000.00', '0.00', '50000.00')),
+            # Amounts with fewer or more than two decimals; MySQL rounds half away from zero
+            ('1234567890', '2024-03-05', '2024-03-06', 'UPI/COFFEE', (1250.5, 0, 1e7), ('1250.50', '0.00', '10000000.00')),
+            ('1234567890', '2024-03-05', '2024-03-06', 'UPI/COFFEE', (0.125, 2.675, 1.005), ('0.13', '2.68', '1.01')),
+            ('1234567890', '2024-03-05', '2024-03-06', 'REFUND', (0, 0.1 + 0.2, -1234.565), ('0.00', '0.30', '-1234.57')),
+            # Whitespace and case in the description
+            ('1234567890', '2024-03-07', '2024-03-07', '  atm\tcash  withdrawal\n', (500.0, 0.0, 49500.0), ('500.00', '0.00', '49500.00')),
+            # Missing balance, description and dates
+            ('1234567890', '2024-03-08', '2024-03-08', 'INTEREST', (0.0, 12.0, None), ('0.00', '12.00', None)),
+            ('1234567890', None, None, None, (None, None, None), (None, None, None)),
+            ('  1234567890 ', '2024-03-08', '2024-03-08', 'INTEREST', (None, 12.0, 0.0), (None, '12.00', '0.00')),
+        ]
+        for account_no, transaction_date, value_date, description, amounts, stored in rows:
+            values = (transaction_date, value_date, description) + amounts
+            with self.subTest(values=values):
+                self.assertEqual(row_fingerprint(account_no, values),
+                                 mysql_row_hash(account_no, transaction_date, value_date, description, *stored))
+
+    def test_description_whitespace_and_case_are_folded(self):
+        values = ('2024-03-07', '2024-03-07', 'ATM CASH', 500.0, 0.0, 49500.0)
+        folded = ('2024-03-07', '2024-03-07', ' atm   Cash ', 500.0, 0.0, 49500.0)
+        self.assertEqual(row_fingerprint('1', values), row_fingerprint('1', folded))
+
+    def test_null_balance_is_zero(self):
+        self.assertEqual(row_fingerprint('1', ('2024-03-08', '2024-03-08', 'INTEREST', 0.0, 12.0, None)),
+                         row_fingerprint('1', ('2024-03-08', '2024-03-08', 'INTEREST', 0.0, 12.0, 0.0)))
+
+    def test_pinned_digest(self):
+        # sha256('1234567890|2024-03-05|2024-03-05|1250.50|0.00|10000.00|UPI COFFEE')
+        values = transaction_values({'Transaction\nDate': '05/03/2024', 'ValueDate': '05/03/2024', 'Description': 'upi  coffee',
+                                     'Debit': '1,250.50', 'Credit': '0', 'Balance': '10,000.00'})
+        self.assertEqual(row_fingerprint('1234567890', values),
+                         hashlib.sha256(b'1234567890|2024-03-05|2024-03-05|1250.50|0.00|10000.00|UPI COFFEE').hexdigest())
+
+if __name__ == '__main__':
+    unittest.main()
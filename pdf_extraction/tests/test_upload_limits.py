@@ -0,0 +1,32 @@
+import io
+import unittest
+from unittest import mock
+import api
+
+class TestUploadLimits(unittest.TestCase):
+
+    def setUp(self):
+        self.client = api.app.test_client()
+        self.large = b'x' * (api.MAX_CONTENT_LENGTH + 1)
+
+    def test_single_upload_is_rejected_before_parsing(self):
+        with mock.patch.object(api.UploadRequest, '_load_form_data') as load_form_data:
+            response = self.client.post('/upload-and-process', data={'file': (io.BytesIO(self.large), 'statement.pdf')})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json, {'error': 'File is too large'})
+        load_form_data.assert_not_called()
+
+    def test_batch_upload_may_exceed_single_limit(self):
+        response = self.client.post('/upload-batch', data={'files': (io.BytesIO(self.large), 'statement.txt')})
+        # Parsed and judged by its content rather than its size
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('neither a PDF nor a ZIP', response.json['error'])
+
+    def test_batch_upload_over_batch_limit(self):
+        with mock.patch.object(api, 'BATCH_MAX_CONTENT_LENGTH', api.MAX_CONTENT_LENGTH):
+            response = self.client.post('/upload-batch', data={'files': (io.BytesIO(self.large), 'statement.pdf')})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json, {'error': 'Request is too large'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,5 +7,6 @@ urlpatterns = [
     path('', views.home, name = 'home'),
     path('django_plotly_dash/', include('django_plotly_dash.urls')),
     path('search/', views.search_view, name='search_view'),
+    path('search/stats/', views.search_stats_view, name='search_stats'),
     # path('HomePage', home_page, name="home_page")
 ]
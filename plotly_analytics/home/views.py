@@ -11,17 +11,10 @@ from dotenv import load_dotenv
 # Load environment variables from a .env file
 load_dotenv()
 
-# Database configuration using environment variables
-db_config = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'database': os.getenv('DB_NAME')
-}
-
-# Add paths to the system path for importing modules
+# Add paths to the system path for importing modules; the repository root provides the shared common package
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../sql_search')))
-from main import execute_user_query
+from main import execute_user_query, search_stats
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mf_pf_suggetions')))
 from mutual_funds.mf_main import get_average_balances
@@ -140,3 +133,14 @@ def search_view(request):
             return JsonResponse({'error': f'API request error: {str(e)}'}, status=500)
     
     return JsonResponse({'error': 'Invalid request method'}, status=400)
+
+def search_stats_view(request):
+    """
+    Report how search questions are answered: intent template coverage and question and result cache hit ratios.
+    
+    :param request: The HTTP request object.
+    :return: JSON response with the search statistics.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Invalid request method'}, status=400)
+    return JsonResponse(search_stats())
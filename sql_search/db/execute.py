@@ -1,43 +1,41 @@
-import mysql.connector
 from mysql.connector import Error
-from dotenv import load_dotenv
-import os
-
-# Load environment variables from a .env file
-load_dotenv()
-
-# Database configuration using environment variables
-db_config = {
-    'host': os.getenv('DB_HOST'),         # Database host
-    'user': os.getenv('DB_USER'),         # Database user
-    'password': os.getenv('DB_PASSWORD'), # Database password
-    'database': os.getenv('DB_NAME')      # Database name
-}
+from common.data_version import current_data_version
+from common.db import connection
+from result_cache import is_read_query, result_cache
 
 def execute_query(query, params=None):
-    connection = None
     result = None
     error_message = None
     
+    # Serve repeated reads from the cache while the stored data has not changed
+    cache_key = None
+    if is_read_query(query):
+        version = current_data_version()
+        if version is not None:
+            cache_key = result_cache.key(query, params, version)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached, None
+
     try:
-        # Establish a database connection using the configuration
-        with mysql.connector.connect(**db_config) as connection:
+        # Check out a pooled connection; it goes back to the pool when the block ends
+        with connection() as conn:
             # Create a cursor object to interact with the database
-            with connection.cursor() as cursor:
+            with conn.cursor() as cursor:
                 # Execute the SQL query with optional parameters
                 cursor.execute(query, params)
                 # Fetch all results if the query returns rows
                 if cursor.with_rows:
                     result = cursor.fetchall()
                 # Commit the transaction
-                connection.commit() 
+                conn.commit() 
     except Error as e:
         # Capture any database errors and store the error message
         error_message = str(e)
-    finally:
-        # Ensure the connection is closed if it is open
-        if connection and connection.is_connected():
-            connection.close()
-    
+
+    # Keep the result for the next identical query against the same data
+    if cache_key is not None and error_message is None:
+        result_cache.set(cache_key, result)
+
     # Return the result of the query and any error message
     return result, error_message
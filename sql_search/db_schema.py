@@ -52,4 +52,13 @@ database_schema = """{
         }
     }
 }
-"""
\ No newline at end of file
+"""
+
+# Tables and columns described above, for validating generated queries without a database round trip.
+# RowID (insertion order) is not described to the LLM but may be used by the intent templates.
+tables = {
+    "transaction_info": [
+        "ID", "BankName", "PersonName", "AccountNo", "TransactionDate", "ValueDate",
+        "Description", "Debit", "Credit", "Balance", "label", "RowID"
+    ]
+}
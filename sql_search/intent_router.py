@@ -0,0 +1,341 @@
+import calendar
+import re
+import threading
+from collections import deque
+from datetime import date, timedelta
+from db.execute import execute_query
+from question_cache import normalize_question
+from steps.validate_query import format_validation_errors, validate_sql_query
+
+# Stored label values, by the words users type for them
+LABEL_WORDS = {
+    'food': 'Food', 'restaurants': 'Food', 'dining': 'Food',
+    'fuel': 'Fuel', 'petrol': 'Fuel', 'diesel': 'Fuel',
+    'travel': 'Travel', 'travelling': 'Travel', 'traveling': 'Travel',
+    'super market': 'Super Market', 'supermarket': 'Super Market', 'groceries': 'Super Market', 'grocery': 'Super Market',
+    'emi': 'EMI', 'emis': 'EMI', 'loan': 'EMI', 'loans': 'EMI',
+    'ipms': 'IPMS',
+    'others': 'Others', 'other': 'Others',
+}
+
+# Largest N a top-N question may ask for
+MAX_TOP_N = 100
+
+# Intents that list the N largest rows
+TOP_INTENTS = ('top_debits', 'top_transactions')
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS['sept'] = 9
+MONTH = '(?:' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + ')'
+DATE = (
+    r'(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/-]\d{1,2}[/-]\d{4}'
+    rf'|\d{{1,2}}(?:st|nd|rd|th)? (?:of )?{MONTH} \d{{4}}|{MONTH} \d{{1,2}}(?:st|nd|rd|th)? \d{{4}})'
+)
+LABEL = '(?P<label>' + '|'.join(sorted(LABEL_WORDS, key=len, reverse=True)) + ')'
+SPEND = r'(?:spend|spends|spending|spent|expenses?|expenditure|debits?)'
+ITEMS = r'(?:debit|expense|spend|payment|purchase|withdrawal)s?(?: transactions?)?'
+# Transactions in either direction, credits included
+TRANSACTIONS = r'(?:transactions?|(?:debits? (?:and|or|&) credits?|credits? (?:and|or|&) debits?)(?: transactions?)?)'
+
+# Account number, matched on the raw question because normalizing strips leading zeros
+ACCOUNT = re.compile(
+    r'\b(?:(?:for|in|on|from|of) )?(?:my )?(?:account|acct|a/c)\.?(?: no\.?| number| num)?[ :#]*(?P<account>\d{6,20})\b'
+)
+
+# Phrases that restrict a question to a period, tried in order on the normalized question
+PERIODS = [(kind, re.compile(pattern)) for kind, pattern in [
+    ('between', rf'\b(?:between|from) (?P<a>{DATE}) (?:and|to|till|until) (?P<b>{DATE})\b'),
+    ('on', rf'\b(?:on|as of|as on|at) (?P<a>{DATE})\b'),
+    ('since', rf'\b(?:since|from) (?P<a>{DATE})\b'),
+    ('after', rf'\bafter (?P<a>{DATE})\b'),
+    ('until', rf'\b(?:until|till|up to|upto) (?P<a>{DATE})\b'),
+    ('before', rf'\bbefore (?P<a>{DATE})\b'),
+    ('month', rf'\b(?:(?:in|during|for|at the end of) )?(?:the month of )?(?P<month>{MONTH}) (?P<year>\d{{4}})\b'),
+    ('year', r'\b(?:in|during|for) (?:the year )?(?P<year>\d{4})\b'),
+    ('recent', r'\b(?:in |during |for |over )?(?:the )?(?:last|past) (?P<n>\d+) (?P<unit>days|weeks|months)\b'),
+    ('relative', r'\b(?:in |during |for |over )?(?:the )?(?P<which>last|past|previous|this|current) (?P<unit>week|month|year)\b'),
+    ('day', r'\b(?P<which>today|yesterday)\b'),
+]]
+
+# Politeness and question words around the part that identifies the intent
+PREFIX = re.compile(
+    r'^(?:(?:please|can you|could you|tell me|show me|show|list|give me|get|find|display|i want to know|'
+    r'what is|what was|what s|whats|what are|what were|what)\s+)*'
+)
+SUFFIX = re.compile(r'(?:\s+(?:please|so far|in total|overall|till date|to date|in my account))*$')
+
+# Questions each template answers, as full matches of what is left after the period and account are removed
+INTENTS = [(intent, re.compile(pattern)) for intent, pattern in [
+    ('spend_by_label', rf'how much (?:did|have|do) (?:i|we) (?:spend|spent) (?:on|for|in) (?:the )?{LABEL}(?: category)?'),
+    ('spend_by_label', rf'(?:my |the )?(?:total )?(?:amount )?{SPEND} (?:on|for|in|under) (?:the )?{LABEL}(?: category)?'),
+    ('spend_by_label', rf'(?:my |the )?(?:total )?{LABEL} {SPEND}'),
+    ('spend_per_label', rf'(?:my |the )?(?:total )?{SPEND} (?:by|per|for each|across|in each|on each) (?:label|category|categories|labels)'),
+    ('spend_per_label', rf'(?:my |the )?(?:label|category)[- ]?wise {SPEND}'),
+    ('spend_per_label', r'how much (?:did|have|do) (?:i|we) spend (?:on|in) each (?:label|category)'),
+    ('total_spend', r'how much (?:did|have|do) (?:i|we) (?:spend|spent)'),
+    ('total_spend', rf'(?:my |the )?total (?:{SPEND}|amount spent|amount debited)'),
+    ('top_debits', rf'(?:my |the )?(?:top|largest|biggest|highest|maximum) (?:(?P<n>\d+) )?{ITEMS}'),
+    ('top_debits', rf'(?:my )?(?P<n>\d+) (?:top|largest|biggest|highest) {ITEMS}'),
+    ('top_transactions', rf'(?:my |the )?(?:top|largest|biggest|highest|maximum) (?:(?P<n>\d+) )?{TRANSACTIONS}'),
+    ('top_transactions', rf'(?:my )?(?P<n>\d+) (?:top|largest|biggest|highest) {TRANSACTIONS}'),
+    ('balance', r'(?:my |the )?(?:account |closing |available )?balance'),
+    ('balance', r'how much (?:money )?(?:did|do) i have'),
+]]
+
+# Parameterized SQL per intent: select clause, fixed conditions and the clause that follows WHERE
+TEMPLATES = {
+    'spend_by_label': ("SELECT SUM(Debit) FROM transaction_info", ["label = %s"], ""),
+    'spend_per_label': (
+        "SELECT label, SUM(Debit) AS total FROM transaction_info", ["Debit > 0"], " GROUP BY label ORDER BY total DESC"
+    ),
+    'total_spend': ("SELECT SUM(Debit) FROM transaction_info", [], ""),
+    'top_debits': (
+        "SELECT TransactionDate, Description, Debit FROM transaction_info", ["Debit > 0"], " ORDER BY Debit DESC LIMIT %s"
+    ),
+    # Debits and credits together, ranked by the amount that moved
+    'top_transactions': (
+        "SELECT TransactionDate, Description, Debit, Credit FROM transaction_info", [],
+        " ORDER BY GREATEST(COALESCE(Debit, 0), COALESCE(Credit, 0)) DESC LIMIT %s"
+    ),
+    # The last row stored on or before the date, in statement order, carries the balance of that day
+    'balance': (
+        "SELECT Balance FROM transaction_info", ["TransactionDate <= %s"], " ORDER BY TransactionDate DESC, RowID DESC LIMIT 1"
+    ),
+}
+
+def parse_date(text):
+    """
+    :param text: Date matched by DATE: YYYY-MM-DD, DD/MM/YYYY (day first, as on the statements) or with a month name.
+    :return: The date.
+    :raises ValueError: If the date does not exist.
+    """
+    if re.fullmatch(r'\d{4}-\d{1,2}-\d{1,2}', text):
+        year, month, day = text.split('-')
+    elif re.fullmatch(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}', text):
+        day, month, year = re.split('[/-]', text)
+    else:
+        words = [word for word in text.split() if word != 'of']
+        if words[0] in MONTHS:
+            words[0], words[1] = words[1], words[0]
+        day, month, year = re.sub(r'(st|nd|rd|th)$', '', words[0]), MONTHS[words[1]], words[2]
+    return date(int(year), int(month), int(day))
+
+def month_range(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def shift_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+def period_dates(kind, match, today):
+    """
+    Turn a matched period phrase into a date range.
+
+    :return: Tuple of (start, end), both inclusive; start is None for "until <date>" and "before <date>".
+    """
+    if kind == 'between':
+        return parse_date(match.group('a')), parse_date(match.group('b'))
+    if kind == 'on':
+        day = parse_date(match.group('a'))
+        return day, day
+    if kind == 'since':
+        return parse_date(match.group('a')), today
+    if kind == 'after':
+        # "after" leaves out the day itself, unlike "since"
+        return parse_date(match.group('a')) + timedelta(days=1), today
+    if kind == 'until':
+        return None, parse_date(match.group('a'))
+    if kind == 'before':
+        # "before" leaves out the day itself, unlike "until"
+        return None, parse_date(match.group('a')) - timedelta(days=1)
+    if kind == 'month':
+        return month_range(int(match.group('year')), MONTHS[match.group('month')])
+    if kind == 'year':
+        year = int(match.group('year'))
+        return date(year, 1, 1), date(year, 12, 31)
+    if kind == 'recent':
+        n = int(match.group('n'))
+        unit = match.group('unit')
+        if unit == 'months':
+            return shift_months(today, -n), today
+        return today - timedelta(days=n * (7 if unit == 'weeks' else 1)), today
+    if kind == 'relative':
+        previous = match.group('which') in ('last', 'past', 'previous')
+        unit = match.group('unit')
+        if unit == 'week':
+            start = today - timedelta(days=today.weekday() + (7 if previous else 0))
+            return start, start + timedelta(days=6)
+        if unit == 'month':
+            anchor = shift_months(today, -1) if previous else today
+            return month_range(anchor.year, anchor.month)
+        year = today.year - 1 if previous else today.year
+        return date(year, 1, 1), date(year, 12, 31)
+    day = today - timedelta(days=1) if match.group('which') == 'yesterday' else today
+    return day, day
+
+def build_query(intent, label=None, start=None, end=None, account=None, n=None):
+    """
+    Fill an intent's template with the extracted slots.
+
+    :param intent: Key of TEMPLATES.
+    :param label: Stored label value, for spend_by_label.
+    :param start: First day of the period (None for no lower bound).
+    :param end: Last day of the period; the as-of date for balance.
+    :param account: Account number to restrict to.
+    :param n: Number of rows, for top_debits and top_transactions.
+    :return: Tuple of (SQL with %s placeholders, parameters).
+    """
+    select, conditions, tail = TEMPLATES[intent]
+    conditions = list(conditions)
+    params = []
+    if intent == 'spend_by_label':
+        params.append(label)
+    elif intent == 'balance':
+        params.append(end)
+    if intent != 'balance':
+        if start is not None:
+            conditions.append("TransactionDate >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("TransactionDate <= %s")
+            params.append(end)
+    if account is not None:
+        conditions.append("AccountNo = %s")
+        params.append(account)
+    if intent in TOP_INTENTS:
+        params.append(n)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return select + where + tail, tuple(params)
+
+def check_templates():
+    """
+    Validate every template with every combination of optional filters against the schema.
+
+    :raises ValueError: If a template does not pass validate_sql_query.
+    """
+    sample = date(2000, 1, 1)
+    for intent in TEMPLATES:
+        for start, end, account in [(None, None, None), (sample, sample, '1'), (None, sample, None)]:
+            sql, _ = build_query(intent, 'Food', start, end if intent != 'balance' else sample, account, 1)
+            errors = validate_sql_query(sql)
+            if errors:
+                raise ValueError(f"Intent template {intent} is invalid: {format_validation_errors(errors)}")
+
+class IntentRouter:
+    """
+    Answer common analytics questions from precompiled SQL templates, without the LLM.
+
+    A question is routed only if, once its period and account phrases are taken
+    out, what is left fully matches one of the intent patterns. Anything else is
+    left to the LLM. Coverage is counted per intent, and recent unmatched
+    questions are kept to show which templates would be worth adding.
+    """
+
+    def __init__(self, recent_size=50):
+        """
+        :param recent_size: Number of recent unmatched questions kept for stats().
+        """
+        self.questions = 0
+        self.matched = {}
+        self.failed = 0
+        self.recent_unmatched = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+
+    def match(self, question, today=None):
+        """
+        Find the template answering a question and extract its slots.
+
+        :param question: Question as typed by the user.
+        :param today: Date relative periods are computed from (defaults to today).
+        :return: Tuple of (intent, SQL, parameters), or None if no template applies.
+        """
+        if not isinstance(question, str):
+            return None
+        today = today or date.today()
+        raw = question.lower()
+        account_match = ACCOUNT.search(raw)
+        account = None
+        if account_match:
+            account = account_match.group('account')
+            raw = raw[:account_match.start()] + ' ' + raw[account_match.end():]
+        text = normalize_question(raw)
+
+        start = end = None
+        for kind, pattern in PERIODS:
+            period_match = pattern.search(text)
+            if period_match:
+                try:
+                    start, end = period_dates(kind, period_match, today)
+                except (ValueError, KeyError):
+                    # A date that does not exist, e.g. 31/02/2018
+                    return None
+                text = text[:period_match.start()] + text[period_match.end():]
+                break
+
+        text = SUFFIX.sub('', PREFIX.sub('', re.sub(r'\s+', ' ', text).strip()))
+        for intent, pattern in INTENTS:
+            intent_match = pattern.fullmatch(text)
+            if not intent_match:
+                continue
+            slots = intent_match.groupdict()
+            n = None
+            if intent in TOP_INTENTS:
+                # "largest debit" asks for one row, "largest debits" for a list
+                n = int(slots['n']) if slots.get('n') else (10 if text.endswith('s') else 1)
+                if not 0 < n <= MAX_TOP_N:
+                    return None
+            if intent == 'balance':
+                end = end or today
+            label = LABEL_WORDS.get(slots['label']) if slots.get('label') else None
+            sql, params = build_query(intent, label, start, end, account, n)
+            return intent, sql, params
+        return None
+
+    def answer(self, question):
+        """
+        Answer a question from a template if one applies.
+
+        :param question: Question as typed by the user.
+        :return: Result rows, or None if the question should go to the LLM.
+        """
+        routed = self.match(question)
+        with self._lock:
+            self.questions += 1
+            if routed is None:
+                self.recent_unmatched.append(normalize_question(question))
+                return None
+            self.matched[routed[0]] = self.matched.get(routed[0], 0) + 1
+        intent, sql, params = routed
+        result, error_message = execute_query(sql, params)
+        if error_message:
+            print(f"Intent template {intent} failed: {error_message}")
+            with self._lock:
+                self.failed += 1
+            return None
+        print(f"Answered from intent template {intent}: {result}")
+        return result
+
+    def stats(self):
+        """
+        Return how many questions the templates answered.
+
+        :return: Dictionary with questions seen, matches per intent, coverage,
+                 failed template queries and recent unmatched questions.
+        """
+        with self._lock:
+            matched = sum(self.matched.values())
+            return {
+                'questions': self.questions,
+                'matched': dict(self.matched),
+                'coverage': round(matched / self.questions, 4) if self.questions else 0.0,
+                'failed': self.failed,
+                'recent_unmatched': list(self.recent_unmatched)
+            }
+
+# Templates are checked once at import so a broken one fails fast instead of per question
+check_templates()
+
+# Shared router instance used by execute_user_query
+intent_router = IntentRouter()
@@ -1,25 +1,81 @@
+import logging
+import os
+import sys
+import threading
+
+# Add the repository root to the system path for the shared modules in common/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from prompts.sql_prompt import format_prompt_sql_query
 import db_schema as db_schema
-from steps.generate_query import generate_sql_query
-from steps.execute_query import process_single_query
+from steps.generate_query import SQL_CANDIDATES, generate_sql_candidates
+from steps.execute_query import process_candidate_queries, process_single_query
+from question_cache import question_cache
+from intent_router import intent_router
+from result_cache import result_cache
+
+# Log search_stats() after every this many questions (0 turns the log off)
+SEARCH_STATS_LOG_EVERY = int(os.getenv('SEARCH_STATS_LOG_EVERY', 100))
+
+_questions = {'count': 0}
+_questions_lock = threading.Lock()
+
+def search_stats():
+    """
+    Return how questions are being answered.
+
+    :return: Dictionary with the intent template coverage and the question and result cache counters.
+    """
+    return {
+        'intent_router': intent_router.stats(),
+        'question_cache': question_cache.stats(),
+        'result_cache': result_cache.stats()
+    }
+
+def count_question():
+    # Log the statistics every SEARCH_STATS_LOG_EVERY questions
+    with _questions_lock:
+        _questions['count'] += 1
+        due = SEARCH_STATS_LOG_EVERY > 0 and _questions['count'] % SEARCH_STATS_LOG_EVERY == 0
+    if due:
+        logging.info(f'Search stats: {search_stats()}')
 
 def execute_user_query(user_query):
-    # Retrieve the database schema
-    database_schema = db_schema.database_schema
-    
-    # Format the system prompt based on the database schema
-    system_prompt = format_prompt_sql_query(database_schema)
-    
     try:
-        # Generate an SQL query using the user question and the system prompt
-        generated_query = generate_sql_query(user_query, system_prompt)
+        # Answer common analytics questions from a precompiled template, skipping the LLM
+        templated_result = intent_router.answer(user_query)
+        if templated_result is not None:
+            return templated_result
+        
+        # Reuse the query that answered the same question before, skipping the LLM
+        cached_query = question_cache.get(user_query)
+        
+        if cached_query:
+            candidates = [cached_query]
+        else:
+            # Retrieve the database schema
+            database_schema = db_schema.database_schema
+            
+            # Format the system prompt based on the database schema
+            system_prompt = format_prompt_sql_query(database_schema)
+            
+            # Generate SQL_CANDIDATES queries using the user question and the system prompt, in one request
+            candidates = generate_sql_candidates(user_query, system_prompt, SQL_CANDIDATES)
+            
+            # Check if a valid query was generated
+            if not candidates:
+                return "No generated query received from the LLM model."
         
-        # Check if a valid query was generated
-        if not generated_query:
-            return "No generated query received from the LLM model."
+        # Execute the generated query, or the first candidate that works, and retrieve the result
+        if len(candidates) > 1:
+            result, final_query = process_candidate_queries(user_query, candidates)
+        else:
+            result, final_query = process_single_query(user_query, candidates[0])
         
-        # Execute the generated query and retrieve the result
-        result = process_single_query(user_query, generated_query)
+        # Remember the query that worked; drop a cached one that no longer does
+        if final_query:
+            question_cache.set(user_query, final_query)
+        elif cached_query:
+            question_cache.discard(user_query)
         
         return result
         
@@ -32,3 +88,5 @@ def execute_user_query(user_query):
     except Exception as e:
         # Handle any other unexpected errors
         return f"An unexpected error occurred: {str(e)}"
+    finally:
+        count_question()
@@ -0,0 +1,201 @@
+import difflib
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dotenv import load_dotenv
+import db_schema
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Location of the durable question store and size of the in-memory LRU in front of it
+QUESTION_CACHE_PATH = os.getenv('QUESTION_CACHE_PATH', 'question_cache.sqlite3')
+QUESTION_CACHE_SIZE = int(os.getenv('QUESTION_CACHE_SIZE', 5000))
+
+# Similarity (0-1) a differently worded question needs to reuse a cached query; 0 disables fuzzy matching.
+# Keep it high: "spend on food" and "spend on fuel" differ by two letters.
+QUESTION_CACHE_FUZZY_CUTOFF = float(os.getenv('QUESTION_CACHE_FUZZY_CUTOFF', 0))
+
+# Number words folded to digits so "top five debits" and "top 5 debits" share an entry
+NUMBER_WORDS = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5', 'six': '6',
+    'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10', 'eleven': '11', 'twelve': '12'
+}
+
+def normalize_question(question):
+    """
+    Build the cache key for a user question.
+
+    Case, whitespace, punctuation and the spelling of numbers are folded away.
+    The numbers themselves are kept: "top 5" and "top 10" need different queries.
+
+    :param question: Question as typed by the user.
+    :return: Normalized key, or an empty string if nothing usable is left.
+    """
+    if not isinstance(question, str):
+        return ''
+    text = unicodedata.normalize('NFKC', question).lower()
+    # Thousands separators and trailing zero decimals: "1,000.00" -> "1000"
+    text = re.sub(r'(?<=\d),(?=\d{3}\b)', '', text)
+    text = re.sub(r'(\d+)\.0+\b', r'\1', text)
+    # Keep the characters of dates and amounts, drop the rest of the punctuation
+    tokens = re.findall(r'[a-z0-9]+(?:[-/.][a-z0-9]+)*', text)
+    return ' '.join(fold_number(token) for token in tokens)
+
+def fold_number(token):
+    # "five" -> "5", "05" -> "5"; other tokens are returned unchanged
+    if token in NUMBER_WORDS:
+        return NUMBER_WORDS[token]
+    if token.isdigit():
+        return token.lstrip('0') or '0'
+    return token
+
+def schema_fingerprint(database_schema):
+    """
+    :param database_schema: Schema description given to the LLM.
+    :return: Hash identifying the schema; cached queries of another schema are discarded.
+    """
+    return hashlib.sha256(str(database_schema).encode('utf-8')).hexdigest()
+
+class QuestionCache:
+    """
+    Two-level cache of generated SQL by normalized question: an in-memory LRU over a SQLite table.
+
+    Only queries that executed successfully are stored, and every entry carries
+    the fingerprint of the schema it was generated for, so a schema change
+    invalidates the whole cache.
+    """
+
+    def __init__(self, database_schema, path=QUESTION_CACHE_PATH, max_size=QUESTION_CACHE_SIZE,
+                 fuzzy_cutoff=QUESTION_CACHE_FUZZY_CUTOFF):
+        """
+        :param database_schema: Schema description the cached queries are valid for.
+        :param path: SQLite file used as the durable store.
+        :param max_size: Maximum number of entries kept in memory.
+        :param fuzzy_cutoff: Minimum similarity for a fuzzy match, 0 for exact matches only.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.schema_hash = schema_fingerprint(database_schema)
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS question_cache (
+                question_key TEXT PRIMARY KEY, schema_hash TEXT NOT NULL, sql_query TEXT NOT NULL, updated_at REAL NOT NULL
+            )
+            """
+        )
+        # Queries generated for an earlier schema may reference columns that no longer exist
+        self._conn.execute("DELETE FROM question_cache WHERE schema_hash <> ?", (self.schema_hash,))
+        self._conn.commit()
+        # Warm the LRU with the most recent entries so fuzzy matching has candidates after a restart
+        rows = self._conn.execute(
+            "SELECT question_key, sql_query FROM question_cache ORDER BY updated_at DESC LIMIT ?", (max_size,)
+        ).fetchall()
+        for key, sql_query in reversed(rows):
+            self._memory[key] = sql_query
+
+    def _remember(self, key, sql_query):
+        # Insert into the LRU and evict the least recently used entry if full
+        self._memory[key] = sql_query
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _fuzzy_match(self, key):
+        # Only consider questions mentioning exactly the same numbers (amounts, dates, N)
+        numbers = re.findall(r'\d+', key)
+        candidates = [candidate for candidate in self._memory if re.findall(r'\d+', candidate) == numbers]
+        matches = difflib.get_close_matches(key, candidates, n=1, cutoff=self.fuzzy_cutoff)
+        return matches[0] if matches else None
+
+    def get(self, question):
+        """
+        Look up the SQL last validated for a question.
+
+        :param question: Question as typed by the user.
+        :return: Cached SQL query, or None on a miss.
+        """
+        key = normalize_question(question)
+        if not key:
+            return None
+        with self._lock:
+            sql_query = self._memory.get(key)
+            if sql_query is None:
+                row = self._conn.execute(
+                    "SELECT sql_query FROM question_cache WHERE question_key = ? AND schema_hash = ?",
+                    (key, self.schema_hash)
+                ).fetchone()
+                if row:
+                    sql_query = row[0]
+            if sql_query is None and self.fuzzy_cutoff > 0:
+                match = self._fuzzy_match(key)
+                if match is not None:
+                    key, sql_query = match, self._memory[match]
+                    self.fuzzy_hits += 1
+            if sql_query is None:
+                self.misses += 1
+            else:
+                self._remember(key, sql_query)
+                self.hits += 1
+            return sql_query
+
+    def set(self, question, sql_query):
+        """
+        Store the SQL that answered a question.
+
+        :param question: Question as typed by the user.
+        :param sql_query: Query that executed successfully.
+        """
+        key = normalize_question(question)
+        if not key or not sql_query:
+            return
+        with self._lock:
+            self._remember(key, sql_query)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO question_cache (question_key, schema_hash, sql_query, updated_at) VALUES (?, ?, ?, ?)",
+                (key, self.schema_hash, sql_query, time.time())
+            )
+            self._conn.commit()
+
+    def discard(self, question):
+        """
+        Forget the cached SQL of a question, e.g. after it stopped working.
+
+        :param question: Question as typed by the user.
+        """
+        key = normalize_question(question)
+        with self._lock:
+            self._memory.pop(key, None)
+            self._conn.execute("DELETE FROM question_cache WHERE question_key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return hit and miss counters for the cache.
+
+        :return: Dictionary with hits (of which fuzzy), misses, hit ratio and in-memory size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory)
+            }
+
+# Shared cache instance used by execute_user_query
+question_cache = QuestionCache(db_schema.database_schema)
@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Query results kept in memory, least recently used evicted first
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 256))
+
+# Results with more rows than this are not cached
+RESULT_CACHE_MAX_ROWS = int(os.getenv('RESULT_CACHE_MAX_ROWS', 10000))
+
+# Seconds a result is served even if the data version did not change, as a bound for writes made outside ingestion
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 300))
+
+# String literals and quoted identifiers, which must keep their case and spacing
+QUOTED = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+
+def normalize_sql(query):
+    """
+    Build the cache key part for an SQL statement.
+
+    Outside quoted text, case and whitespace are folded and a trailing
+    semicolon is dropped, so reformatted copies of a query share an entry.
+
+    :param query: SQL statement.
+    :return: Normalized statement.
+    """
+    parts = QUOTED.split(query.strip().rstrip(';').strip())
+    # split() with a capturing group puts the quoted parts at odd positions
+    return ''.join(
+        part if index % 2 else re.sub(r'\s+', ' ', part).lower()
+        for index, part in enumerate(parts)
+    ).strip()
+
+def is_read_query(query):
+    """
+    :param query: SQL statement.
+    :return: True if the statement only reads data, so its result can be cached.
+    """
+    return bool(re.match(r'(select|with)\b', normalize_sql(query)))
+
+class ResultCache:
+    """
+    In-memory LRU of query results keyed by normalized SQL, parameters and data version.
+
+    Ingestion bumps the data version once per stored statement. The version
+    itself is re-read only every DATA_VERSION_TTL seconds (common.data_version),
+    so results computed before new rows arrived can still be served for up to
+    that long after the ingestion commits.
+    """
+
+    def __init__(self, max_size=RESULT_CACHE_SIZE, max_rows=RESULT_CACHE_MAX_ROWS, ttl=RESULT_CACHE_TTL):
+        """
+        :param max_size: Maximum number of results kept.
+        :param max_rows: Largest result, in rows, that is cached.
+        :param ttl: Seconds after which a result is recomputed regardless of the data version.
+        """
+        self.max_size = max_size
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query, params, version):
+        """
+        :param query: SQL statement.
+        :param params: Query parameters.
+        :param version: Data version the result is computed against.
+        :return: Cache key.
+        """
+        return normalize_sql(query), repr(params), version
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        :param key: Key from ResultCache.key.
+        :return: Copy of the cached rows, or None on a miss.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._memory[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def set(self, key, rows):
+        """
+        Store a result, unless it is too large.
+
+        :param key: Key from ResultCache.key.
+        :param rows: Result rows.
+        """
+        if rows is None or len(rows) > self.max_rows:
+            return
+        with self._lock:
+            self._memory[key] = (list(rows), time.monotonic())
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Return hit and miss counters for the cache.
+
+        :return: Dictionary with hits, misses, hit ratio, evictions and size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._memory)
+            }
+
+# Shared cache instance used by execute_query
+result_cache = ResultCache()
@@ -1,8 +1,13 @@
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from db.execute import execute_query
 from prompts.fix_sql_query_prompt import fix_sql_query_error_prompt
 import db_schema
 from steps.generate_query import generate_sql_query
+from steps.validate_query import format_validation_errors, validate_sql_query
+
+# Candidate queries executed at the same time; each holds a pooled database connection
+SQL_CANDIDATE_WORKERS = int(os.getenv('SQL_CANDIDATE_WORKERS', 3))
 
 # Custom exception for handling errors in query execution
 class QueryExecutionError(Exception):
@@ -14,20 +19,42 @@ class QuerySuggestionError(Exception):
     """Custom exception for errors in generating query suggestions."""
     pass
 
-def process_single_query(question, generated_query):
+def process_single_query(question, generated_query, error_message=None):
+    """
+    Execute a generated query, asking the LLM to fix it when it fails.
+
+    Each query is first validated locally, so a query with unknown columns or
+    one that would modify data is sent back for fixing without reaching the database.
+
+    :param question: User question the query answers.
+    :param generated_query: SQL generated for the question.
+    :param error_message: Error the query is already known to fail with; it is then
+                          sent for fixing straight away instead of being run again.
+    :return: Tuple of (result rows, the query that produced them), or a failure
+             message and None if no attempt succeeded.
+    """
     max_attempts = 3  # Maximum number of retry attempts for query execution
     attempt = 0  # Initialize attempt counter
 
     while attempt < max_attempts:
         try:
-            # Execute the SQL query and get the result and error message
-            result, error_message = execute_query(generated_query)
+            if error_message:
+                # The query is known to fail already; send it for fixing without running it again
+                result = None
+            else:
+                # Check the query locally; only a query that passes is sent to the database
+                validation_errors = validate_sql_query(generated_query)
+                if validation_errors:
+                    result, error_message = None, format_validation_errors(validation_errors)
+                else:
+                    # Execute the SQL query and get the result and error message
+                    result, error_message = execute_query(generated_query)
             
             if error_message:
                 # If there is an error, prepare a system prompt for fixing the query
                 system_prompt = fix_sql_query_error_prompt(
                     question, 
-                    result, 
+                    generated_query, 
                     error_message, 
                     db_schema.database_schema
                 )
@@ -47,12 +74,12 @@ def process_single_query(question, generated_query):
                     raise QuerySuggestionError(f"Error generating query suggestion: {str(e)}")
                 
                 attempt += 1  # Increment attempt counter
-                time.sleep(1)  # Wait before retrying
+                error_message = None
             
             else:
                 # If no error, return the successful result
                 print(f"Query executed successfully: {result}")
-                return result  
+                return result, generated_query
 
         except Exception as e:
             # Handle general exceptions during query execution
@@ -60,4 +87,53 @@ def process_single_query(question, generated_query):
 
     # If all attempts fail, return a failure message
     print("All attempts failed. No answer could be obtained for this question.")
-    return "No answer could be obtained for this question." 
+    return "No answer could be obtained for this question.", None
+
+def process_candidate_queries(question, candidates):
+    """
+    Run several generated queries for one question and keep the first that returns rows.
+
+    Candidates failing local validation are dropped; the rest are executed in
+    parallel. Once one returns rows the others are cancelled if they have not
+    started (a query already running finishes in the background). If every
+    candidate that ran came back empty, the first empty result is the answer.
+    If none ran without an error, the first candidate goes through the usual
+    fix-and-retry loop, starting from the error it already produced.
+
+    :param question: User question the queries answer.
+    :param candidates: List of SQL queries generated for the question.
+    :return: Tuple of (result rows, the query that produced them), as process_single_query.
+    """
+    validation_errors = [validate_sql_query(query) for query in candidates]
+    valid = [query for query, errors in zip(candidates, validation_errors) if not errors]
+    print(f"{len(valid)} of {len(candidates)} candidate queries passed validation")
+    # Error message of every candidate that failed, validation errors included
+    failures = {query: format_validation_errors(errors) for query, errors in zip(candidates, validation_errors) if errors}
+    empty = {}
+    if valid:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(valid), SQL_CANDIDATE_WORKERS)))
+        futures = {executor.submit(execute_query, query): query for query in valid}
+        try:
+            for future in as_completed(futures):
+                query = futures[future]
+                result, error_message = future.result()
+                if error_message:
+                    print(f"Candidate query failed: {error_message}")
+                    failures[query] = error_message
+                elif result:
+                    print(f"Query executed successfully: {result}")
+                    return result, query
+                else:
+                    empty[query] = result
+        finally:
+            # Drop the candidates still queued; shutdown(cancel_futures=True) needs Python 3.9
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+    for query in candidates:
+        if query in empty:
+            print(f"Query executed successfully without rows: {query}")
+            return empty[query], query
+    # Fix the first candidate that failed, from the error it produced
+    query = next(query for query in candidates if query in failures)
+    return process_single_query(question, query, failures[query])
@@ -1,18 +1,37 @@
+import os
+import re
 import openai
 from dotenv import load_dotenv
-import os
+from common.llm import chat_completion
 
-# Load environment variables from a .env file
+# Load environment variables from .env file
 load_dotenv()
 
-# Set the OpenAI API key from the environment variables
-openai.api_key = os.getenv('OPENAI_KEY')
+# Candidate queries sampled per question; with more than one they are validated and run in parallel
+SQL_CANDIDATES = int(os.getenv('SQL_CANDIDATES', 1))
 
 # Custom exception for errors in SQL query generation
 class SQLQueryGenerationError(Exception):
     pass
 
+def strip_code_fences(text):
+    # The prompt asks for plain text, but models still wrap queries in ```sql ... ``` at times
+    match = re.fullmatch(r'\s*```[a-zA-Z]*\s*(.*?)\s*```\s*', text, re.DOTALL)
+    return match.group(1) if match else text
+
 def generate_sql_query(user_question, system_prompt):
+    candidates = generate_sql_candidates(user_question, system_prompt)
+    return candidates[0] if candidates else ''
+
+def generate_sql_candidates(user_question, system_prompt, n=1):
+    """
+    Sample one or more SQL queries for a question in a single API request.
+
+    :param user_question: Question as typed by the user.
+    :param system_prompt: Prompt describing the schema and the task.
+    :param n: Number of completions to request.
+    :return: List of distinct non-empty queries, in the order the API returned them.
+    """
     try:
         # Prepare the messages for the OpenAI API request
         messages = [
@@ -21,17 +40,23 @@ def generate_sql_query(user_question, system_prompt):
         ]
         
         # Make a request to OpenAI's ChatCompletion API to generate SQL query
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
+            purpose='generate_sql',
             model="gpt-3.5-turbo",  # Model to use for query generation
             messages=messages,      # Messages containing the system prompt and user question
             max_tokens=150,         # Maximum number of tokens in the response
             temperature=0.7,        # Sampling temperature for creativity
-            top_p=0.9               # Nucleus sampling parameter
+            top_p=0.9,              # Nucleus sampling parameter
+            n=n                     # Number of candidate queries
         )
 
-        # Extract and return the generated SQL query from the API response
-        sql_query = response.choices[0].message['content'].strip()
-        return sql_query
+        # Extract the generated SQL queries from the API response, dropping repeats
+        candidates = []
+        for choice in response.choices:
+            sql_query = strip_code_fences(choice.message['content']).strip()
+            if sql_query and sql_query not in candidates:
+                candidates.append(sql_query)
+        return candidates
 
     except openai.error.OpenAIError as e:
         # Handle errors specific to the OpenAI API
@@ -0,0 +1,123 @@
+import sqlparse
+from sqlparse import tokens as T
+import db_schema
+
+# Keywords after which a table name follows
+TABLE_KEYWORDS = ('FROM', 'JOIN')
+
+def significant_tokens(statement):
+    # Leaf tokens without whitespace and comments
+    return [token for token in statement.flatten() if not token.is_whitespace and token.ttype not in T.Comment]
+
+def identifier(token):
+    return token.value.strip('`"').lower()
+
+def is_name(token):
+    # Builtins such as INTERVAL and %s placeholders are not identifiers
+    return token is not None and token.ttype in T.Name and token.ttype not in T.Name.Builtin \
+        and token.ttype not in T.Name.Placeholder
+
+def validate_sql_query(query, tables=None):
+    """
+    Check a generated query locally before it is sent to the database.
+
+    The query must be a single read-only SELECT statement whose tables and
+    columns exist in the schema given to the LLM. Aliases, common table
+    expressions and function names are recognised; anything sqlparse cannot
+    classify as a plain name is left for the database to judge.
+
+    :param query: SQL generated by the LLM.
+    :param tables: Dictionary of table name to column names (defaults to db_schema.tables).
+    :return: List of errors as dictionaries with 'code' and 'message'; empty if the query passed.
+    """
+    tables = db_schema.tables if tables is None else tables
+    statements = [statement for statement in sqlparse.parse(query or '') if statement.value.strip(' \n\t;')]
+    if not statements:
+        return [{'code': 'empty', 'message': 'No SQL statement was generated.'}]
+    if len(statements) > 1:
+        return [{'code': 'multiple_statements', 'message': 'Only a single SQL statement is allowed.'}]
+
+    statement = statements[0]
+    tokens = significant_tokens(statement)
+    if statement.get_type() != 'SELECT' or any(token.ttype in T.Keyword and token.normalized == 'INTO' for token in tokens):
+        return [{'code': 'not_read_only', 'message': 'Only SELECT statements that read data are allowed.'}]
+
+    errors = []
+    if any(token.ttype in T.Error for token in tokens):
+        errors.append({'code': 'syntax', 'message': 'The query has an unterminated string or an invalid character.'})
+    depth = 0
+    for token in tokens:
+        if token.match(T.Punctuation, '('):
+            depth += 1
+        elif token.match(T.Punctuation, ')'):
+            depth -= 1
+            if depth < 0:
+                break
+    if depth != 0:
+        errors.append({'code': 'syntax', 'message': 'The query has unbalanced parentheses.'})
+    if errors:
+        # Names cannot be told apart reliably in a statement that does not tokenize cleanly
+        return errors
+
+    known_tables = {name.lower() for name in tables}
+    known_columns = {column.lower() for columns in tables.values() for column in columns}
+
+    # First pass: the tables the query reads and the names it defines itself (aliases and CTEs)
+    defined = set()
+    referenced_tables = []
+    in_from = False
+    # One entry per open parenthesis: True for a subquery, False for an argument list or expression
+    parentheses = []
+    for index, token in enumerate(tokens):
+        previous = tokens[index - 1] if index else None
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token.ttype in T.Keyword and token.normalized != 'AS':
+            # "FROM a, b" and "JOIN c" list tables until the next clause. FROM inside
+            # function arguments, as in EXTRACT(MONTH FROM TransactionDate), is not a clause.
+            in_subquery_or_statement = not parentheses or parentheses[-1]
+            in_from = in_subquery_or_statement and token.normalized.endswith(TABLE_KEYWORDS)
+        elif token.match(T.Punctuation, '('):
+            parentheses.append(following is not None and following.ttype in (T.Keyword.DML, T.Keyword.CTE))
+            in_from = False
+        elif token.match(T.Punctuation, ')'):
+            parentheses.pop()
+            in_from = False
+        elif not is_name(token):
+            continue
+        elif in_from and (previous.ttype in T.Keyword and previous.normalized != 'AS' or previous.match(T.Punctuation, ',')):
+            referenced_tables.append(token)
+        elif previous is not None and (previous.match(T.Keyword, 'AS') or is_name(previous)
+                                       or previous.match(T.Punctuation, ')') or previous.ttype in T.Literal):
+            # "SUM(Debit) AS total", "transaction_info t", "COUNT(*) n"
+            defined.add(identifier(token))
+        elif following is not None and following.match(T.Keyword, 'AS') and index + 2 < len(tokens) \
+                and tokens[index + 2].match(T.Punctuation, '('):
+            # "WITH monthly AS (SELECT ...)"
+            defined.add(identifier(token))
+
+    reported = set()
+    for token in referenced_tables:
+        name = identifier(token)
+        if name not in known_tables and name not in defined and name not in reported:
+            reported.add(name)
+            errors.append({'code': 'unknown_table', 'message': f"Table '{token.value}' is not in the schema."})
+
+    # Second pass: every other name must be a column, a table or something the query defined
+    allowed = known_columns | known_tables | defined
+    for index, token in enumerate(tokens):
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if not is_name(token) or (following is not None and following.match(T.Punctuation, '(')):
+            # Not a name, or a function call
+            continue
+        name = identifier(token)
+        if name not in allowed and name not in reported:
+            reported.add(name)
+            errors.append({'code': 'unknown_column', 'message': f"Column '{token.value}' is not in the schema."})
+    return errors
+
+def format_validation_errors(errors):
+    """
+    :param errors: Errors from validate_sql_query.
+    :return: The error messages as one string, e.g. for the fix prompt.
+    """
+    return ' '.join(error['message'] for error in errors)
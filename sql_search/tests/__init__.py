@@ -0,0 +1,16 @@
+"""
+Tests for the SQL search steps. Run from the sql_search directory:
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+# The search modules import each other from the sql_search directory and the shared modules from common/
+SQL_SEARCH_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, SQL_SEARCH_DIR)
+sys.path.append(os.path.dirname(SQL_SEARCH_DIR))
+
+# Settings read at import time point at a scratch directory, never at the working copy's caches
+WORK_DIR = tempfile.mkdtemp(prefix='sql_search_tests_')
+os.environ['QUESTION_CACHE_PATH'] = os.path.join(WORK_DIR, 'question_cache.sqlite3')
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+import steps.execute_query as execute_query
+from steps.execute_query import process_candidate_queries
+
+EMPTY = "SELECT Debit FROM transaction_info WHERE label = 'None'"
+ROWS = "SELECT Debit FROM transaction_info"
+FAILING = "SELECT Debit FROM transaction_info ORDER BY"
+INVALID = "SELECT Amount FROM transaction_info"
+
+RESULTS = {
+    EMPTY: ([], None),
+    ROWS: ([(10.0,)], None),
+    FAILING: (None, 'You have an error in your SQL syntax'),
+}
+
+class TestProcessCandidateQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.executed = []
+
+        def run(query, params=None):
+            self.executed.append(query)
+            return RESULTS[query]
+        patcher = mock.patch.object(execute_query, 'execute_query', run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_candidate_with_rows_wins_over_empty_result(self):
+        with mock.patch.object(execute_query, 'SQL_CANDIDATE_WORKERS', 1):
+            self.assertEqual(process_candidate_queries('Spend?', [EMPTY, ROWS]), ([(10.0,)], ROWS))
+
+    def test_empty_result_when_no_candidate_has_rows(self):
+        with mock.patch.object(execute_query, 'process_single_query') as process_single_query:
+            self.assertEqual(process_candidate_queries('Spend?', [FAILING, EMPTY]), ([], EMPTY))
+        process_single_query.assert_not_called()
+
+    def test_failed_candidate_is_fixed_from_its_error(self):
+        with mock.patch.object(execute_query, 'generate_sql_query', return_value=ROWS) as generate_sql_query:
+            self.assertEqual(process_candidate_queries('Spend?', [INVALID, FAILING]), ([(10.0,)], ROWS))
+        # Each candidate ran at most once; the fix prompt got the first failure's validation error
+        self.assertEqual(self.executed.count(FAILING), 1)
+        self.assertNotIn(INVALID, self.executed)
+        system_prompt = generate_sql_query.call_args[0][1]
+        self.assertIn("Column 'Amount' is not in the schema.", system_prompt)
+
+    def test_execution_error_is_reused(self):
+        with mock.patch.object(execute_query, 'generate_sql_query', return_value=ROWS) as generate_sql_query:
+            self.assertEqual(process_candidate_queries('Spend?', [FAILING]), ([(10.0,)], ROWS))
+        self.assertEqual(self.executed, [FAILING, ROWS])
+        self.assertIn('You have an error in your SQL syntax', generate_sql_query.call_args[0][1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from steps.generate_query import strip_code_fences
+
+class TestStripCodeFences(unittest.TestCase):
+
+    def test_fenced_queries(self):
+        for answer in [
+            "```sql\nSELECT SUM(Debit) FROM transaction_info\n```",
+            "```\nSELECT SUM(Debit) FROM transaction_info\n```",
+            "  ```SQL SELECT SUM(Debit) FROM transaction_info```  ",
+        ]:
+            with self.subTest(answer=answer):
+                self.assertEqual(strip_code_fences(answer), 'SELECT SUM(Debit) FROM transaction_info')
+
+    def test_plain_query_is_unchanged(self):
+        self.assertEqual(strip_code_fences('SELECT 1'), 'SELECT 1')
+
+    def test_text_around_a_fence_is_kept(self):
+        answer = "Here is the query:\n```sql\nSELECT 1\n```"
+        self.assertEqual(strip_code_fences(answer), answer)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from datetime import date
+from unittest import mock
+import intent_router
+from intent_router import IntentRouter
+
+TODAY = date(2024, 5, 15)
+
+class TestIntentRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def match(self, question):
+        return self.router.match(question, today=TODAY)
+
+    def test_templates(self):
+        for question, intent, params in [
+            ('How much did I spend on food last month?', 'spend_by_label', ('Food', date(2024, 4, 1), date(2024, 4, 30))),
+            ('Groceries expenses in March 2024', 'spend_by_label', ('Super Market', date(2024, 3, 1), date(2024, 3, 31))),
+            ('Total spending by category', 'spend_per_label', ()),
+            ('How much did I spend?', 'total_spend', ()),
+            ('Show me my top 5 expenses in 2023', 'top_debits', (date(2023, 1, 1), date(2023, 12, 31), 5)),
+            ('What is my largest debit?', 'top_debits', (1,)),
+            ('biggest withdrawals', 'top_debits', (10,)),
+            ('biggest debit transactions', 'top_debits', (10,)),
+            # Transactions include credits such as salary and refunds
+            ('What are my highest transactions?', 'top_transactions', (10,)),
+            ('top 5 transactions', 'top_transactions', (5,)),
+            ('largest debits and credits', 'top_transactions', (10,)),
+            ('largest transaction in march 2024', 'top_transactions', (date(2024, 3, 1), date(2024, 3, 31), 1)),
+            ('What is my balance on 31/03/2024?', 'balance', (date(2024, 3, 31),)),
+            ('balance please', 'balance', (TODAY,)),
+        ]:
+            with self.subTest(question=question):
+                routed = self.match(question)
+                self.assertIsNotNone(routed)
+                self.assertEqual((routed[0], routed[2]), (intent, params))
+
+    def test_transactions_are_not_narrowed_to_debits(self):
+        _, sql, _ = self.match('top 5 transactions')
+        self.assertNotIn('Debit > 0', sql)
+        self.assertIn('Credit', sql)
+
+    def test_account_and_period_slots(self):
+        intent, sql, params = self.match('What was my fuel spend between 1st Jan 2024 and 31 March 2024 for account 001234567')
+        self.assertEqual(intent, 'spend_by_label')
+        self.assertIn('AccountNo = %s', sql)
+        # The account number keeps its leading zeros
+        self.assertEqual(params, ('Fuel', date(2024, 1, 1), date(2024, 3, 31), '001234567'))
+
+    def test_relative_periods(self):
+        for question, start, end in [
+            ('total spend this month', date(2024, 5, 1), date(2024, 5, 31)),
+            ('total spend last week', date(2024, 5, 6), date(2024, 5, 12)),
+            ('total spend in the last 3 months', date(2024, 2, 15), TODAY),
+            ('total spend yesterday', date(2024, 5, 14), date(2024, 5, 14)),
+            ('total spend last year', date(2023, 1, 1), date(2023, 12, 31)),
+        ]:
+            with self.subTest(question=question):
+                self.assertEqual(self.match(question)[2], (start, end))
+
+    def test_open_period_boundaries(self):
+        # "since" and "until" include the day, "after" and "before" do not
+        for question, start, end in [
+            ('total spend since 2024-01-31', date(2024, 1, 31), TODAY),
+            ('total spend from 31/01/2024', date(2024, 1, 31), TODAY),
+            ('total spend after 2024-01-31', date(2024, 2, 1), TODAY),
+            ('total spend until 1 jan 2024', None, date(2024, 1, 1)),
+            ('total spend up to 1 jan 2024', None, date(2024, 1, 1)),
+            ('total spend before 1 jan 2024', None, date(2023, 12, 31)),
+        ]:
+            with self.subTest(question=question):
+                self.assertEqual(self.match(question)[2], tuple(day for day in (start, end) if day is not None))
+
+    def test_balance_before_a_date_leaves_out_that_day(self):
+        self.assertEqual(self.match('balance before 2024-01-01')[2], (date(2023, 12, 31),))
+        self.assertEqual(self.match('balance as of 2024-01-01')[2], (date(2024, 1, 1),))
+
+    def test_ambiguous_questions_go_to_the_llm(self):
+        for question in [
+            'Which category did I spend the most on last month?',
+            'Compare my food spend with travel spend',
+            'What is the average balance?',
+            'How much did I spend on shoes?',
+            'How much did I spend on food on 31/02/2024?',
+            'top 500 transactions',
+            'spending since 2024-01-01',
+            '',
+            None,
+        ]:
+            with self.subTest(question=question):
+                self.assertIsNone(self.match(question))
+
+    def test_answer_counts_coverage(self):
+        with mock.patch.object(intent_router, 'execute_query', return_value=([(120.0,)], None)) as execute_query:
+            self.assertEqual(self.router.answer('How much did I spend?'), [(120.0,)])
+            self.assertIsNone(self.router.answer('Compare my food spend with travel spend'))
+        execute_query.assert_called_once_with('SELECT SUM(Debit) FROM transaction_info', ())
+        stats = self.router.stats()
+        self.assertEqual((stats['questions'], stats['matched'], stats['coverage']), (2, {'total_spend': 1}, 0.5))
+        self.assertEqual(len(stats['recent_unmatched']), 1)
+
+    def test_failed_template_falls_back_to_the_llm(self):
+        with mock.patch.object(intent_router, 'execute_query', return_value=(None, 'Lost connection')):
+            self.assertIsNone(self.router.answer('How much did I spend?'))
+        self.assertEqual(self.router.stats()['failed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
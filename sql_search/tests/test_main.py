@@ -0,0 +1,24 @@
+import unittest
+from unittest import mock
+import main
+
+class TestSearchStats(unittest.TestCase):
+
+    def test_stats_of_every_component(self):
+        stats = main.search_stats()
+        self.assertEqual(set(stats), {'intent_router', 'question_cache', 'result_cache'})
+        self.assertIn('coverage', stats['intent_router'])
+        self.assertIn('hit_ratio', stats['question_cache'])
+        self.assertIn('hit_ratio', stats['result_cache'])
+
+    def test_logged_periodically(self):
+        with mock.patch.object(main, 'SEARCH_STATS_LOG_EVERY', 2), \
+                mock.patch.dict(main._questions, {'count': 0}), \
+                mock.patch.object(main.intent_router, 'answer', return_value=[(120.0,)]):
+            with self.assertLogs(level='INFO') as logs:
+                for _ in range(5):
+                    self.assertEqual(main.execute_user_query('How much did I spend?'), [(120.0,)])
+        self.assertEqual(len([line for line in logs.output if 'Search stats' in line]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from steps.validate_query import validate_sql_query
+
+def codes(query):
+    return [error['code'] for error in validate_sql_query(query)]
+
+class TestValidateQuery(unittest.TestCase):
+
+    def test_valid_queries(self):
+        for query in [
+            "SELECT label, SUM(Debit) AS total FROM transaction_info t WHERE t.TransactionDate >= CURDATE() - INTERVAL 1 MONTH "
+            "GROUP BY label ORDER BY total DESC LIMIT 5;",
+            "WITH x AS (SELECT ID, Debit FROM transaction_info) SELECT x.ID, SUM(x.Debit) s FROM x GROUP BY x.ID",
+            "SELECT COUNT(*) FROM (SELECT DISTINCT label FROM transaction_info) sub",
+            "SELECT SUM(CASE WHEN label = 'Food' THEN Debit ELSE 0 END) FROM transaction_info",
+            "SELECT Debit FROM transaction_info WHERE AccountNo = %s LIMIT %s",
+        ]:
+            with self.subTest(query=query):
+                self.assertEqual(validate_sql_query(query), [])
+
+    def test_from_inside_function_arguments_is_not_a_table(self):
+        for query in [
+            "SELECT EXTRACT(MONTH FROM TransactionDate) AS month, SUM(Debit) FROM transaction_info GROUP BY month",
+            "SELECT TRIM(BOTH ' ' FROM Description) FROM transaction_info",
+            "SELECT SUBSTRING(Description FROM 1 FOR 5) FROM transaction_info",
+            "SELECT COALESCE((SELECT MAX(Debit) FROM transaction_info), 0)",
+        ]:
+            with self.subTest(query=query):
+                self.assertEqual(validate_sql_query(query), [])
+
+    def test_unknown_names_inside_function_arguments_are_still_reported(self):
+        self.assertEqual(codes("SELECT EXTRACT(YEAR FROM PostedOn) FROM transaction_info"), ['unknown_column'])
+        self.assertEqual(codes("SELECT COALESCE((SELECT MAX(Debit) FROM payments), 0)"), ['unknown_table'])
+
+    def test_unknown_tables_and_columns(self):
+        self.assertEqual(codes("SELECT Amount, Category FROM transaction_info"), ['unknown_column', 'unknown_column'])
+        self.assertEqual(codes("SELECT * FROM Personal_Info"), ['unknown_table'])
+
+    def test_rejects_statements_that_modify_data(self):
+        for query in [
+            "DELETE FROM transaction_info",
+            "UPDATE transaction_info SET label = 'Food'",
+            "INSERT INTO transaction_info (label) VALUES ('Food')",
+            "DROP TABLE transaction_info",
+            "SELECT Debit INTO OUTFILE '/tmp/debits' FROM transaction_info",
+        ]:
+            with self.subTest(query=query):
+                self.assertEqual(codes(query), ['not_read_only'])
+
+    def test_rejects_multiple_statements(self):
+        self.assertEqual(codes("SELECT 1; DROP TABLE transaction_info"), ['multiple_statements'])
+        # A trailing semicolon is not a second statement
+        self.assertEqual(codes("SELECT Debit FROM transaction_info;"), [])
+
+    def test_rejects_empty_and_malformed_queries(self):
+        self.assertEqual(codes(""), ['empty'])
+        self.assertEqual(codes("SELECT Debit FROM transaction_info WHERE label = 'Food"), ['syntax'])
+        self.assertEqual(codes("SELECT SUM(Debit FROM transaction_info"), ['syntax'])
+
+if __name__ == '__main__':
+    unittest.main()